@@ -2,88 +2,149 @@
 """
 Music Video Creator - Creates slideshow videos from images with audio
 Usage: python create_music_video.py --images /path/to/images --audio /path/to/audio.mp3 --duration 7
+
+--images also accepts a .zip: members are listed from the zip's central
+directory and streamed to FFmpeg through a pipe, without extracting.
+Animated GIF/WebP images play for their hold (see
+paradise-automation/scripts/animation.py).
+
+The video is described as a render plan and compiled to FFmpeg commands by
+paradise-automation/scripts/render_plan.py. With --cache-dir the compiled
+steps are kept, so re-running with a changed image set or audio only
+renders what changed.
 """
 
 import argparse
+import heapq
 import os
+import shutil
 import subprocess
 import random
 import sys
 import tempfile
 from pathlib import Path
 
+# Shared helpers from paradise-automation (tracing, render plans)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'paradise-automation'))
+from scripts.tracing import start_trace, stop_trace, run, traced
+from config import SUPPORTED_IMAGE_FORMATS
+from scripts.archive import is_archive, is_member, list_archive_images, split_ref
+from scripts.render_plan import build_plan, render_plan
+
 
+@traced
 def get_images(image_path: str) -> list:
-    """Get all image files from path (supports jpg, jpeg, png)"""
-    path = Path(image_path)
-    extensions = ['*.jpg', '*.jpeg', '*.png', '*.JPG', '*.JPEG', '*.PNG']
+    """Get all image files from path and its subfolders (jpg, png, webp, bmp, gif; animations play)"""
+    if is_archive(image_path):
+        return get_zip_images(image_path)
     images = []
-    for ext in extensions:
-        images.extend(path.glob(ext))
+    for root, dirs, files in os.walk(image_path):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        images.extend(Path(root, name) for name in files
+                      if Path(name).suffix.lower() in SUPPORTED_IMAGE_FORMATS and not name.startswith('._'))
     return sorted(images)
 
 
-def shuffle_images(images: list) -> list:
-    """Shuffle images - if from multiple folders, avoid same folder back-to-back"""
+def get_zip_images(zip_path: str) -> list:
+    """Image members of a zip as "<zip>::<member>" references, by member date (then name)"""
+    members = list_archive_images(zip_path)
+    return [ref for ref, mtime in sorted(members, key=lambda m: (m[1], m[0]))]
+
+
+def folder_of(image) -> str:
+    """Folder an image belongs to (full relative path, so same-named folders stay apart)"""
+    if is_member(image):
+        return os.path.dirname(split_ref(image)[1])
+    return os.path.dirname(image)
+
+
+@traced
+def shuffle_images(images: list, seed: int = None) -> list:
+    """Shuffle images - if from multiple folders, spread each folder out
+
+    Each folder's images are shuffled and given evenly spaced target
+    positions across the video (with a random phase per folder). Images are
+    then taken in target order through a heap, skipping the folder just
+    used, so folders are spaced as far apart as their sizes allow and never
+    back-to-back unless one folder holds more than half the images.
+    O(n log n); the same seed gives the same order.
+    """
+    rng = random.Random(seed)
+
     # Group by parent folder
     folders = {}
     for img in images:
-        folder = img.parent.name
-        if folder not in folders:
-            folders[folder] = []
-        folders[folder].append(img)
+        folders.setdefault(folder_of(img), []).append(img)
 
     # If all from same folder, just shuffle
     if len(folders) == 1:
         shuffled = list(images)
-        random.shuffle(shuffled)
+        rng.shuffle(shuffled)
         return shuffled
 
-    # Shuffle within each folder
-    for folder in folders:
-        random.shuffle(folders[folder])
+    # Shuffle within each folder; folder order breaks ties in target position
+    names = sorted(folders)
+    rng.shuffle(names)
+    for name in names:
+        rng.shuffle(folders[name])
+    phase = {name: rng.random() for name in names}
+    taken = {name: 0 for name in names}
+    remaining = {name: len(folders[name]) for name in names}
+
+    def target(name: str) -> float:
+        # Evenly spaced slot in [0, 1) for this folder's next image
+        return (taken[name] + phase[name]) / len(folders[name])
+
+    order = {name: i for i, name in enumerate(names)}
+    # Heap entries carry taken[name] when pushed; older ones are stale
+    upcoming = [(target(name), order[name], name, 0) for name in names]
+    heapq.heapify(upcoming)
+    largest = [(-remaining[name], order[name], name) for name in names]
+    heapq.heapify(largest)
+
+    def drop_stale():
+        while upcoming and upcoming[0][3] != taken[upcoming[0][2]]:
+            heapq.heappop(upcoming)
 
-    # Interleave - round-robin
     result = []
-    folder_names = list(folders.keys())
-    random.shuffle(folder_names)
-
-    while any(folders[f] for f in folder_names):
-        for fname in folder_names:
-            if folders[fname]:
-                result.append(folders[fname].pop(0))
-
-    # Fix back-to-back from same folder
-    for i in range(1, len(result)):
-        if result[i].parent.name == result[i-1].parent.name:
-            for j in range(i+1, len(result)):
-                if result[j].parent.name != result[i].parent.name:
-                    result[i], result[j] = result[j], result[i]
-                    break
+    last = None
+    left = len(images)
+    while left:
+        # Lazily refresh counts to find the folder with most images left
+        while -largest[0][0] != remaining[largest[0][2]]:
+            name = largest[0][2]
+            heapq.heapreplace(largest, (-remaining[name], order[name], name))
+        biggest = largest[0][2]
+
+        if biggest != last and 2 * remaining[biggest] > left:
+            # It has to go now or it will end up back-to-back later
+            name = biggest
+        else:
+            drop_stale()
+            entry = heapq.heappop(upcoming)
+            drop_stale()
+            if entry[2] == last and upcoming:
+                entry = heapq.heapreplace(upcoming, entry)
+            name = entry[2]
+
+        result.append(folders[name][taken[name]])
+        taken[name] += 1
+        remaining[name] -= 1
+        left -= 1
+        last = name
+        if remaining[name]:
+            heapq.heappush(upcoming, (target(name), order[name], name, taken[name]))
 
     return result
 
 
-def create_concat_file(images: list, duration: int, output_file: str) -> None:
-    """Create FFmpeg concat file"""
-    with open(output_file, 'w') as f:
-        for img in images:
-            # Escape single quotes in path
-            img_path = str(img).replace("'", "'\\''")
-            f.write(f"file '{img_path}'\n")
-            f.write(f"duration {duration}\n")
-        # Add last image without duration (required by concat)
-        last_path = str(images[-1]).replace("'", "'\\''")
-        f.write(f"file '{last_path}'\n")
-
-
 def get_audio_duration(audio_path: str) -> float:
     """Get audio duration in seconds"""
     cmd = [
         'ffprobe', '-v', 'quiet', '-print_format', 'json',
         '-show_format', audio_path
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run(cmd, capture_output=True, text=True)
     if result.returncode == 0:
         import json
         data = json.loads(result.stdout)
@@ -91,46 +152,37 @@ def get_audio_duration(audio_path: str) -> float:
     return 0
 
 
-def create_video(concat_file: str, audio_path: str, output_path: str,
-                 total_duration: int, resolution: str = "1920:1080") -> bool:
-    """Create video using FFmpeg"""
-    width, height = resolution.split(':')
-
-    cmd = [
-        'ffmpeg', '-y',
-        '-f', 'concat', '-safe', '0', '-i', concat_file,
-        '-i', audio_path,
-        '-vf', f'scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2',
-        '-c:v', 'libx264', '-preset', 'fast', '-crf', '23',
-        '-c:a', 'aac', '-b:a', '192k',
-        '-t', str(total_duration),
-        '-pix_fmt', 'yuv420p',
-        '-shortest',
-        output_path
-    ]
-
-    print(f"Running FFmpeg...")
-    result = subprocess.run(cmd, capture_output=True, text=True)
-
-    if result.returncode != 0:
-        print(f"FFmpeg error: {result.stderr[-500:]}")
-        return False
-    return True
+def load_encoder_profile(profile_path: str) -> dict:
+    """Read preset/crf from an encoder profile (paradise-automation/scripts/encoder_tuner.py)"""
+    import json
+    with open(profile_path) as f:
+        profile = json.load(f)
+    return {'preset': profile['preset'], 'crf': profile['crf']}
 
 
 def main():
     parser = argparse.ArgumentParser(description='Create music video from images')
-    parser.add_argument('--images', '-i', required=True, help='Path to images folder')
+    parser.add_argument('--images', '-i', required=True, help='Path to images folder or .zip')
     parser.add_argument('--audio', '-a', required=True, help='Path to audio file (mp3, m4a, etc)')
     parser.add_argument('--duration', '-d', type=int, default=7, help='Duration per image in seconds (default: 7)')
     parser.add_argument('--output', '-o', default='output_video.mp4', help='Output video path (default: output_video.mp4)')
     parser.add_argument('--resolution', '-r', default='1920:1080', help='Video resolution (default: 1920:1080)')
     parser.add_argument('--no-shuffle', action='store_true', help='Disable image shuffling')
+    parser.add_argument('--seed', type=int, help='Shuffle seed, to repeat an order (default: random, printed)')
+    parser.add_argument('--preset', default='fast', help='x264 preset (default: fast)')
+    parser.add_argument('--crf', type=int, default=23, help='x264 CRF (default: 23)')
+    parser.add_argument('--trace', metavar='OUT.json', help='Write a Chrome trace of stages and FFmpeg calls (open in ui.perfetto.dev)')
+    parser.add_argument('--profile', action='store_true', help='With --trace: also profile the Python side with cProfile')
+    parser.add_argument('--encoder-profile', help='Encoder profile JSON from encoder_tuner.py (overrides --preset/--crf)')
+    parser.add_argument('--cache-dir', help='Keep compiled render steps here and reuse them on later runs')
 
     args = parser.parse_args()
 
+    if args.profile and not args.trace:
+        parser.error('--profile needs --trace')
+
     # Validate inputs
-    if not os.path.isdir(args.images):
+    if not (os.path.isdir(args.images) or is_archive(args.images)):
         print(f"Error: Images path not found: {args.images}")
         sys.exit(1)
 
@@ -138,6 +190,9 @@ def main():
         print(f"Error: Audio file not found: {args.audio}")
         sys.exit(1)
 
+    if args.trace:
+        start_trace(args.trace, profile=args.profile)
+
     # Get images
     images = get_images(args.images)
     if not images:
@@ -150,26 +205,57 @@ def main():
     if args.no_shuffle:
         ordered_images = images
     else:
-        ordered_images = shuffle_images(images)
-        print("Images shuffled (no same folder back-to-back)")
+        seed = args.seed if args.seed is not None else random.randrange(2 ** 31)
+        ordered_images = shuffle_images(images, seed)
+        print(f"Images shuffled (folders spread apart), seed {seed}")
+
+    # Images after the audio ends would be encoded and then cut by -shortest
+    audio_duration = get_audio_duration(args.audio)
+    if audio_duration:
+        shown = max(1, int(-(-audio_duration // args.duration)))
+        if shown < len(ordered_images):
+            print(f"Audio is {audio_duration:.0f}s: using the first {shown} of {len(ordered_images)} images")
+            ordered_images = ordered_images[:shown]
 
     # Calculate total duration
     total_duration = len(ordered_images) * args.duration
     print(f"Video duration: {total_duration} seconds ({total_duration // 60}m {total_duration % 60}s)")
     print(f"Each image: {args.duration} seconds")
 
-    # Create concat file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-        concat_file = f.name
-
-    create_concat_file(ordered_images, args.duration, concat_file)
+    # Encoder settings
+    encoder = {'preset': args.preset, 'crf': args.crf}
+    if args.encoder_profile:
+        encoder = load_encoder_profile(args.encoder_profile)
+        print(f"Encoder profile: preset={encoder['preset']} crf={encoder['crf']}")
+
+    # Describe the video as a render plan: static holds, cut, audio as is
+    width, height = (int(v) for v in args.resolution.split(':'))
+    plan = build_plan(
+        [str(img) for img in ordered_images],
+        [args.duration] * len(ordered_images),
+        width, height, ken_burns=False, crossfade=False,
+        music_path=args.audio, loop_music=False, music_fades=False,
+        encoder=['-c:v', 'libx264', '-preset', encoder['preset'], '-crf', str(encoder['crf'])],
+        fps=25
+    )
 
     # Create video
     print(f"Creating video: {args.output}")
-    success = create_video(concat_file, args.audio, args.output, total_duration, args.resolution)
+    cache_dir = args.cache_dir or tempfile.mkdtemp(prefix='music_video_')
+    success = True
+    try:
+        render_plan(plan, cache_dir, args.output)
+    except subprocess.CalledProcessError as e:
+        stderr = e.stderr.decode(errors='replace') if isinstance(e.stderr, bytes) else str(e.stderr)
+        print(f"FFmpeg error: {stderr[-500:]}")
+        success = False
 
     # Cleanup
-    os.unlink(concat_file)
+    if not args.cache_dir:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    if args.trace:
+        print(f"Trace: {stop_trace()}")
 
     if success:
         size = os.path.getsize(args.output) / (1024 * 1024)
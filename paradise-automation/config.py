@@ -24,14 +24,138 @@ VIDEO_CODEC = "libx264"
 AUDIO_CODEC = "aac"
 AUDIO_BITRATE = "192k"
 
+# Encoder settings - defaults, replaced by the auto-tuned profile if present
+# (python scripts/encoder_tuner.py /path/to/images/)
+ENCODER_PRESET = "medium"
+ENCODER_CRF = 23
+ENCODER_SSIM_FLOOR = 0.97  # Minimum SSIM the tuner accepts
+ENCODER_PROFILE_PATH = os.path.join(ASSETS_DIR, "encoder_profile.json")
+
+if os.path.exists(ENCODER_PROFILE_PATH):
+    import json
+    try:
+        with open(ENCODER_PROFILE_PATH) as _f:
+            _profile = json.load(_f)
+        ENCODER_PRESET = _profile.get("preset", ENCODER_PRESET)
+        ENCODER_CRF = _profile.get("crf", ENCODER_CRF)
+    except (OSError, ValueError):
+        pass  # Unreadable or half-written profile: keep the defaults
+
+# Renditions - extra output sizes written from one render (--renditions)
+# crop: "fit" (letterbox), "fill" (centre crop), "blur" (fit over blurred copy)
+RENDITIONS = {
+    "1080p": {"width": 1920, "height": 1080, "crop": "fit"},
+    "720p": {"width": 1280, "height": 720, "crop": "fit"},
+    "short": {"width": 1080, "height": 1920, "crop": "blur"},
+}
+
+# Segment rendering - split long timelines across worker processes/nodes
+SEGMENT_SIZE = 20  # Images per segment
+SEGMENT_HEARTBEAT_INTERVAL = 5  # Seconds between worker heartbeats
+SEGMENT_HEARTBEAT_TIMEOUT = 60  # Requeue a segment after this long without one
+SEGMENT_MAX_ATTEMPTS = 3  # Give up on a segment after this many requeues
+
+# Watch mode - poll interval for folder changes (seconds)
+WATCH_POLL_INTERVAL = 2
+
+# Render plans - compiled steps are cached by content so re-renders only
+# redo what changed; the last plan per folder is kept for diffs
+RENDER_CACHE_DIR = os.path.join(TEMP_DIR, "render_cache")
+RENDER_PLAN_DIR = os.path.join(RENDER_CACHE_DIR, "plans")
+
+# Cost model (--dry-run) - every executed render step is recorded per host
+# and the most recent samples of each step class calibrate the predictions
+RENDER_HISTORY_PATH = os.path.join(ASSETS_DIR, "render_history.jsonl")
+COST_HISTORY_SAMPLES = 50  # Recent samples per step class used for calibration
+
+# Streaming output (--stream) - fragmented MP4 plus a manifest of finished
+# fragments, so an upload (--upload, scripts/uploader.py) can run alongside
+STREAM_FRAGMENT_SECONDS = 2
+UPLOAD_CHUNK_BYTES = 8 * 1024 * 1024  # Rounded down to a multiple of 256 KiB
+UPLOAD_MAX_RETRIES = 5
+
+# Output verification (scripts/verify.py, --verify) - a render is checked
+# against its timeline from the packets plus a few decoded frames at image changes
+VERIFY_OUTPUT = False
+VERIFY_DURATION_TOLERANCE = 0.1  # Seconds container/stream durations may be off
+VERIFY_MAX_KEYFRAME_SECONDS = 10.5  # x264's default GOP is 250 frames (10s at 25 fps)
+VERIFY_SAMPLE_TRANSITIONS = 8  # Image changes sampled (the last one always)
+
+# Soundtrack variants (--variants) - one silent render, one mux per track
+VARIANT_MUX_JOBS = 4  # Muxes run in parallel
+VARIANT_LENGTH_TOLERANCE = 0.05  # A track up to 5% longer than a rendered timeline reuses it
+
+# Thumbnail candidates - ranked from the render's working-resolution stills
+THUMBNAIL_CANDIDATES = 5  # Number of candidates to export with --thumbnails
+THUMBNAIL_WIDTH = 1280
+THUMBNAIL_HEIGHT = 720
+THUMBNAIL_WEIGHTS = {"sharpness": 0.4, "exposure": 0.3, "colorfulness": 0.3}
+
 # Image settings
 SUPPORTED_IMAGE_FORMATS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif')
 
+# Decoded image pool - each photo is decoded once per host at the render's
+# working resolution and shared by every clip, render and worker that needs
+# it (scripts/image_pool.py); kept in RAM (/dev/shm) where available, with
+# frames that don't fit there (/dev/shm is often 64 MB in containers) on disk
+IMAGE_POOL_ENABLED = True
+IMAGE_POOL_SPILL_DIR = os.path.join(TEMP_DIR, "image_pool")
+IMAGE_POOL_DIR = "/dev/shm/passparadise_image_pool" if os.path.isdir("/dev/shm") else IMAGE_POOL_SPILL_DIR
+IMAGE_POOL_MAX_MB = 1024  # Least recently used frames are evicted above this
+IMAGE_POOL_MIN_AGE = 60  # Seconds a frame is kept after its last use, even over the cap
+
+# Near-duplicate detection (--dedup) - max differing bits out of 64
+IMAGE_HASH_CACHE = os.path.join(ASSETS_DIR, "image_hashes.json")
+DEDUP_PHASH_THRESHOLD = 8
+DEDUP_DHASH_THRESHOLD = 12
+
+# Music catalog - every local track probed once, analysed on first use (scripts/music_catalog.py)
+MUSIC_CATALOG_PATH = os.path.join(MUSIC_DIR, "catalog.sqlite")
+
 # Music settings - Full volume (no narration to mix with)
 BACKGROUND_MUSIC_VOLUME = 1.0  # 100% volume
 
+# Loudness normalization (EBU R128, --normalize) - measured once per track, cached
+LOUDNESS_NORMALIZATION = False
+LOUDNESS_TARGET_LUFS = -14.0  # YouTube playback reference
+LOUDNESS_TRUE_PEAK = -1.0  # dBTP ceiling for the applied gain
+LOUDNESS_CACHE_DIR = os.path.join(ASSETS_DIR, "loudness")
+
+# Music trim (--skip auto) - leading silence / spoken intro and trailing
+# silence are detected once per track (scripts/audio_analysis.py) and cut
+# with a seek when the music is muxed
+AUDIO_ANALYSIS_CACHE_DIR = os.path.join(ASSETS_DIR, "audio_analysis")
+AUDIO_SILENCE_DB = 40  # Quieter than this below the track's loud level is silence
+AUDIO_INTRO_MAX_SECONDS = 60  # Only look this far for a spoken intro
+
+# Disk budgets (scripts/storage.py) - caches over budget are trimmed least
+# recently used first; entries unused for max_age_days are always removed.
+# Paths in keep are never trimmed (saved plans are what renders diff against);
+# pool budgets are trimmed by ImagePool.evict(), which spares frames in use
+STORAGE_BUDGETS = {
+    "render_cache": {"path": RENDER_CACHE_DIR, "max_gb": 20, "max_age_days": 14, "keep": [RENDER_PLAN_DIR]},
+    "watch": {"path": TEMP_DIR, "prefix": "watch_", "max_gb": 10, "max_age_days": 30},
+    "youtube_music": {"path": YOUTUBE_MUSIC_DIR, "max_gb": 2, "max_age_days": 90},
+    "image_pool": {"path": IMAGE_POOL_DIR, "max_gb": IMAGE_POOL_MAX_MB / 1024, "max_age_days": 1, "pool": True},
+}
+if IMAGE_POOL_SPILL_DIR != IMAGE_POOL_DIR:
+    STORAGE_BUDGETS["image_pool_spill"] = {
+        "path": IMAGE_POOL_SPILL_DIR, "max_gb": IMAGE_POOL_MAX_MB / 1024, "max_age_days": 1, "pool": True
+    }
+STORAGE_MIN_FREE_GB = 5  # Free space needed before a render starts
+STORAGE_ORPHAN_HOURS = 6  # Job dirs in temp/ without a live owner older than this are removed
+STORAGE_PARTIAL_HOURS = 1  # Partial downloads/outputs (*_temp.*, *.part.*) older than this are removed
+
 # Effects settings
 KEN_BURNS_ENABLED = True
+# How images that don't match the frame's aspect ratio are framed:
+# "classic" stretches them for Ken Burns and letterboxes them otherwise,
+# "blur" fits portrait/odd-ratio images over a blurred copy of themselves
+FRAMING = "classic"
+# Animated GIF/WebP sources play in their clips (decoded once into the
+# image pool): "loop" at their own speed, "stretch" one playthrough retimed
+# to the image's hold
+ANIMATION_TIMING = "loop"
 CROSSFADE_ENABLED = True
 CROSSFADE_DURATION = 0.5  # Longer crossfade for sensual mood
 
@@ -39,6 +163,10 @@ CROSSFADE_DURATION = 0.5  # Longer crossfade for sensual mood
 TARGET_VIDEO_DURATION = 150  # 2.5 minutes default (in seconds)
 MIN_IMAGE_DURATION = 3  # Minimum seconds per image
 MAX_IMAGE_DURATION = 10  # Maximum seconds per image
+# When images don't fit the track at MIN_IMAGE_DURATION (see scripts/timeline.py):
+# "drop" (skip the tail), "subsample" (pick evenly), "spread" (shorten), "loop" (loop music)
+TIMELINE_POLICY = "drop"
+BEAT_SYNC = False  # Move image changes onto the music's beats (--beat-sync)
 
 # Attribution text (for CC BY licensed music)
 ATTRIBUTION_TEMPLATE = """
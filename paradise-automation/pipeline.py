@@ -16,7 +16,10 @@ Usage:
 """
 import os
 import sys
+import json
 import argparse
+import contextlib
+import threading
 import shutil
 from datetime import datetime
 
@@ -24,16 +27,140 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import (
-    OUTPUT_DIR, TEMP_DIR, VIDEO_WIDTH, VIDEO_HEIGHT,
-    KEN_BURNS_ENABLED, CROSSFADE_ENABLED, CROSSFADE_DURATION,
-    BACKGROUND_MUSIC_VOLUME
+    OUTPUT_DIR, TEMP_DIR, BACKGROUND_MUSIC_VOLUME, THUMBNAIL_CANDIDATES, LOUDNESS_NORMALIZATION,
+    LOUDNESS_TARGET_LUFS, TIMELINE_POLICY, BEAT_SYNC, RENDER_PLAN_DIR, VARIANT_MUX_JOBS,
+    STORAGE_MIN_FREE_GB, RENDER_CACHE_DIR, VERIFY_OUTPUT
 )
 from scripts.image_loader import load_images_from_folder
-from scripts.video_assembler import assemble_slideshow, get_audio_duration
+from scripts.archive import is_archive
+from scripts.dedup import remove_near_duplicates
+from scripts.loudness import gain_for
+from scripts.music_catalog import lookup, beat_grid
+from scripts.video_assembler import assemble_slideshow
 from scripts.music_downloader import get_music_path, get_attribution, MUSIC_TRACKS
 from scripts.youtube_audio import extract_audio
+from scripts.renditions import get_renditions, rendition_output_path
+from scripts.thumbnails import pick_thumbnails
+from scripts.video_assembler import still_path
+from scripts.watch_folder import watch_folder
+from scripts.tracing import start_trace, stop_trace, traced
+from scripts.timeline import plan_timeline, snap_to_beats, TIMELINE_POLICIES
+from scripts.variants import render_variants
+from scripts.storage import prepare_storage, claim_job_dir
+from scripts.render_plan import build_plan, optimize_plan, compile_plan
+from scripts.cost_model import estimate
+from scripts.streaming import manifest_path
+from scripts.uploader import upload_stream, UploadError
+from scripts.verify import verify_output, describe, VerificationError
+from scripts.render_settings import RenderSettings
+
+
+class PipelineError(Exception):
+    """A run that can't finish (no music, a failed verification); main() exits 1."""
+
+
+@traced
+def get_music(
+    music_track: str = None,
+    youtube_url: str = None,
+    music_file: str = None
+) -> tuple:
+    """
+    Resolve the music source to a local file (untrimmed, see get_music_trim()).
 
+    Returns:
+        (music_path, attribution) - raises PipelineError on failure
+    """
+    music_path = None
+    attribution = ""
+
+    if music_file and os.path.exists(music_file):
+        music_path = music_file
+        print(f"  Using provided file: {music_file}")
+    elif youtube_url:
+        print(f"  Extracting from YouTube: {youtube_url}")
+        music_path = extract_audio(youtube_url)
+        if not music_path:
+            raise PipelineError("Failed to extract audio from YouTube")
+        print(f"  Extracted: {music_path}")
+    else:
+        track_id = music_track or "sensual_latin"
+        print(f"  Downloading track: {track_id}")
+        music_path = get_music_path(track_id)
+        if not music_path:
+            raise PipelineError(f"Failed to get music track: {track_id}")
+        attribution = get_attribution(track_id)
+        print(f"  Using: {music_path}")
 
+    duration = lookup(music_path)["duration"]
+    print(f"  Duration: {duration:.1f}s ({duration/60:.1f} min)")
+    return music_path, attribution
+
+
+def get_music_trim(music_path: str, skip_seconds: float = None) -> tuple:
+    """
+    Part of the track to use, as (start, end) seconds.
+
+    skip_seconds=None detects leading/trailing silence and, for YouTube
+    audio, a spoken intro (scripts/audio_analysis.py); a number skips that
+    many seconds of YouTube audio. The cut is applied as a seek at mux time.
+    Both come from the music catalog (scripts/music_catalog.py); the track
+    is only analysed for the automatic trim.
+    """
+    if skip_seconds is not None:
+        track = lookup(music_path)
+        duration = track["duration"]
+        start = min(skip_seconds, duration) if track["source"] == "youtube" else 0.0
+        if start:
+            print(f"  Skipping first {start:.1f} seconds")
+        return start, duration
+
+    track = lookup(music_path, analysis=True)
+    skipped = "intro" if track["intro"] else "silence"
+    print(f"  Using {track['trim_start']:.1f}s - {track['trim_end']:.1f}s of {track['duration']:.1f}s "
+          f"(auto: {skipped} skipped)")
+    return track["trim_start"], track["trim_end"]
+
+
+def sync_to_beats(plan: dict, music_path: str, music_start: float, settings: RenderSettings = None) -> dict:
+    """Move a timeline's image changes onto the track's beats (see snap_to_beats())."""
+    settings = settings or RenderSettings()
+    tempo, beats = beat_grid(music_path)
+    plan = snap_to_beats(
+        plan, beats, music_start, settings.fps, settings.min_image_duration, settings.max_image_duration
+    )
+    if tempo:
+        print(f"  Beat sync: {plan['snapped']} of {len(plan['frames']) - 1} image changes "
+              f"on the beat ({tempo:.0f} BPM)")
+    else:
+        print("  Beat sync: no steady beat found; images stay evenly spaced")
+    return plan
+
+
+def parse_skip(value: str):
+    """--skip value: 'auto' (None) or seconds."""
+    if value == "auto":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected 'auto' or seconds, got {value!r}")
+
+
+def get_music_volume(music_path: str, normalize: bool = LOUDNESS_NORMALIZATION) -> float:
+    """Music volume including the cached loudness normalization gain."""
+    music_volume = BACKGROUND_MUSIC_VOLUME
+    if normalize:
+        track = lookup(music_path, loudness=True)
+        gain = gain_for(track["loudness"], track["true_peak"])
+        music_volume *= gain
+        if track["loudness"] is not None:
+            print(f"  Loudness: {track['loudness']:.1f} LUFS -> gain x{gain:.2f} "
+                  f"(target {LOUDNESS_TARGET_LUFS} LUFS)")
+    return music_volume
+
+
+@traced
 def generate_video(
     images_folder: str,
     music_track: str = None,
@@ -42,39 +169,76 @@ def generate_video(
     output_path: str = None,
     use_effects: bool = True,
     sort_by: str = "date_modified",
-    skip_seconds: float = 0
+    skip_seconds: float = None,
+    renditions: str = None,
+    workers: int = 0,
+    spool_dir: str = None,
+    thumbnails: int = 0,
+    dedup: str = None,
+    normalize: bool = LOUDNESS_NORMALIZATION,
+    stream: bool = False,
+    upload_url: str = None,
+    beat_sync: bool = BEAT_SYNC,
+    verify: bool = VERIFY_OUTPUT,
+    settings: RenderSettings = None
 ) -> str:
     """
     Generate a romantic slideshow video from images with music.
 
     Args:
-        images_folder: Path to folder containing images
+        images_folder: Path to folder (or .zip archive) containing images
         music_track: Predefined music track ID (e.g., 'sensual_latin')
         youtube_url: YouTube URL to extract audio from
         music_file: Direct path to music file
         output_path: Custom output path
-        use_effects: Enable Ken Burns and crossfade (default True)
+        use_effects: False turns off settings' Ken Burns and crossfade
         sort_by: How to sort images (date_modified, filename, random)
-        skip_seconds: Skip first N seconds of YouTube audio (default 0)
+        skip_seconds: Skip first N seconds of YouTube audio (None = detect
+                      silence and intros automatically)
+        renditions: Comma separated rendition names from config.RENDITIONS
+                    (or 'all'); each is written as <output>_<name>.mp4
+        workers: Local worker processes for segment rendering (0 = off)
+        spool_dir: Shared spool directory for segment workers on other nodes
+        thumbnails: Number of ranked thumbnail candidates to export (0 = off)
+        dedup: Drop near-duplicate images, keeping the "first" or "sharpest"
+               of each cluster (None = keep all)
+        normalize: Apply EBU R128 gain to the music (measured once per track)
+        stream: Write the output as fragmented MP4 while rendering, with a
+                manifest of finished fragments (see scripts/streaming.py)
+        upload_url: Resumable upload session to send the output to while it
+                    renders (implies stream, see scripts/uploader.py)
+        beat_sync: Move image changes onto the music's beats
+        verify: Check the output against the timeline before reporting
+                success (see scripts/verify.py); raises PipelineError if it fails
+        settings: Size, frame rate, encoder, effects and timing of this job,
+                  including what to do with images the music can't fit
+                  (see scripts/render_settings.py; default: config.py)
 
     Returns:
-        Path to the generated video
+        Path to the generated video (first rendition if renditions is set)
     """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     folder_name = os.path.basename(os.path.normpath(images_folder))
+    if is_archive(images_folder):
+        folder_name = os.path.splitext(folder_name)[0]
 
     # Create working directories
-    work_dir = os.path.join(TEMP_DIR, f"{folder_name}_{timestamp}")
-    os.makedirs(work_dir, exist_ok=True)
+    # Claimed so a crash leaves a directory the next run can reclaim
+    work_dir = claim_job_dir(os.path.join(TEMP_DIR, f"{folder_name}_{timestamp}"))
 
     # Set output path
     if output_path is None:
         output_path = os.path.join(OUTPUT_DIR, f"{folder_name}_{timestamp}.mp4")
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    # Determine settings
-    ken_burns = KEN_BURNS_ENABLED and use_effects
-    crossfade = CROSSFADE_ENABLED and use_effects
+    rendition_specs = get_renditions(renditions) if renditions else None
+
+    # Determine settings, fixed for the whole job
+    settings = settings or RenderSettings()
+    if not use_effects:
+        settings = settings.replace(ken_burns=False, crossfade=False)
+    timeline_policy = settings.timeline_policy
+    ken_burns, crossfade = settings.ken_burns, settings.crossfade
 
     print("=" * 60)
     print("PASSPARADISE - Romantic Slideshow Generator")
@@ -83,70 +247,142 @@ def generate_video(
     print(f"Output: {output_path}")
     print("-" * 60)
     print(f"Effects: Ken Burns={ken_burns}, Crossfade={crossfade}")
+    print(f"Video: {settings.width}x{settings.height} @ {settings.fps} fps, framing {settings.framing}")
+    if rendition_specs:
+        print(f"Renditions: {', '.join(rendition_specs)}")
     print("=" * 60)
 
     # Step 1: Load images
     print("\n[1/4] Loading images...")
     images = load_images_from_folder(images_folder, sort_by)
     print(f"  Found {len(images)} images (sorted by {sort_by})")
+    if dedup:
+        images, clusters = remove_near_duplicates(images, keep=dedup)
+        removed = sum(len(c) - 1 for c in clusters)
+        print(f"  Removed {removed} near-duplicates from {len(clusters)} clusters (kept {dedup})")
 
     # Step 2: Get music
     print("\n[2/4] Getting music...")
-    music_path = None
-    attribution = ""
-
-    if music_file and os.path.exists(music_file):
-        music_path = music_file
-        print(f"  Using provided file: {music_file}")
-    elif youtube_url:
-        print(f"  Extracting from YouTube: {youtube_url}")
-        if skip_seconds > 0:
-            print(f"  Skipping first {skip_seconds} seconds")
-        music_path = extract_audio(youtube_url, skip_seconds=skip_seconds)
-        if not music_path:
-            print("  ERROR: Failed to extract audio from YouTube")
-            sys.exit(1)
-        print(f"  Extracted: {music_path}")
-    else:
-        track_id = music_track or "sensual_latin"
-        print(f"  Downloading track: {track_id}")
-        music_path = get_music_path(track_id)
-        if not music_path:
-            print(f"  ERROR: Failed to get music track: {track_id}")
-            sys.exit(1)
-        attribution = get_attribution(track_id)
-        print(f"  Using: {music_path}")
-
-    duration = get_audio_duration(music_path)
-    print(f"  Duration: {duration:.1f}s ({duration/60:.1f} min)")
+    music_path, attribution = get_music(music_track, youtube_url, music_file)
+    music_start, music_end = get_music_trim(music_path, skip_seconds)
+    music_volume = get_music_volume(music_path, normalize)
+
+    # Plan the timeline so only footage that reaches the output is rendered
+    music_duration = music_end - music_start
+    plan = plan_timeline(
+        images, music_duration, timeline_policy, crossfade, settings.crossfade_duration,
+        settings.fps, settings.min_image_duration, settings.max_image_duration
+    )
+    if beat_sync:
+        plan = sync_to_beats(plan, music_path, music_start, settings)
+    images = plan["images"]
+    print(f"  Timeline: {len(images)} images, {plan['total_frames'] / settings.fps:.1f}s "
+          f"for {music_duration:.1f}s of music")
+    if plan["dropped"]:
+        print(f"  {plan['dropped']} images don't fit the track ({timeline_policy}); not rendered")
+
+    # Upload alongside the render: the uploader follows the fragment manifest
+    upload = None
+    if upload_url:
+        stream = True
+        # Nothing left from an earlier render may look like this one's output
+        for path in (output_path, manifest_path(output_path)):
+            if os.path.exists(path):
+                os.remove(path)
+        upload = {}
+
+        def send():
+            try:
+                upload["result"] = upload_stream(output_path, upload_url, quiet=True)
+            except (UploadError, OSError) as e:
+                upload["error"] = e
+
+        upload["thread"] = threading.Thread(target=send, daemon=True)
+        upload["thread"].start()
+        print(f"  Uploading while rendering to: {upload_url}")
 
     # Step 3: Assemble video
     print("\n[3/4] Assembling video...")
+    stills_dir = os.path.join(work_dir, "stills") if thumbnails else None
     assemble_slideshow(
         images=images,
         music_path=music_path,
         output_path=output_path,
         temp_dir=work_dir,
-        width=VIDEO_WIDTH,
-        height=VIDEO_HEIGHT,
-        ken_burns=ken_burns,
-        crossfade=crossfade,
-        crossfade_duration=CROSSFADE_DURATION,
-        music_volume=BACKGROUND_MUSIC_VOLUME
+        music_volume=music_volume,
+        renditions=rendition_specs,
+        workers=workers,
+        spool_dir=spool_dir,
+        stills_dir=stills_dir,
+        durations=plan["durations"],
+        plan_path=os.path.join(RENDER_PLAN_DIR, f"{folder_name}.json"),
+        music_start=music_start,
+        stream=stream,
+        settings=settings
     )
 
+    if rendition_specs:
+        output_paths = [rendition_output_path(output_path, name) for name in rendition_specs]
+    else:
+        output_paths = [output_path]
+
+    # Check the output against the timeline before anything reports success
+    failed = []
+    if verify:
+        print("Verifying output...")
+        fade = settings.fade_frames(len(images))
+        sizes = ([(spec["width"], spec["height"]) for spec in rendition_specs.values()]
+                 if rendition_specs else [(settings.width, settings.height)])
+        for path, (width, height) in zip(output_paths, sizes):
+            try:
+                result = verify_output(path, plan["frames"], fade, settings.fps, width, height, sources=images)
+            except VerificationError as e:
+                result = {"ok": False, "problems": [str(e)]}
+            else:
+                print(f"  {os.path.basename(path)}: {describe(result)}")
+            for problem in result["problems"]:
+                print(f"  ERROR: {problem}")
+            if not result["ok"]:
+                failed.append(path)
+
+    if upload:
+        print("Finishing upload...")
+        upload["thread"].join()
+        if "error" in upload:
+            print(f"  ERROR: Upload failed: {upload['error']} (the video is saved locally)")
+        else:
+            result = upload["result"]
+            print(f"  Uploaded {result['bytes'] / (1024 * 1024):.1f} MB; "
+                  f"{result['sent_before_finish'] / (1024 * 1024):.1f} MB were sent before the render finished")
+
+    thumbnail_dir = None
+    if thumbnails:
+        print("Picking thumbnail candidates...")
+        thumbnail_dir = os.path.splitext(output_path)[0] + "_thumbnails"
+        stills = [still_path(stills_dir, i) for i in range(len(images))]
+        picked = pick_thumbnails(stills, thumbnail_dir, thumbnails, sources=images)
+        print(f"  Saved {len(picked)} candidates to {thumbnail_dir}")
+
     # Step 4: Cleanup
     print("\n[4/4] Cleaning up temporary files...")
     shutil.rmtree(work_dir, ignore_errors=True)
 
+    if failed:
+        print("\n" + "=" * 60)
+        print(f"VIDEO FAILED VERIFICATION: {', '.join(failed)}")
+        if upload:
+            print("It was uploaded while rendering - don't publish it")
+        print("=" * 60)
+        raise PipelineError(f"Video failed verification: {', '.join(failed)}")
+
     print("\n" + "=" * 60)
     print("VIDEO GENERATION COMPLETE!")
     print("=" * 60)
-    print(f"Output: {output_path}")
-
-    # Get video file size
-    size_mb = os.path.getsize(output_path) / (1024 * 1024)
-    print(f"Size: {size_mb:.1f} MB")
+    for path in output_paths:
+        # Get video file size
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"Output: {path}")
+        print(f"Size: {size_mb:.1f} MB")
 
     # Show features used
     features = []
@@ -155,6 +391,8 @@ def generate_video(
     if crossfade:
         features.append("Crossfade")
     print(f"Features: {', '.join(features) if features else 'Basic'}")
+    if thumbnail_dir:
+        print(f"Thumbnails: {thumbnail_dir}")
 
     # Show attribution if needed
     if attribution:
@@ -164,7 +402,241 @@ def generate_video(
 
     print("=" * 60)
 
-    return output_path
+    return output_paths[0]
+
+
+def estimate_render(
+    images_folder: str,
+    music_track: str = None,
+    youtube_url: str = None,
+    music_file: str = None,
+    sort_by: str = "date_modified",
+    skip_seconds: float = None,
+    thumbnails: int = 0,
+    dedup: str = None,
+    normalize: bool = LOUDNESS_NORMALIZATION,
+    beat_sync: bool = BEAT_SYNC,
+    settings: RenderSettings = None
+) -> dict:
+    """
+    Plan a render without encoding anything and predict its cost (--dry-run).
+
+    Images are loaded, the music is resolved and analysed, and the timeline
+    and render plan are built exactly as generate_video() would; the
+    compiled steps are then priced by scripts/cost_model.py from this host's
+    render history. Steps already in the render cache cost nothing.
+
+    Returns:
+        Dict with "plan", "steps", "predicted" and "calibration"
+    """
+    settings = settings or RenderSettings()
+    timeline_policy = settings.timeline_policy
+
+    images = load_images_from_folder(images_folder, sort_by)
+    found = len(images)
+    if dedup:
+        images, _ = remove_near_duplicates(images, keep=dedup)
+
+    music_path, _ = get_music(music_track, youtube_url, music_file)
+    music_start, music_end = get_music_trim(music_path, skip_seconds)
+    music_volume = get_music_volume(music_path, normalize)
+    music_duration = music_end - music_start
+
+    timeline = plan_timeline(
+        images, music_duration, timeline_policy, settings.crossfade, settings.crossfade_duration,
+        settings.fps, settings.min_image_duration, settings.max_image_duration
+    )
+    if beat_sync:
+        timeline = sync_to_beats(timeline, music_path, music_start, settings)
+    plan = build_plan(
+        timeline["images"], timeline["durations"], settings.width, settings.height,
+        settings.ken_burns, settings.crossfade, settings.crossfade_duration,
+        music_path, music_volume, audio_bitrate=settings.audio_bitrate, encoder=settings.encoder_args(),
+        fps=settings.fps, music_start=music_start, framing=settings.framing, audio_codec=settings.audio_codec,
+        animation_timing=settings.animation_timing
+    )
+    # The output path only names the mux step; nothing is written
+    steps = compile_plan(optimize_plan(plan), RENDER_CACHE_DIR, os.devnull, stills=bool(thumbnails))
+    predicted = estimate(steps)
+
+    by_kind = {}
+    for step in steps:
+        by_kind[step["kind"]] = by_kind.get(step["kind"], 0) + 1
+    durations = timeline["durations"]
+    return {
+        "plan": {
+            "images_found": found,
+            "images": len(timeline["images"]),
+            "dropped": timeline["dropped"],
+            "policy": timeline_policy,
+            "beats_snapped": timeline.get("snapped"),
+            "seconds_per_image": [round(min(durations), 2), round(max(durations), 2)] if durations else [],
+            "transition": plan["transition"],
+            "ken_burns": settings.ken_burns,
+            "music": music_path,
+            "music_seconds": round(music_duration, 2),
+            "video_seconds": round(timeline["total_frames"] / settings.fps, 2),
+            "audio_bitrate": settings.audio_bitrate
+        },
+        "steps": {
+            "total": len(steps),
+            "to_run": predicted["steps_to_run"],
+            "cached": predicted["steps_cached"],
+            "by_kind": by_kind
+        },
+        "predicted": {
+            "wall_seconds": predicted["wall_seconds"],
+            "cpu_seconds": predicted["cpu_seconds"],
+            "peak_temp_disk_bytes": predicted["temp_disk_bytes"],
+            "output_bytes": predicted["output_bytes"]
+        },
+        "calibration": {
+            "calibrated": predicted["calibrated"],
+            "by_class": predicted["by_class"]
+        }
+    }
+
+
+def resolve_variant(source: str, skip_seconds: float = None) -> tuple:
+    """
+    A --variants entry (track ID, YouTube URL or music file) ->
+    (name, music_path, attribution, (start, end)).
+    """
+    name = None
+    if source in MUSIC_TRACKS:
+        music_path, attribution = get_music(music_track=source)
+        name = source
+    elif source.startswith(("http://", "https://")):
+        music_path, attribution = get_music(youtube_url=source)
+    elif os.path.isfile(source):
+        music_path, attribution = get_music(music_file=source)
+    else:
+        raise PipelineError(f"Not a track, URL or file: {source}")
+    name = name or os.path.splitext(os.path.basename(music_path))[0]
+    return name, music_path, attribution, get_music_trim(music_path, skip_seconds)
+
+
+@traced
+def generate_variants(
+    images_folder: str,
+    sources: list,
+    output_path: str = None,
+    sort_by: str = "date_modified",
+    skip_seconds: float = None,
+    dedup: str = None,
+    normalize: bool = LOUDNESS_NORMALIZATION,
+    jobs: int = VARIANT_MUX_JOBS,
+    settings: RenderSettings = None
+) -> dict:
+    """
+    Generate the same slideshow with several soundtracks (see scripts/variants.py).
+
+    Args:
+        sources: Track IDs, YouTube URLs or music files, one per variant
+        output_path: Base output path; each variant is <base>_<name>.mp4
+        jobs: Muxes to run in parallel
+        (other arguments as for generate_video)
+
+    Returns:
+        Dict of variant name -> output path
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    folder_name = os.path.basename(os.path.normpath(images_folder))
+    if is_archive(images_folder):
+        folder_name = os.path.splitext(folder_name)[0]
+    if output_path is None:
+        output_path = os.path.join(OUTPUT_DIR, f"{folder_name}_{timestamp}.mp4")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    settings = settings or RenderSettings()
+
+    print("=" * 60)
+    print("PASSPARADISE - Soundtrack Variants")
+    print("=" * 60)
+    print(f"Images: {images_folder}")
+    print(f"Variants: {len(sources)}")
+    print("=" * 60)
+
+    print("\n[1/3] Loading images...")
+    images = load_images_from_folder(images_folder, sort_by)
+    print(f"  Found {len(images)} images (sorted by {sort_by})")
+    if dedup:
+        images, clusters = remove_near_duplicates(images, keep=dedup)
+        removed = sum(len(c) - 1 for c in clusters)
+        print(f"  Removed {removed} near-duplicates from {len(clusters)} clusters (kept {dedup})")
+
+    print("\n[2/3] Getting music...")
+    variants = []
+    attributions = {}
+    for source in sources:
+        name, music_path, attribution, (start, end) = resolve_variant(source, skip_seconds)
+        # Two files with the same name still need two outputs
+        base, n = name, 2
+        while any(v["name"] == name for v in variants):
+            name, n = f"{base}_{n}", n + 1
+        variants.append({
+            "name": name,
+            "music_path": music_path,
+            "start": start,
+            "duration": end - start,
+            "volume": get_music_volume(music_path, normalize)
+        })
+        if attribution:
+            attributions[name] = attribution
+
+    print("\n[3/3] Rendering...")
+    outputs = render_variants(
+        images, variants, output_path,
+        jobs=jobs,
+        settings=settings
+    )
+
+    print("\n" + "=" * 60)
+    print("VARIANTS COMPLETE!")
+    print("=" * 60)
+    for name, path in outputs.items():
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"{name}: {path} ({size_mb:.1f} MB)")
+    for name, attribution in attributions.items():
+        print("\n" + "-" * 60)
+        print(f"ATTRIBUTION for {name} (add to video description):")
+        print(attribution)
+    print("=" * 60)
+
+    return outputs
+
+
+def watch(args, settings: RenderSettings):
+    """Watch mode: render, then re-render incrementally on every change."""
+    folder_name = os.path.basename(os.path.normpath(args.images_folder))
+    output_path = args.output or os.path.join(OUTPUT_DIR, f"{folder_name}_watch.mp4")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    print("=" * 60)
+    print("PASSPARADISE - Watch Mode")
+    print("=" * 60)
+    print(f"Images: {args.images_folder}")
+    print(f"Output: {output_path}")
+    print("\nGetting music...")
+    music_path, _ = get_music(args.music, args.youtube_url, args.music_file)
+    music_start, music_end = get_music_trim(music_path, args.skip)
+    music_volume = get_music_volume(music_path, args.normalize)
+    print("\nWatching for changes (Ctrl+C to stop)...")
+
+    try:
+        watch_folder(
+            args.images_folder,
+            music_path,
+            output_path,
+            sort_by=args.sort,
+            music_volume=music_volume,
+            relock=args.relock,
+            music_start=music_start,
+            music_end=music_end,
+            settings=settings
+        )
+    except KeyboardInterrupt:
+        print("\nStopped watching")
 
 
 def main():
@@ -188,7 +660,7 @@ Available music tracks:
     )
     parser.add_argument(
         "images_folder",
-        help="Path to folder containing images"
+        help="Path to folder (or .zip archive) containing images"
     )
     parser.add_argument(
         "--output", "-o",
@@ -206,9 +678,10 @@ Available music tracks:
     )
     parser.add_argument(
         "--skip", "-s",
-        type=float,
-        default=10,
-        help="Skip first N seconds of YouTube audio (default: 10)"
+        type=parse_skip,
+        default="auto",
+        help="Skip first N seconds of YouTube audio, or 'auto' to detect silence "
+             "and spoken intros (default: auto)"
     )
     parser.add_argument(
         "--music-file", "-f",
@@ -225,6 +698,110 @@ Available music tracks:
         action="store_true",
         help="Disable Ken Burns and crossfade effects"
     )
+    parser.add_argument(
+        "--renditions",
+        help="Write several sizes from one render, e.g. '1080p,720p,short' or 'all'"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Render timeline segments on N local worker processes"
+    )
+    parser.add_argument(
+        "--spool",
+        dest="spool_dir",
+        help="Shared spool directory for segment workers on other nodes"
+    )
+    parser.add_argument(
+        "--thumbnails",
+        type=int,
+        nargs="?",
+        const=THUMBNAIL_CANDIDATES,
+        default=0,
+        metavar="N",
+        help=f"Export N ranked thumbnail candidates (default N: {THUMBNAIL_CANDIDATES})"
+    )
+    parser.add_argument(
+        "--dedup",
+        nargs="?",
+        const="first",
+        choices=["first", "sharpest"],
+        help="Drop near-duplicate images, keeping the first (default) or sharpest of each group"
+    )
+    parser.add_argument(
+        "--normalize",
+        action=argparse.BooleanOptionalAction,
+        default=LOUDNESS_NORMALIZATION,
+        help=f"Normalize the music's loudness to {LOUDNESS_TARGET_LUFS:g} LUFS "
+             f"(default: {'on' if LOUDNESS_NORMALIZATION else 'off'})"
+    )
+    parser.add_argument(
+        "--fit",
+        choices=TIMELINE_POLICIES,
+        help=f"Images the music can't fit: drop the tail, subsample evenly, "
+             f"spread (shorter clips) or loop the music (default: {TIMELINE_POLICY})"
+    )
+    parser.add_argument(
+        "--beat-sync",
+        action=argparse.BooleanOptionalAction,
+        default=BEAT_SYNC,
+        help=f"Change images on the music's beats (within the min/max seconds per image; "
+             f"default: {'on' if BEAT_SYNC else 'off'})"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep watching the folder and re-render only changed clips"
+    )
+    parser.add_argument(
+        "--relock",
+        action="store_true",
+        help="With --watch: recompute seconds per image from the music"
+    )
+    parser.add_argument(
+        "--variants",
+        nargs="+",
+        metavar="TRACK",
+        help="Render once and write one video per soundtrack (track IDs, YouTube URLs or files)"
+    )
+    parser.add_argument(
+        "--variant-jobs",
+        type=int,
+        default=VARIANT_MUX_JOBS,
+        help=f"With --variants: soundtrack muxes to run in parallel (default: {VARIANT_MUX_JOBS})"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write fragmented MP4 while rendering, with a manifest of finished fragments"
+    )
+    parser.add_argument(
+        "--upload",
+        metavar="SESSION_URL",
+        help="Upload to a resumable upload session while rendering (implies --stream)"
+    )
+    parser.add_argument(
+        "--verify",
+        action=argparse.BooleanOptionalAction,
+        default=VERIFY_OUTPUT,
+        help=f"Check the output against the timeline after rendering (default: {'on' if VERIFY_OUTPUT else 'off'})"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Plan the render and print its predicted time, CPU, disk and size as JSON; encode nothing"
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="OUT.json",
+        help="Write a Chrome trace of stages and FFmpeg calls (open in ui.perfetto.dev)"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="With --trace: also profile the Python side with cProfile"
+    )
     parser.add_argument(
         "--list-music",
         action="store_true",
@@ -233,25 +810,123 @@ Available music tracks:
 
     args = parser.parse_args()
 
+    if args.profile and not args.trace:
+        parser.error("--profile needs --trace")
+
     if args.list_music:
         from scripts.music_downloader import list_tracks
         list_tracks()
         return
 
-    if not os.path.isdir(args.images_folder):
+    if not (os.path.isdir(args.images_folder) or is_archive(args.images_folder)):
         print(f"Error: Folder not found: {args.images_folder}")
         sys.exit(1)
 
-    generate_video(
-        images_folder=args.images_folder,
-        music_track=args.music,
-        youtube_url=args.youtube_url,
-        music_file=args.music_file,
-        output_path=args.output,
-        use_effects=not args.no_effects,
-        sort_by=args.sort,
-        skip_seconds=args.skip
-    )
+    if args.watch and is_archive(args.images_folder):
+        print("Error: --watch needs a folder, not an archive")
+        sys.exit(1)
+
+    if args.watch:
+        # Watch mode renders every image at a locked duration, straight to one output
+        ignored = [flag for flag, value in (("--dedup", args.dedup), ("--fit", args.fit),
+                                            ("--thumbnails", args.thumbnails), ("--verify", args.verify)) if value]
+        if ignored:
+            parser.error(f"--watch can't be combined with {', '.join(ignored)}")
+
+    if args.variants and (args.watch or args.renditions or args.workers or args.spool_dir):
+        print("Error: --variants can't be combined with --watch, --renditions, --workers or --spool")
+        sys.exit(1)
+
+    if args.beat_sync and (args.watch or args.variants):
+        print("Error: --beat-sync can't be combined with --watch or --variants (use --no-beat-sync)")
+        sys.exit(1)
+
+    if (args.stream or args.upload) and (args.watch or args.variants or args.renditions or args.dry_run):
+        print("Error: --stream/--upload can't be combined with --watch, --variants, --renditions or --dry-run")
+        sys.exit(1)
+
+    if args.dry_run and (args.watch or args.variants or args.renditions):
+        print("Error: --dry-run can't be combined with --watch, --variants or --renditions")
+        sys.exit(1)
+
+    # The job's settings, fixed for the whole run
+    settings = RenderSettings()
+    if args.no_effects:
+        settings = settings.replace(ken_burns=False, crossfade=False)
+    if args.fit:
+        settings = settings.replace(timeline_policy=args.fit)
+
+    if args.dry_run:
+        # Progress goes to stderr so stdout is only the JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            result = estimate_render(
+                images_folder=args.images_folder,
+                music_track=args.music,
+                youtube_url=args.youtube_url,
+                music_file=args.music_file,
+                sort_by=args.sort,
+                skip_seconds=args.skip,
+                thumbnails=args.thumbnails,
+                dedup=args.dedup,
+                normalize=args.normalize,
+                beat_sync=args.beat_sync,
+                settings=settings
+            )
+        print(json.dumps(result, indent=2))
+        return
+
+    # Reclaim crashed jobs' directories and trim caches before using more disk
+    if not prepare_storage():
+        print(f"Error: Less than {STORAGE_MIN_FREE_GB} GB free, even after clearing caches")
+        sys.exit(1)
+
+    if args.trace:
+        start_trace(args.trace, profile=args.profile)
+    try:
+        if args.watch:
+            watch(args, settings)
+            return
+
+        if args.variants:
+            generate_variants(
+                images_folder=args.images_folder,
+                sources=args.variants,
+                output_path=args.output,
+                sort_by=args.sort,
+                skip_seconds=args.skip,
+                dedup=args.dedup,
+                normalize=args.normalize,
+                jobs=args.variant_jobs,
+                settings=settings
+            )
+            return
+
+        generate_video(
+            images_folder=args.images_folder,
+            music_track=args.music,
+            youtube_url=args.youtube_url,
+            music_file=args.music_file,
+            output_path=args.output,
+            sort_by=args.sort,
+            skip_seconds=args.skip,
+            renditions=args.renditions,
+            workers=args.workers,
+            spool_dir=args.spool_dir,
+            thumbnails=args.thumbnails,
+            dedup=args.dedup,
+            normalize=args.normalize,
+            stream=args.stream,
+            upload_url=args.upload,
+            beat_sync=args.beat_sync,
+            verify=args.verify,
+            settings=settings
+        )
+    except PipelineError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        if args.trace:
+            print(f"Trace: {stop_trace()}")
 
 
 if __name__ == "__main__":
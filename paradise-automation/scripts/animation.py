@@ -0,0 +1,102 @@
+"""
+Animation - Animated GIF / WebP sources as moving clips
+
+An animated source used to render like a photo: FFmpeg decoded its first
+frame and held it. Now its clip plays the animation, through the same Ken
+Burns, framing and crossfade steps as any other clip:
+
+1. Pillow decodes every frame once into the image pool (a frame set,
+   scaled to fit the clip's working size - see ImagePool.animation())
+2. FFmpeg reads the frame set once, as rawvideo; the loop filter keeps the
+   frames in memory and repeats them, so nothing is decoded again per loop
+3. setpts gives each frame its own display time (GIF/WebP frames can have
+   different delays) and fps= retimes that to the output frame rate
+
+config.ANIMATION_TIMING sets how an animation fills its hold: "loop" plays
+it at its own speed, looping; "stretch" retimes one playthrough to the
+hold's length.
+
+Detection needs Pillow (FFmpeg can't decode animated WebP); without it, or
+with the image pool disabled, animated sources render as their first frame.
+
+Usage:
+    python scripts/animation.py /path/to/animation.gif
+"""
+import os
+import sys
+import math
+import argparse
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.archive import open_image, image_signature
+
+ANIMATED_FORMATS = ('.gif', '.webp')
+TIMINGS = ("loop", "stretch")
+
+_animated = {}  # (ref, signature) -> bool
+
+
+def is_animated(ref: str) -> bool:
+    """True if ref is a GIF/WebP with more than one frame (False without Pillow)."""
+    if not ref.lower().endswith(ANIMATED_FORMATS):
+        return False
+    key = (ref, tuple(image_signature(ref)))
+    if key not in _animated:
+        try:
+            from PIL import Image
+            with Image.open(open_image(ref)) as img:
+                _animated[key] = bool(getattr(img, "is_animated", False))
+        except (ImportError, OSError):
+            _animated[key] = False
+    return _animated[key]
+
+
+def animation_filter(durations: List[float], hold: float, fps: int, timing: str = "loop") -> str:
+    """
+    Filter chain from a frame set read once (rawvideo, one frame per
+    durations entry) to a constant fps stream that plays it for as long as
+    needed: loop repeats the frames from memory, setpts places every frame
+    at its own time, fps= duplicates or drops frames to the output rate,
+    and trim ends the stream after the hold (the loop itself never ends).
+    """
+    if timing not in TIMINGS:
+        raise ValueError(f"Unknown animation timing: {timing} (use one of {', '.join(TIMINGS)})")
+    count = len(durations)
+    length = sum(durations)
+    if timing == "stretch" and length > 0:
+        durations = [d * hold / length for d in durations]
+        length = hold
+
+    index = f"mod(N,{count})"
+    if len(set(durations)) == 1:
+        offset = f"{index}*{durations[0]:.6g}"
+    else:
+        # start of frame k = sum of the durations before it (a flat sum, no nesting)
+        offset = "+".join(f"{d:.6g}*gte({index},{k})" for k, d in enumerate(durations[:-1], 1)) or "0"
+    return (
+        f"loop=loop=-1:size={count},settb=AVTB,"
+        f"setpts='(floor(N/{count})*{length:.6g}+{offset})/TB',fps={fps},"
+        f"trim=end_frame={max(1, math.ceil(hold * fps))}"
+    )
+
+
+if __name__ == "__main__":
+    from scripts.image_pool import default_pool, available
+
+    parser = argparse.ArgumentParser(description="Show an animated source's frames as pooled for clips")
+    parser.add_argument("source", help="GIF or WebP (or <archive>::<member>)")
+    parser.add_argument("--max-size", default="1920x1080", help="Frame set size limit (default: 1920x1080)")
+    args = parser.parse_args()
+
+    if not is_animated(args.source):
+        print(f"Not animated (or Pillow is missing): {args.source}")
+        sys.exit(1)
+    if not available():
+        print("Error: The image pool is disabled or Pillow is missing")
+        sys.exit(1)
+    max_width, max_height = (int(v) for v in args.max_size.lower().split("x"))
+    meta = default_pool().animation(args.source, max_width, max_height)
+    durations = meta["durations"]
+    print(f"{len(durations)} frames, {sum(durations):.2f}s per playthrough, "
+          f"{meta['width']}x{meta['height']} in {meta['path']}")
@@ -0,0 +1,114 @@
+"""
+Archive Input - Use images straight from a .zip without extracting it
+
+Image members are listed from the zip's central directory (no member data
+is read) and referred to as "<archive>::<member>", e.g.
+
+    /data/images.zip::2024/beach_01.jpg
+
+Everything that reads images goes through open_image() / read_image(), so
+a member is only decompressed into memory when it is rendered or analysed.
+FFmpeg receives it on stdin (see create_image_clip).
+
+Open archives are kept per process, so large central directories are
+parsed once.
+"""
+import io
+import os
+import sys
+import time
+import zipfile
+from functools import lru_cache
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import SUPPORTED_IMAGE_FORMATS
+
+MEMBER_SEPARATOR = "::"
+
+
+def is_archive(path: str) -> bool:
+    """True for a zip file path (not a member reference)."""
+    return path.lower().endswith(".zip") and os.path.isfile(path)
+
+
+def is_member(ref: str) -> bool:
+    """True for an "<archive>::<member>" reference into an existing zip."""
+    archive, separator, _ = str(ref).partition(MEMBER_SEPARATOR)
+    return bool(separator) and is_archive(archive)
+
+
+def member_ref(archive: str, member: str) -> str:
+    """ (archive, member) -> "<archive>::<member>" """
+    return f"{os.path.abspath(archive)}{MEMBER_SEPARATOR}{member}"
+
+
+def split_ref(ref: str) -> Tuple[str, str]:
+    """ "<archive>::<member>" -> (archive, member)"""
+    archive, member = ref.split(MEMBER_SEPARATOR, 1)
+    return archive, member
+
+
+def image_name(ref: str) -> str:
+    """File name of an image path or archive member."""
+    if is_member(ref):
+        return split_ref(ref)[1].rsplit("/", 1)[-1]
+    return os.path.basename(ref)
+
+
+@lru_cache(maxsize=8)
+def _open_zip(archive: str, sig: tuple) -> zipfile.ZipFile:
+    # sig (size, mtime) reopens the archive if it is replaced;
+    # ZipFile reads are safe across threads
+    return zipfile.ZipFile(archive)
+
+
+def open_zip(archive: str) -> zipfile.ZipFile:
+    stat = os.stat(archive)
+    return _open_zip(os.path.abspath(archive), (stat.st_size, stat.st_mtime_ns))
+
+
+def list_archive_images(archive: str) -> List[Tuple[str, float]]:
+    """
+    Image members of a zip from its central directory.
+
+    Returns:
+        List of (reference, member modified time as a timestamp)
+    """
+    refs = []
+    for info in open_zip(archive).infolist():
+        name = info.filename
+        if info.is_dir() or not name.lower().endswith(SUPPORTED_IMAGE_FORMATS):
+            continue
+        # Skip macOS resource forks (__MACOSX/._photo.jpg)
+        if name.startswith("__MACOSX/") or image_name(name).startswith("._"):
+            continue
+        mtime = time.mktime(info.date_time + (0, 0, -1))
+        refs.append((member_ref(archive, name), mtime))
+    return refs
+
+
+def read_image(ref: str) -> bytes:
+    """Bytes of an image file or archive member."""
+    if is_member(ref):
+        archive, member = split_ref(ref)
+        return open_zip(archive).read(member)
+    with open(ref, "rb") as f:
+        return f.read()
+
+
+def open_image(ref: str):
+    """Source for PIL.Image.open: the path, or an in-memory buffer for a member."""
+    if is_member(ref):
+        return io.BytesIO(read_image(ref))
+    return ref
+
+
+def image_signature(ref: str) -> list:
+    """[size, mtime] of an image file ([size, CRC] of a member), for caches."""
+    if is_member(ref):
+        archive, member = split_ref(ref)
+        info = open_zip(archive).getinfo(member)
+        return [info.file_size, info.CRC]
+    stat = os.stat(ref)
+    return [stat.st_size, int(stat.st_mtime)]
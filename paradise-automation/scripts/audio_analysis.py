@@ -0,0 +1,296 @@
+"""
+Audio Analysis - Find where the music starts and ends
+
+Replaces a fixed --skip: the track is decoded once to mono PCM, streamed
+from FFmpeg in chunks, and turned into two envelopes with NumPy:
+- RMS level per 23 ms frame (silence, pauses)
+- spectral flux per frame (note onsets)
+
+Leading and trailing silence are anything AUDIO_SILENCE_DB below the
+track's loud level. A spoken intro (YouTube uploads) shows up as seconds
+with many pauses between words; the music starts at the first run of
+steady, full-level seconds, moved to the strongest onset nearby so the
+cut lands on a note.
+
+The tempo comes from the same pass: the strongest periodicity of the
+flux envelope between TEMPO_MIN_BPM and TEMPO_MAX_BPM, weighted towards
+TEMPO_PRIOR_BPM so a song isn't read at double or half speed. The beat
+grid follows the onsets at that tempo (dynamic programming: every beat
+is an onset close to one period after the previous one), for beat-synced
+slideshows (see scripts/timeline.py snap_to_beats()).
+
+The result is cached per source file in assets/audio_analysis/ and the
+trim is applied as an input seek when the music is muxed, so nothing is
+re-encoded.
+
+Usage:
+    python scripts/audio_analysis.py /path/to/song.mp3
+"""
+import os
+import sys
+import json
+import hashlib
+import argparse
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import AUDIO_ANALYSIS_CACHE_DIR, AUDIO_SILENCE_DB, AUDIO_INTRO_MAX_SECONDS
+from scripts.tracing import span, traced
+
+SAMPLE_RATE = 22050
+FRAME = 1024
+HOP = 512
+CHUNK_SECONDS = 30
+PAUSE_DB = 25  # A frame this far below the loud level is a pause
+MAX_PAUSE_RATIO = 0.1  # Seconds of music have (almost) no pauses
+MUSIC_RUN_SECONDS = 4  # Music starts with this many steady seconds in a row
+ONSET_SNAP_SECONDS = 0.5
+END_TAIL_SECONDS = 0.25
+TEMPO_MIN_BPM = 60
+TEMPO_MAX_BPM = 180
+TEMPO_PRIOR_BPM = 120
+TEMPO_WINDOW_SECONDS = 120  # Autocorrelate at most this much of the track
+BEAT_TIGHTNESS = 100  # How strongly beats keep to the tempo over loud off-beat onsets
+ANALYSIS_VERSION = 2  # Bump when the cached fields change
+
+
+def envelopes(audio_path: str, rate: int = SAMPLE_RATE) -> tuple:
+    """
+    Decode audio_path in streaming chunks into per-frame envelopes.
+
+    Returns:
+        (rms, flux) - NumPy arrays with one value per HOP samples
+    """
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    cmd = ['ffmpeg', '-v', 'error', '-i', audio_path, '-vn', '-ac', '1', '-ar', str(rate), '-f', 'f32le', 'pipe:1']
+    window = np.hanning(FRAME).astype(np.float32)
+    chunk_bytes = CHUNK_SECONDS * rate * 4
+    rms, flux = [], []
+    carry = np.zeros(0, dtype=np.float32)
+    previous = None
+
+    with span('ffmpeg', cat='subprocess', cmd=subprocess.list2cmdline(cmd)) as info:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        while True:
+            data = proc.stdout.read(chunk_bytes)
+            if not data:
+                break
+            samples = np.concatenate([carry, np.frombuffer(data, dtype=np.float32)])
+            if len(samples) < FRAME:
+                carry = samples
+                continue
+            frames = sliding_window_view(samples, FRAME)[::HOP]
+            # Keep the samples the next chunk's first frame still needs
+            carry = samples[len(frames) * HOP:]
+
+            rms.append(np.sqrt(np.mean(frames ** 2, axis=1)))
+            spectrum = np.abs(np.fft.rfft(frames * window, axis=1))
+            before = np.vstack([spectrum[:1] if previous is None else previous, spectrum[:-1]])
+            flux.append(np.maximum(spectrum - before, 0).sum(axis=1))
+            previous = spectrum[-1:]
+        stderr = proc.stderr.read()
+        info['exit_code'] = proc.wait()
+
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+    if not rms:
+        return np.zeros(0), np.zeros(0)
+    return np.concatenate(rms), np.concatenate(flux)
+
+
+def choose_trim(rms, flux, detect_intro: bool = True, rate: int = SAMPLE_RATE) -> dict:
+    """
+    Pick start and end points from the envelopes.
+
+    Returns:
+        Dict with start, end (seconds), duration (of the whole file) and
+        intro (True if a spoken/quiet intro was skipped)
+    """
+    import numpy as np
+
+    frame_seconds = HOP / rate
+    duration = round(len(rms) * frame_seconds, 2)
+    if len(rms) == 0:
+        return {"start": 0.0, "end": duration, "duration": duration, "intro": False}
+
+    level = 20 * np.log10(rms + 1e-10)
+    loud = np.percentile(level, 95)
+    sounding = np.flatnonzero(level > loud - AUDIO_SILENCE_DB)
+    if len(sounding) == 0:
+        return {"start": 0.0, "end": duration, "duration": duration, "intro": False}
+    first, last = sounding[0], sounding[-1]
+    start = first
+
+    if detect_intro:
+        per_second = int(round(1 / frame_seconds))
+        limit = min(last, first + int(AUDIO_INTRO_MAX_SECONDS / frame_seconds))
+        run = 0
+        for block in range(first, limit - per_second, per_second):
+            seconds = level[block:block + per_second]
+            steady = (np.mean(seconds < loud - PAUSE_DB) < MAX_PAUSE_RATIO
+                      and np.median(seconds) > loud - PAUSE_DB / 2)
+            run = run + 1 if steady else 0
+            if run == MUSIC_RUN_SECONDS:
+                start = block - (MUSIC_RUN_SECONDS - 1) * per_second
+                break
+
+        if start > first:
+            # Cut on the strongest onset near the boundary
+            snap = int(ONSET_SNAP_SECONDS / frame_seconds)
+            lo, hi = max(first, start - snap), min(len(flux), start + snap)
+            start = lo + int(np.argmax(flux[lo:hi]))
+
+    end = min(duration, (last + 1) * frame_seconds + END_TAIL_SECONDS)
+    return {
+        "start": round(start * frame_seconds, 2),
+        "end": round(end, 2),
+        "duration": duration,
+        "intro": bool(start - first > 1 / frame_seconds)
+    }
+
+
+def _onset_strength(flux):
+    import numpy as np
+
+    # Smooth a little so a period between two whole frames still peaks
+    kernel = np.exp(-0.5 * (np.arange(-4, 5) / 1.5) ** 2)
+    onsets = np.asarray(flux, dtype=np.float64)
+    return np.convolve(onsets - onsets.mean(), kernel / kernel.sum(), mode="same")
+
+
+def estimate_tempo(flux, rate: int = SAMPLE_RATE):
+    """
+    Tempo in beats per minute from the flux envelope (None if there is no pulse).
+    """
+    import numpy as np
+
+    fps = rate / HOP
+    onsets = np.asarray(flux[:int(TEMPO_WINDOW_SECONDS * fps)], dtype=np.float64)
+    min_lag = int(60 * fps / TEMPO_MAX_BPM)
+    max_lag = int(np.ceil(60 * fps / TEMPO_MIN_BPM))
+    if len(onsets) < 4 * max_lag or not onsets.any():
+        return None
+    onsets = _onset_strength(onsets)
+
+    # Autocorrelation through the FFT (zero-padded, so not circular)
+    size = 1 << int(np.ceil(np.log2(2 * len(onsets))))
+    spectrum = np.fft.rfft(onsets, size)
+    acf = np.fft.irfft(spectrum * np.conj(spectrum), size)[:max_lag + 2]
+    if acf[0] <= 0:
+        return None
+    acf /= acf[0]
+
+    lags = np.arange(min_lag, max_lag + 1)
+    bpm = 60 * fps / lags
+    weight = np.exp(-0.5 * (np.log2(bpm / TEMPO_PRIOR_BPM) / 0.9) ** 2)
+    best = int(np.argmax(acf[lags] * weight))
+    if acf[lags[best]] <= 0:
+        return None
+
+    # Parabolic interpolation between lags for a fractional period
+    lag = float(lags[best])
+    a, b, c = acf[lags[best] - 1], acf[lags[best]], acf[lags[best] + 1]
+    if a - 2 * b + c < 0:
+        lag += 0.5 * (a - c) / (a - 2 * b + c)
+    return round(60 * fps / lag, 1)
+
+
+def track_beats(flux, tempo: float, rate: int = SAMPLE_RATE) -> list:
+    """
+    Beat times in seconds: the best-scoring chain of onsets about one
+    period apart (empty without a tempo).
+    """
+    import numpy as np
+
+    if not tempo or len(flux) == 0:
+        return []
+    fps = rate / HOP
+    period = 60 * fps / tempo
+    onsets = _onset_strength(flux)
+    onsets /= onsets.std() or 1.0
+
+    # score[t]: best chain ending in a beat at frame t; each step back is
+    # half to two periods, penalised by how far it is from one period
+    gaps = np.arange(max(1, int(period / 2)), int(2 * period) + 1)
+    penalty = -BEAT_TIGHTNESS * np.log(gaps / period) ** 2
+    score = onsets.copy()
+    previous = np.full(len(onsets), -1)
+    for t in range(gaps[0], len(onsets)):
+        candidates = t - gaps
+        valid = candidates >= 0
+        chained = score[candidates[valid]] + penalty[valid]
+        best = int(np.argmax(chained))
+        if chained[best] > 0:
+            score[t] += chained[best]
+            previous[t] = candidates[valid][best]
+
+    # Last beat: the best score within the final period, then walk back
+    tail = max(0, len(onsets) - int(period) - 1)
+    beat = tail + int(np.argmax(score[tail:]))
+    frames = []
+    while beat >= 0:
+        frames.append(beat)
+        beat = previous[beat]
+    # A frame's flux peaks when the onset is at its centre
+    return [round((f * HOP + FRAME / 2) / rate, 3) for f in reversed(frames)]
+
+
+def _cache_path(audio_path: str) -> str:
+    key = hashlib.sha1(os.path.abspath(audio_path).encode()).hexdigest()[:16]
+    return os.path.join(AUDIO_ANALYSIS_CACHE_DIR, f"{key}.json")
+
+
+@traced
+def analyse(audio_path: str, detect_intro: bool = True) -> dict:
+    """
+    Trim (see choose_trim()), tempo and beat grid for a file, from cache if
+    the file is unchanged.
+
+    Returns:
+        {"trim": {...}, "tempo": beats per minute or None, "beats": [seconds]}
+    """
+    stat = os.stat(audio_path)
+    sig = [stat.st_size, int(stat.st_mtime), detect_intro]
+    cache_path = _cache_path(audio_path)
+
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path) as f:
+                cached = json.load(f)
+            if cached.get("sig") == sig and cached.get("version") == ANALYSIS_VERSION:
+                return {key: cached[key] for key in ("trim", "tempo", "beats")}
+        except (OSError, ValueError, KeyError):
+            pass
+
+    rms, flux = envelopes(audio_path)
+    tempo = estimate_tempo(flux)
+    result = {"trim": choose_trim(rms, flux, detect_intro), "tempo": tempo, "beats": track_beats(flux, tempo)}
+    os.makedirs(AUDIO_ANALYSIS_CACHE_DIR, exist_ok=True)
+    with open(cache_path, "w") as f:
+        json.dump({"path": os.path.abspath(audio_path), "sig": sig, "version": ANALYSIS_VERSION, **result}, f)
+    return result
+
+
+def get_trim(audio_path: str, detect_intro: bool = True) -> dict:
+    """Start/end trim for a file (see choose_trim())."""
+    return analyse(audio_path, detect_intro)["trim"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Detect silence and spoken intros in a track")
+    parser.add_argument("audio", help="Path to audio file")
+    parser.add_argument("--no-intro", action="store_true", help="Only trim silence")
+
+    args = parser.parse_args()
+
+    analysis = analyse(args.audio, detect_intro=not args.no_intro)
+    trim = analysis["trim"]
+    print(f"Duration: {trim['duration']:.2f}s")
+    print(f"Start:    {trim['start']:.2f}s" + (" (intro skipped)" if trim["intro"] else ""))
+    print(f"End:      {trim['end']:.2f}s")
+    print(f"Music:    {trim['end'] - trim['start']:.2f}s")
+    print(f"Tempo:    {analysis['tempo']:.1f} BPM" if analysis["tempo"] else "Tempo:    no steady pulse")
+    print(f"Beats:    {len(analysis['beats'])}"
+          + (f" (first at {analysis['beats'][0]:.2f}s)" if analysis["beats"] else ""))
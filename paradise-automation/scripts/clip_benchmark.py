@@ -0,0 +1,197 @@
+"""
+Clip Benchmark - Time one image clip per way of feeding the image to FFmpeg
+
+For each source size, renders the same clip (Ken Burns and static) three
+ways and reports wall time per clip:
+- loop:  -loop 1 -i image (the image2 demuxer re-reads and re-decodes the
+         file for every output frame, then it is scaled again)
+- once:  -i image, decoded and scaled once, held in the filtergraph
+         (zoompan / loop filter) - what clips do without the image pool
+- pool:  the decoded working frame read from the image pool
+         (scripts/image_pool.py), timed on a pool hit
+
+Sources are synthetic photos (JPEG, quality 92) at common camera and
+screen sizes, or your own images with --images.
+
+Usage:
+    python scripts/clip_benchmark.py
+    python scripts/clip_benchmark.py --sizes 4032x3024,6000x4000 --seconds 5
+    python scripts/clip_benchmark.py --images /path/to/images/
+    python scripts/clip_benchmark.py --size 1080x1920 --framing blur
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import TEMP_DIR
+from scripts.image_loader import load_images_from_folder
+from scripts.video_assembler import image_clip_command, working_frame, ken_burns_size, blur_framing_filter
+from scripts.render_settings import RenderSettings, DEFAULT_SETTINGS, FRAMINGS
+from scripts.image_pool import ImagePool
+from scripts.storage import claim_job_dir
+from scripts.tracing import run
+
+DEFAULT_SIZES = ["1920x1080", "3840x2160", "4032x3024", "6000x4000"]
+METHODS = ["loop", "once", "pool"]
+
+
+def synthetic_photo(path: str, width: int, height: int) -> str:
+    """A JPEG with photo-like detail (smooth colour plus grain)."""
+    from PIL import Image
+    base = Image.merge("RGB", [Image.effect_noise((max(1, width // 64), max(1, height // 64)), 80)
+                               for _ in range(3)])
+    base = base.resize((width, height), Image.BICUBIC)
+    grain = Image.effect_noise((width, height), 24).convert("RGB")
+    Image.blend(base, grain, 0.15).save(path, quality=92)
+    return path
+
+
+def clip_command(method: str, image: str, output: str, seconds: float, ken_burns: bool,
+                 settings: RenderSettings = DEFAULT_SETTINGS) -> List[str]:
+    """
+    The FFmpeg command one method runs (size, framing and encoder from
+    settings); for "pool", image is the pooled frame.
+    """
+    width, height, framing = settings.width, settings.height, settings.framing
+    if method == "pool":
+        return image_clip_command(
+            image, seconds, output, width, height, ken_burns, video_args=settings.encoder_args(),
+            audio=False, raw_size=working_frame(width, height, ken_burns, framing)[:2],
+            framing=framing, fps=settings.fps
+        )
+    if method == "loop":
+        return loop_command(image, output, seconds, ken_burns, settings)
+    return image_clip_command(image, seconds, output, width, height, ken_burns,
+                              video_args=settings.encoder_args(), audio=False, framing=framing,
+                              fps=settings.fps)
+
+
+def loop_command(image: str, output: str, seconds: float, ken_burns: bool,
+                 settings: RenderSettings = DEFAULT_SETTINGS) -> List[str]:
+    """
+    The command clips used before image_clip_command: -loop 1 re-reads the
+    input for every frame, which zoompan and scale then process again.
+    """
+    width, height, fps = settings.width, settings.height, settings.fps
+    total_frames = int(seconds * fps)
+    if ken_burns and total_frames > 0:
+        working_size = ken_burns_size(width, height)
+        if settings.framing == "blur":
+            working_filter = blur_framing_filter(*working_size)
+        else:
+            working_filter = "scale={}:{}".format(*working_size)
+        video_filter = (
+            f"{working_filter},setsar=1,"
+            f"zoompan=z='1+{0.04 / total_frames}*in':x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':"
+            f"d={total_frames}:s={width}x{height}:fps={fps}"
+        )
+        tune = []
+    else:
+        if settings.framing == "blur":
+            video_filter = blur_framing_filter(width, height) + ",setsar=1"
+        else:
+            video_filter = f"scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2"
+        tune = ['-tune', 'stillimage']
+    return [
+        'ffmpeg', '-y', '-loop', '1', '-i', image, '-vf', video_filter,
+        *settings.encoder_args(), *tune, '-an', '-pix_fmt', 'yuv420p', '-t', str(seconds), output
+    ]
+
+
+def time_clip(method: str, image: str, output: str, seconds: float, ken_burns: bool,
+              pool: ImagePool, repeats: int, settings: RenderSettings = DEFAULT_SETTINGS) -> float:
+    """Best wall time of repeats runs (the pool is filled before timing)."""
+    source = image
+    if method == "pool":
+        frame_width, frame_height, mode = working_frame(settings.width, settings.height, ken_burns,
+                                                        settings.framing)
+        pool.acquire(image, frame_width, frame_height, mode)
+    best = None
+    for _ in range(repeats):
+        started = time.time()
+        if method == "pool":
+            source = pool.acquire(image, frame_width, frame_height, mode)
+        run(clip_command(method, source, output, seconds, ken_burns, settings),
+            check=True, capture_output=True)
+        elapsed = time.time() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark(sources: List[tuple], seconds: float = 3.0, repeats: int = 2,
+              settings: RenderSettings = DEFAULT_SETTINGS) -> List[dict]:
+    """
+    Time every method for each (label, image) source, rendering clips of
+    settings' size, frame rate, framing and encoder.
+
+    Returns:
+        List of {"source", "effect", "loop", "once", "pool", "speedup_once",
+        "speedup_pool"} (seconds per clip; speedups against loop)
+    """
+    work_dir = claim_job_dir(os.path.join(TEMP_DIR, f"clipbench_{datetime.now().strftime('%Y%m%d_%H%M%S')}"))
+    pool = ImagePool(os.path.join(work_dir, "pool"))
+    results = []
+    try:
+        for label, image in sources:
+            if image is None:
+                width, height = (int(v) for v in label.split("x"))
+                image = synthetic_photo(os.path.join(work_dir, f"{label}.jpg"), width, height)
+            for ken_burns in (True, False):
+                row = {"source": label, "effect": "ken_burns" if ken_burns else "none"}
+                for method in METHODS:
+                    output = os.path.join(work_dir, f"{method}.mp4")
+                    row[method] = round(time_clip(method, image, output, seconds, ken_burns,
+                                                  pool, repeats, settings), 2)
+                row["speedup_once"] = round(row["loop"] / row["once"], 1)
+                row["speedup_pool"] = round(row["loop"] / row["pool"], 1)
+                results.append(row)
+                print(f"{row['source']:<22} {row['effect']:<10} {row['loop']:>7.2f} {row['once']:>7.2f} "
+                      f"{row['pool']:>7.2f} {row['speedup_once']:>6.1f}x {row['speedup_pool']:>6.1f}x")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time image clips with -loop 1 vs decode-once inputs")
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES),
+                        help=f"Comma separated synthetic source sizes (default: {','.join(DEFAULT_SIZES)})")
+    parser.add_argument("--images", help="Benchmark the images in this folder instead")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Clip length (default: 3)")
+    parser.add_argument("--repeats", type=int, default=2, help="Runs per measurement, best kept (default: 2)")
+    parser.add_argument("--preset", help="x264 preset (default: the tuned profile's)")
+    parser.add_argument("--size", default=f"{DEFAULT_SETTINGS.width}x{DEFAULT_SETTINGS.height}",
+                        help=f"Output size (default: {DEFAULT_SETTINGS.width}x{DEFAULT_SETTINGS.height})")
+    parser.add_argument("--framing", choices=FRAMINGS, default=DEFAULT_SETTINGS.framing,
+                        help=f"Framing of images off the frame's aspect ratio (default: {DEFAULT_SETTINGS.framing})")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    if args.images:
+        sources = [(os.path.basename(p)[:22], p) for p in load_images_from_folder(args.images)]
+    else:
+        sources = [(size, None) for size in args.sizes.split(",")]
+    if not sources:
+        print("Error: No images to benchmark")
+        sys.exit(1)
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    settings = DEFAULT_SETTINGS.replace(width=width, height=height, framing=args.framing,
+                                        preset=args.preset or DEFAULT_SETTINGS.preset)
+
+    print(f"{width}x{height}, {args.seconds:g}s clips, seconds per clip (best of {args.repeats})")
+    print(f"{'source':<22} {'effect':<10} {'loop':>7} {'once':>7} {'pool':>7} {'once':>7} {'pool':>7}")
+    results = benchmark(sources, args.seconds, args.repeats, settings)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
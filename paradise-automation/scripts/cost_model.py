@@ -0,0 +1,176 @@
+"""
+Cost Model - Predict what a render will cost before running it
+
+Every step a render plan executes (scripts/render_plan.py) is recorded in
+assets/render_history.jsonl: host, step class (clip_ken_burns, clip_none,
+holds, xfade, concat, mux), work units (frames x megapixels, or seconds of
+audio for a mux), wall time, CPU time and output bytes.
+
+For a new plan, each step not already in the render cache is priced at the
+median rate (per work unit) of the last COST_HISTORY_SAMPLES steps of its
+class on this host. Classes without history on this host fall back to
+DEFAULT_RATES, and the estimate says so.
+
+Peak temp disk is the new cache entries plus the output (cache entries
+are kept until evicted, see scripts/storage.py).
+"""
+import os
+import sys
+import json
+import time
+import socket
+import statistics
+from typing import List
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import RENDER_HISTORY_PATH, COST_HISTORY_SAMPLES
+
+HISTORY_MAX_RECORDS = 5000
+
+# Seconds (wall, cpu) and bytes per work unit on a 4-core host at the
+# default encoder settings; replaced by measured rates once recorded
+DEFAULT_RATES = {
+    "clip_ken_burns": {"wall": 0.012, "cpu": 0.040, "bytes": 5000},
+    "clip_none": {"wall": 0.004, "cpu": 0.012, "bytes": 2500},
+    "holds": {"wall": 0.003, "cpu": 0.010, "bytes": 2000},
+    "xfade": {"wall": 0.008, "cpu": 0.028, "bytes": 5000},
+    "concat": {"wall": 0.0002, "cpu": 0.0001, "bytes": 4000},
+    "mux": {"wall": 0.02, "cpu": 0.02, "bytes": 24000},
+}
+
+
+def children_cpu() -> float:
+    """CPU seconds used by finished child processes so far (0 if unknown)."""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def record_step(step: dict, wall: float, cpu: float, path: str = RENDER_HISTORY_PATH):
+    """Append a measured step to the history."""
+    cost = step.get("cost")
+    if not cost or cost["work"] <= 0 or not os.path.exists(step["output"]):
+        return
+    record = {
+        "host": socket.gethostname(),
+        "time": int(time.time()),
+        "class": cost["class"],
+        "work": round(cost["work"], 3),
+        "wall": round(wall, 3),
+        "cpu": round(cpu, 3)
+    }
+    size = os.path.getsize(step["output"])
+    if cost.get("input") and os.path.exists(cost["input"]):
+        size -= os.path.getsize(cost["input"])  # A mux copies the video; price the audio
+    record["bytes"] = max(0, size)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def load_history(path: str = RENDER_HISTORY_PATH, host: str = None) -> List[dict]:
+    """Recorded steps for host (default: this host), oldest first."""
+    host = host or socket.gethostname()
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        lines = f.readlines()
+    if len(lines) > HISTORY_MAX_RECORDS:
+        # Keep the file bounded; the oldest records matter least
+        lines = lines[-HISTORY_MAX_RECORDS:]
+        with open(path + ".tmp", "w") as f:
+            f.writelines(lines)
+        os.replace(path + ".tmp", path)
+
+    records = []
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue  # Torn write
+        if record.get("host") == host:
+            records.append(record)
+    return records
+
+
+def calibrate(history: List[dict], samples: int = COST_HISTORY_SAMPLES) -> dict:
+    """
+    Rates per step class from history.
+
+    Returns:
+        {class: {"wall", "cpu", "bytes", "samples"}} - samples 0 means default
+    """
+    by_class = {}
+    for record in history:
+        by_class.setdefault(record["class"], []).append(record)
+
+    rates = {}
+    for name, default in DEFAULT_RATES.items():
+        recent = by_class.get(name, [])[-samples:]
+        if not recent:
+            rates[name] = dict(default, samples=0)
+            continue
+        rates[name] = {
+            key: statistics.median(r[key] / r["work"] for r in recent)
+            for key in ("wall", "cpu", "bytes")
+        }
+        rates[name]["samples"] = len(recent)
+    return rates
+
+
+def estimate(steps: List[dict], rates: dict = None) -> dict:
+    """
+    Predict the cost of running compiled steps (cached steps cost nothing).
+
+    Returns:
+        Dict with wall_seconds, cpu_seconds, temp_disk_bytes, output_bytes,
+        steps_to_run, steps_cached and by_class (per class totals)
+    """
+    rates = rates or calibrate(load_history())
+    result = {
+        "wall_seconds": 0.0, "cpu_seconds": 0.0, "temp_disk_bytes": 0, "output_bytes": 0,
+        "steps_to_run": 0, "steps_cached": 0, "by_class": {}
+    }
+    last_video_bytes = 0
+    for step in steps:
+        cost = step["cost"]
+        rate = rates.get(cost["class"], DEFAULT_RATES.get(cost["class"]))
+        if step["key"] and os.path.exists(step["output"]):
+            result["steps_cached"] += 1
+            last_video_bytes = os.path.getsize(step["output"])
+            continue
+
+        wall = cost["work"] * rate["wall"]
+        cpu = cost["work"] * rate["cpu"]
+        size = int(cost["work"] * rate["bytes"])
+        if step["kind"] == "mux":
+            # Stream copy of the video plus the encoded audio
+            size += last_video_bytes
+            result["output_bytes"] = size
+        else:
+            last_video_bytes = size
+        result["temp_disk_bytes"] += size
+        result["wall_seconds"] += wall
+        result["cpu_seconds"] += cpu
+        result["steps_to_run"] += 1
+
+        totals = result["by_class"].setdefault(
+            cost["class"], {"steps": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "samples": rate.get("samples", 0)}
+        )
+        totals["steps"] += 1
+        totals["wall_seconds"] += wall
+        totals["cpu_seconds"] += cpu
+
+    if not result["output_bytes"]:
+        result["output_bytes"] = last_video_bytes
+    for totals in [result] + list(result["by_class"].values()):
+        totals["wall_seconds"] = round(totals["wall_seconds"], 1)
+        totals["cpu_seconds"] = round(totals["cpu_seconds"], 1)
+    result["calibrated"] = all(c["samples"] for c in result["by_class"].values())
+    return result
@@ -0,0 +1,284 @@
+"""
+Near-Duplicate Filter - Drop burst shots and re-exports before rendering
+
+Every image gets two 64-bit perceptual hashes computed in NumPy batches on
+small grayscale thumbnails:
+- dHash: sign of horizontal gradients on a 9x8 thumbnail
+- pHash: low-frequency 8x8 DCT coefficients of a 32x32 thumbnail vs median
+
+Hashes are cached per file (keyed by path, size and mtime) so re-runs only
+hash new or changed images.
+
+Near-duplicates are found with a multi-index hash: the pHash is split into
+threshold + 1 bands, and by the pigeonhole principle two hashes within the
+threshold share at least one band exactly. Only images in the same band
+bucket are compared, which keeps 10k+ image folders fast. Candidate pairs
+are confirmed on dHash distance and merged into clusters; one image per
+cluster is kept.
+
+Usage:
+    python scripts/dedup.py /path/to/images/
+    python scripts/dedup.py /path/to/images/ --keep sharpest --threshold 8
+"""
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    IMAGE_HASH_CACHE, DEDUP_PHASH_THRESHOLD, DEDUP_DHASH_THRESHOLD
+)
+from scripts.archive import is_member, open_image, image_signature, image_name
+from scripts.tracing import traced
+
+HASH_SIZE = 8
+PHASH_SIZE = 32
+BLOCK_ROWS = 256
+
+
+def _load_gray(path: str):
+    """Decode an image straight to a small grayscale thumbnail."""
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(open_image(path)) as img:
+        img.draft("L", (PHASH_SIZE * 2, PHASH_SIZE * 2))
+        img = img.convert("L")
+        small = img.resize((PHASH_SIZE * 2, PHASH_SIZE * 2), Image.BILINEAR)
+        return np.asarray(small, dtype=np.float32)
+
+
+def _pack_bits(bits) -> list:
+    """(N, 64) bool -> list of N ints."""
+    import numpy as np
+
+    packed = np.packbits(bits.astype(np.uint8), axis=1)
+    return [int(v) for v in packed.view(">u8").ravel()]
+
+
+def _dct_matrix(n: int):
+    import numpy as np
+
+    k = np.arange(n)
+    m = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n)) * np.sqrt(2 / n)
+    m[0] /= np.sqrt(2)
+    return m.astype(np.float32)
+
+
+def hash_batch(grays) -> Tuple[list, list, list]:
+    """
+    Compute dHash, pHash and sharpness for a batch of (N, 64, 64) thumbnails.
+
+    Returns:
+        (dhashes, phashes, sharpness) as Python lists
+    """
+    import numpy as np
+    from PIL import Image
+    from scripts.thumbnails import laplacian_variance
+
+    n = len(grays)
+    # Box-downsample 64x64 -> 32x32 for pHash
+    g32 = grays.reshape(n, PHASH_SIZE, 2, PHASH_SIZE, 2).mean(axis=(2, 4))
+
+    # dHash on 9x8: resize each 32x32 with Pillow (tiny, cheap)
+    g9 = np.stack([
+        np.asarray(Image.fromarray(g).resize((HASH_SIZE + 1, HASH_SIZE), Image.BILINEAR))
+        for g in g32
+    ])
+    dbits = (g9[:, :, 1:] > g9[:, :, :-1]).reshape(n, -1)
+
+    # pHash: 2D DCT as D @ X @ D.T, keep the 8x8 low frequencies
+    dct = _dct_matrix(PHASH_SIZE)
+    coeffs = np.einsum("ij,njk,lk->nil", dct, g32, dct)[:, :HASH_SIZE, :HASH_SIZE]
+    flat = coeffs.reshape(n, -1)
+    median = np.median(flat[:, 1:], axis=1, keepdims=True)  # skip DC term
+    pbits = flat > median
+
+    return _pack_bits(dbits), _pack_bits(pbits), laplacian_variance(grays).tolist()
+
+
+def load_cache(cache_path: str = IMAGE_HASH_CACHE) -> dict:
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+
+def save_cache(cache: dict, cache_path: str = IMAGE_HASH_CACHE):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path + ".tmp", "w") as f:
+        json.dump(cache, f)
+    os.replace(cache_path + ".tmp", cache_path)
+
+
+def _file_key(path: str) -> Tuple[str, list]:
+    return (path if is_member(path) else os.path.abspath(path)), image_signature(path)
+
+
+def compute_hashes(images: List[str], cache_path: str = IMAGE_HASH_CACHE, batch_size: int = 256) -> List[dict]:
+    """
+    Get {"dhash", "phash", "sharpness"} for every image, using the cache.
+    """
+    import numpy as np
+
+    cache = load_cache(cache_path)
+    keys = [_file_key(p) for p in images]
+    missing = [
+        i for i, (key, sig) in enumerate(keys)
+        if cache.get(key, {}).get("sig") != sig
+    ]
+
+    if missing:
+        with ThreadPoolExecutor() as pool:
+            for start in range(0, len(missing), batch_size):
+                chunk = missing[start:start + batch_size]
+                grays = np.stack(list(pool.map(_load_gray, [images[i] for i in chunk])))
+                dhashes, phashes, sharpness = hash_batch(grays)
+                for i, d, p, s in zip(chunk, dhashes, phashes, sharpness):
+                    key, sig = keys[i]
+                    cache[key] = {"sig": sig, "dhash": d, "phash": p, "sharpness": s}
+        save_cache(cache, cache_path)
+
+    return [cache[key] for key, _ in keys]
+
+
+def _popcount(values):
+    """Bit count of every element of a uint64 array (any shape)."""
+    import numpy as np
+
+    if hasattr(np, "bitwise_count"):  # NumPy 2.0+
+        return np.bitwise_count(values)
+
+    # SWAR popcount
+    x = values - ((values >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+def _bands(threshold: int) -> List[Tuple[int, int]]:
+    """Split 64 bits into threshold + 1 (shift, width) bands."""
+    count = min(threshold + 1, 64)
+    widths = [64 // count + (1 if i < 64 % count else 0) for i in range(count)]
+    bands, shift = [], 0
+    for width in widths:
+        bands.append((shift, width))
+        shift += width
+    return bands
+
+
+def find_clusters(
+    hashes: List[dict],
+    phash_threshold: int = DEDUP_PHASH_THRESHOLD,
+    dhash_threshold: int = DEDUP_DHASH_THRESHOLD
+) -> List[List[int]]:
+    """
+    Group near-duplicate images.
+
+    Returns:
+        List of clusters (lists of indices into hashes), only those with 2+
+    """
+    import numpy as np
+
+    n = len(hashes)
+    phash = np.array([h["phash"] for h in hashes], dtype=np.uint64)
+    dhash = np.array([h["dhash"] for h in hashes], dtype=np.uint64)
+
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for shift, width in _bands(phash_threshold):
+        keys = (phash >> np.uint64(shift)) & np.uint64((1 << width) - 1)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        # Bucket boundaries where the band value changes
+        edges = np.flatnonzero(np.diff(sorted_keys)) + 1
+        for bucket in np.split(order, edges):
+            if len(bucket) < 2:
+                continue
+            p = phash[bucket]
+            d = dhash[bucket]
+            # Compare the bucket pairwise, a block of rows at a time
+            for start in range(0, len(bucket), BLOCK_ROWS):
+                rows = slice(start, start + BLOCK_ROWS)
+                close = (
+                    (_popcount(p[rows, None] ^ p[None, :]) <= phash_threshold) &
+                    (_popcount(d[rows, None] ^ d[None, :]) <= dhash_threshold)
+                )
+                rows_hit, cols_hit = np.nonzero(close)
+                upper = rows_hit + start < cols_hit  # each pair once, no self
+                for a, b in zip(bucket[rows_hit[upper] + start], bucket[cols_hit[upper]]):
+                    ra, rb = find(int(a)), find(int(b))
+                    if ra != rb:
+                        parent[max(ra, rb)] = min(ra, rb)
+
+    groups = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    return [members for members in groups.values() if len(members) > 1]
+
+
+@traced
+def remove_near_duplicates(
+    images: List[str],
+    keep: str = "first",
+    phash_threshold: int = DEDUP_PHASH_THRESHOLD,
+    dhash_threshold: int = DEDUP_DHASH_THRESHOLD
+) -> Tuple[List[str], List[List[str]]]:
+    """
+    Keep one image per near-duplicate cluster, preserving order.
+
+    Args:
+        images: Image paths in render order
+        keep: "first" (earliest in order) or "sharpest" (highest Laplacian
+              variance)
+
+    Returns:
+        (kept images, list of clusters as path lists)
+    """
+    if keep not in ("first", "sharpest"):
+        raise ValueError(f"Unknown keep method: {keep}")
+
+    hashes = compute_hashes(images)
+    clusters = find_clusters(hashes, phash_threshold, dhash_threshold)
+
+    dropped = set()
+    for members in clusters:
+        if keep == "sharpest":
+            best = max(members, key=lambda i: hashes[i]["sharpness"])
+        else:
+            best = min(members)
+        dropped.update(i for i in members if i != best)
+
+    kept = [img for i, img in enumerate(images) if i not in dropped]
+    return kept, [[images[i] for i in members] for members in clusters]
+
+
+if __name__ == "__main__":
+    from scripts.image_loader import load_images_from_folder
+
+    parser = argparse.ArgumentParser(description="Find near-duplicate images")
+    parser.add_argument("folder", help="Path to images folder or .zip")
+    parser.add_argument("--keep", default="first", choices=["first", "sharpest"],
+                        help="Which image of a cluster to keep")
+    parser.add_argument("--threshold", type=int, default=DEDUP_PHASH_THRESHOLD,
+                        help=f"Max pHash distance in bits (default: {DEDUP_PHASH_THRESHOLD})")
+
+    args = parser.parse_args()
+
+    images = load_images_from_folder(args.folder, "filename")
+    kept, clusters = remove_near_duplicates(images, args.keep, args.threshold)
+    print(f"{len(images)} images, {len(clusters)} duplicate clusters, {len(kept)} kept")
+    for members in clusters:
+        print("  " + ", ".join(image_name(p) for p in members))
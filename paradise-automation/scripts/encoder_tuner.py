@@ -0,0 +1,210 @@
+"""
+Encoder Tuner - Find the fastest x264 settings that meet a quality floor
+
+Renders a short lossless reference from a sample of your own images (Ken
+Burns clips at the output resolution), encodes it with a grid of presets
+and CRFs, and measures for each:
+- Encode speed (frames per second, wall clock)
+- Output bitrate
+- SSIM and PSNR against the reference (FFmpeg ssim/psnr filters)
+
+The fastest setting whose SSIM meets the floor is saved to
+config.ENCODER_PROFILE_PATH; config.py loads it on the next run so every
+render (clips, crossfades, segments, renditions) uses it.
+
+Usage:
+    python scripts/encoder_tuner.py /path/to/images/
+    python scripts/encoder_tuner.py /path/to/images/ --floor 0.98 --samples 6
+"""
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    TEMP_DIR, VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_FPS, VIDEO_CODEC,
+    ENCODER_SSIM_FLOOR, ENCODER_PROFILE_PATH
+)
+from scripts.image_loader import load_images_from_folder
+from scripts.video_assembler import create_image_clip, concatenate_videos
+from scripts.storage import claim_job_dir
+from scripts.tracing import run
+
+DEFAULT_PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow"]
+DEFAULT_CRFS = [18, 20, 23, 26]
+LOSSLESS_ARGS = ['-c:v', VIDEO_CODEC, '-preset', 'ultrafast', '-qp', '0']
+
+
+def build_reference(images: List[str], work_dir: str, seconds_per_image: float = 2.0) -> str:
+    """Render sample images as lossless Ken Burns clips joined into one file."""
+    clips = []
+    for i, image in enumerate(images):
+        clip = os.path.join(work_dir, f"ref_{i:02d}.mp4")
+        create_image_clip(
+            image, seconds_per_image, clip, VIDEO_WIDTH, VIDEO_HEIGHT,
+            ken_burns=True, video_args=LOSSLESS_ARGS
+        )
+        clips.append(clip)
+
+    reference = os.path.join(work_dir, "reference.mp4")
+    concatenate_videos(clips, reference)
+    for clip in clips:
+        os.remove(clip)
+    return reference
+
+
+def measure_quality(encoded: str, reference: str) -> dict:
+    """SSIM (All) and average PSNR of encoded vs reference."""
+    cmd = [
+        'ffmpeg', '-hide_banner', '-nostats',
+        '-i', encoded, '-i', reference,
+        '-lavfi', '[0:v]split[a][b];[1:v]split[c][d];[a][c]ssim;[b][d]psnr',
+        '-f', 'null', '-'
+    ]
+    result = run(cmd, capture_output=True, text=True, check=True)
+    ssim = re.search(r"SSIM .*All:([\d.]+)", result.stderr)
+    psnr = re.search(r"PSNR .*average:([\d.]+|inf)", result.stderr)
+    return {
+        "ssim": float(ssim.group(1)) if ssim else 0.0,
+        "psnr": float(psnr.group(1)) if psnr else 0.0
+    }
+
+
+def trial(reference: str, work_dir: str, preset: str, crf: int, frames: int, duration: float) -> dict:
+    """Encode the reference with one setting and measure it."""
+    encoded = os.path.join(work_dir, f"trial_{preset}_{crf}.mp4")
+    cmd = [
+        'ffmpeg', '-y', '-i', reference, '-an',
+        '-c:v', VIDEO_CODEC, '-preset', preset, '-crf', str(crf),
+        '-pix_fmt', 'yuv420p', encoded
+    ]
+    start = time.perf_counter()
+    run(cmd, check=True, capture_output=True)
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "preset": preset,
+        "crf": crf,
+        "fps": round(frames / elapsed, 1),
+        "bitrate_kbps": round(os.path.getsize(encoded) * 8 / duration / 1000, 1)
+    }
+    result.update(measure_quality(encoded, reference))
+    os.remove(encoded)
+    return result
+
+
+def choose(results: List[dict], floor: float) -> dict:
+    """Fastest result meeting the SSIM floor (ties: lower bitrate)."""
+    passing = [r for r in results if r["ssim"] >= floor]
+    if not passing:
+        print(f"  No setting reached SSIM {floor}; using the best quality one")
+        return max(results, key=lambda r: (r["ssim"], r["fps"]))
+    return max(passing, key=lambda r: (r["fps"], -r["bitrate_kbps"]))
+
+
+def tune(
+    images_folder: str,
+    floor: float = ENCODER_SSIM_FLOOR,
+    samples: int = 4,
+    presets: List[str] = None,
+    crfs: List[int] = None,
+    profile_path: str = ENCODER_PROFILE_PATH
+) -> dict:
+    """
+    Run the preset x CRF grid on sample images and save the chosen profile.
+    Raises ValueError if there is nothing to sample.
+    """
+    presets = presets or DEFAULT_PRESETS
+    crfs = crfs or DEFAULT_CRFS
+    if samples < 1:
+        raise ValueError(f"Need at least one sample image, got --samples {samples}")
+
+    images = load_images_from_folder(images_folder, "filename")
+    step = max(1, len(images) // samples)
+    sample = images[::step][:samples]
+    if not sample:
+        raise ValueError(f"No sample images in {images_folder}")
+
+    work_dir = claim_job_dir(os.path.join(TEMP_DIR, f"tune_{datetime.now().strftime('%Y%m%d_%H%M%S')}"))
+
+    try:
+        print(f"Rendering lossless reference from {len(sample)} images...")
+        seconds_per_image = 2.0
+        reference = build_reference(sample, work_dir, seconds_per_image)
+        duration = seconds_per_image * len(sample)
+        frames = int(duration * VIDEO_FPS)
+        if frames < 1:
+            raise ValueError(f"The reference has no frames ({duration:g}s at {VIDEO_FPS} fps)")
+
+        results = []
+        print(f"{'preset':<10} {'crf':>4} {'fps':>8} {'kbps':>9} {'ssim':>8} {'psnr':>7}")
+        for preset in presets:
+            for crf in crfs:
+                r = trial(reference, work_dir, preset, crf, frames, duration)
+                results.append(r)
+                print(f"{preset:<10} {crf:>4} {r['fps']:>8.1f} {r['bitrate_kbps']:>9.1f} "
+                      f"{r['ssim']:>8.4f} {r['psnr']:>7.2f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    best = choose(results, floor)
+    profile = {
+        "preset": best["preset"],
+        "crf": best["crf"],
+        "ssim": best["ssim"],
+        "psnr": best["psnr"],
+        "fps": best["fps"],
+        "bitrate_kbps": best["bitrate_kbps"],
+        "ssim_floor": floor,
+        "resolution": f"{VIDEO_WIDTH}x{VIDEO_HEIGHT}",
+        "host": socket.gethostname(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "results": results
+    }
+    os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+    # Renamed into place, so a render starting meanwhile never reads half a profile
+    with open(profile_path + ".tmp", "w") as f:
+        json.dump(profile, f, indent=2)
+    os.replace(profile_path + ".tmp", profile_path)
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pick the fastest x264 preset/CRF that meets a quality floor"
+    )
+    parser.add_argument("images_folder", help="Folder with sample images")
+    parser.add_argument("--floor", type=float, default=ENCODER_SSIM_FLOOR,
+                        help=f"Minimum SSIM (default: {ENCODER_SSIM_FLOOR})")
+    parser.add_argument("--samples", type=int, default=4,
+                        help="Number of images in the test render (default: 4)")
+    parser.add_argument("--presets", help="Comma separated x264 presets to try")
+    parser.add_argument("--crfs", help="Comma separated CRF values to try")
+
+    args = parser.parse_args()
+
+    try:
+        profile = tune(
+            args.images_folder,
+            floor=args.floor,
+            samples=args.samples,
+            presets=args.presets.split(",") if args.presets else None,
+            crfs=[int(c) for c in args.crfs.split(",")] if args.crfs else None
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"\nChosen: preset={profile['preset']} crf={profile['crf']} "
+          f"(SSIM {profile['ssim']:.4f}, {profile['fps']:.1f} fps)")
+    print(f"Saved profile: {ENCODER_PROFILE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 """
-Image Loader - Load and sort images from user-provided folder
+Image Loader - Load and sort images from user-provided folder or .zip archive
 """
 import os
 from typing import List
@@ -7,39 +7,49 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import SUPPORTED_IMAGE_FORMATS
+from scripts.archive import is_archive, list_archive_images, image_name, open_image
+from scripts.tracing import traced
 
 
+@traced
 def load_images_from_folder(
     folder_path: str,
     sort_by: str = "date_modified"
 ) -> List[str]:
     """
-    Load images from a folder and sort them.
+    Load images from a folder (or .zip archive) and sort them.
 
     Args:
-        folder_path: Path to folder containing images
+        folder_path: Path to folder containing images, or to a .zip
         sort_by: Sorting method - "date_modified", "filename", "random"
 
     Returns:
-        List of absolute paths to images, sorted as specified
+        List of absolute paths to images, sorted as specified. For a zip,
+        "<archive>::<member>" references (see scripts/archive.py)
     """
-    if not os.path.isdir(folder_path):
+    mtimes = {}
+    if is_archive(folder_path):
+        # Members and their dates come from the central directory
+        for ref, mtime in list_archive_images(folder_path):
+            mtimes[ref] = mtime
+        images = list(mtimes)
+    elif os.path.isdir(folder_path):
+        # Get all image files
+        images = []
+        for filename in os.listdir(folder_path):
+            if filename.lower().endswith(SUPPORTED_IMAGE_FORMATS):
+                images.append(os.path.join(folder_path, filename))
+    else:
         raise ValueError(f"Folder not found: {folder_path}")
 
-    # Get all image files
-    images = []
-    for filename in os.listdir(folder_path):
-        if filename.lower().endswith(SUPPORTED_IMAGE_FORMATS):
-            images.append(os.path.join(folder_path, filename))
-
     if not images:
         raise ValueError(f"No images found in {folder_path}")
 
     # Sort based on method
     if sort_by == "date_modified":
-        images.sort(key=lambda x: os.path.getmtime(x))
+        images.sort(key=lambda x: mtimes[x] if x in mtimes else os.path.getmtime(x))
     elif sort_by == "filename":
-        images.sort(key=lambda x: os.path.basename(x).lower())
+        images.sort(key=lambda x: image_name(x).lower())
     elif sort_by == "random":
         import random
         random.shuffle(images)
@@ -53,10 +63,10 @@ def get_image_info(image_path: str) -> dict:
     """Get basic info about an image."""
     from PIL import Image
 
-    with Image.open(image_path) as img:
+    with Image.open(open_image(image_path)) as img:
         return {
             "path": image_path,
-            "filename": os.path.basename(image_path),
+            "filename": image_name(image_path),
             "width": img.width,
             "height": img.height,
             "format": img.format,
@@ -68,7 +78,7 @@ if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description="Load images from folder")
-    parser.add_argument("folder", help="Path to images folder")
+    parser.add_argument("folder", help="Path to images folder or .zip")
     parser.add_argument("--sort", default="date_modified",
                        choices=["date_modified", "filename", "random"],
                        help="Sort method")
@@ -78,4 +88,4 @@ if __name__ == "__main__":
     images = load_images_from_folder(args.folder, args.sort)
     print(f"Found {len(images)} images:")
     for img in images:
-        print(f"  {os.path.basename(img)}")
+        print(f"  {image_name(img)}")
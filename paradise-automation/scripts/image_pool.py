@@ -0,0 +1,349 @@
+"""
+Image Pool - Decode each photo once per host and share the pixels
+
+Without it every clip, variant, rendition, segment worker and tuning run
+that uses a photo has FFmpeg decode and scale the compressed file again.
+The pool decodes a photo once, at
+the working resolution a clip needs, into a raw RGB frame (rgb24) stored as
+a file under IMAGE_POOL_DIR - /dev/shm where available, so frames live in
+shared memory:
+
+    <IMAGE_POOL_DIR>/<key>.rgb      key = sha1(content hash, width, height, mode)
+
+Animated GIF/WebP sources are pooled as frame sets: every frame, composed
+and scaled to fit the working size (never up), one after another in one
+file, with the frame size and durations in <key>.json next to it
+(animation(), see scripts/animation.py).
+
+Entries are keyed by the image's content, not its path, so a copy of a
+photo in another folder or archive is a hit. Frames are written to a
+.part file and renamed, so processes on the same host can fill the pool
+concurrently. Readers use the file itself: FFmpeg reads it by path as
+-f rawvideo -pix_fmt rgb24 (acquire() returns it), view() maps it as a
+zero-copy numpy array.
+
+A frame that doesn't fit (ENOSPC: /dev/shm is often 64 MB in containers)
+is written to IMAGE_POOL_SPILL_DIR on disk instead; lookups check both.
+
+Every hit touches the entry; when the pool is over IMAGE_POOL_MAX_MB the
+least recently used frames are removed, except those used in the last
+IMAGE_POOL_MIN_AGE seconds (a running FFmpeg may still be reading them).
+
+Usage:
+    python scripts/image_pool.py            # Entries and size
+    python scripts/image_pool.py --clear
+"""
+import os
+import sys
+import json
+import time
+import errno
+import hashlib
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    IMAGE_POOL_ENABLED, IMAGE_POOL_DIR, IMAGE_POOL_SPILL_DIR, IMAGE_POOL_MAX_MB, IMAGE_POOL_MIN_AGE
+)
+from scripts.archive import read_image, image_signature
+from scripts.tracing import traced
+
+# Stretch to the size (classic Ken Burns working frame) / letterbox into it /
+# fit over a blurred copy (config.FRAMING = "blur")
+MODES = ("fill", "fit", "blur")
+BLUR_ASPECT_TOLERANCE = 0.02  # Closer to the frame's aspect ratio than this: scaled to fill
+BLUR_RADIUS = 8  # Box blur radius (two passes) at quarter resolution, as the "blur" rendition
+
+
+def available() -> bool:
+    """True if the pool is enabled and Pillow (needed to decode) is installed."""
+    if not IMAGE_POOL_ENABLED:
+        return False
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def decode(data: bytes, width: int, height: int, mode: str = "fill") -> bytes:
+    """
+    Decode image bytes to a width x height rgb24 frame.
+
+    "fill" stretches to the size (like FFmpeg's scale=W:H), "fit" scales to
+    fit and pads with black, centred (scale=...:force_original_aspect_ratio=
+    decrease,pad=...). "blur" fits the image over a blurred copy of itself
+    scaled to cover the frame; images already (almost) the frame's aspect
+    ratio are scaled to fill it. The background is blurred at quarter
+    resolution and scaled up, and composed with the image once here, so a
+    clip only repeats or zooms the finished frame.
+    """
+    import io
+    from PIL import Image, ImageFilter, ImageOps
+
+    with Image.open(io.BytesIO(data)) as img:
+        img.draft("RGB", (width, height))  # JPEG: let libjpeg downscale while decoding
+        img = img.convert("RGB")
+    if mode == "blur" and abs(img.width / img.height / (width / height) - 1) <= BLUR_ASPECT_TOLERANCE:
+        mode = "fill"
+    if mode == "fill":
+        if img.size != (width, height):
+            img = img.resize((width, height), Image.BICUBIC)
+        return img.tobytes()
+
+    scale = min(width / img.width, height / img.height)
+    size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+    if img.size != size:
+        img = img.resize(size, Image.BICUBIC)
+    if size == (width, height):
+        return img.tobytes()
+    if mode == "blur":
+        small = (max(2, width // 8 * 2), max(2, height // 8 * 2))
+        canvas = ImageOps.fit(img, small, Image.BILINEAR)
+        for _ in range(2):
+            canvas = canvas.filter(ImageFilter.BoxBlur(BLUR_RADIUS))
+        canvas = canvas.resize((width, height), Image.BILINEAR)
+    else:
+        canvas = Image.new("RGB", (width, height))
+    canvas.paste(img, ((width - size[0]) // 2, (height - size[1]) // 2))
+    return canvas.tobytes()
+
+
+def decode_animation(data: bytes, max_width: int, max_height: int) -> tuple:
+    """
+    Decode every frame of an animated image to rgb24, scaled to fit
+    max_width x max_height (never up). Frames are composed (GIF disposal,
+    WebP blending) by Pillow; transparency shows black.
+
+    Returns:
+        (frames as one bytes object, (width, height), [seconds per frame])
+    """
+    import io
+    from PIL import Image, ImageSequence
+
+    frames, durations = [], []
+    with Image.open(io.BytesIO(data)) as img:
+        scale = min(1.0, max_width / img.width, max_height / img.height)
+        size = (max(2, int(img.width * scale) // 2 * 2), max(2, int(img.height * scale) // 2 * 2))
+        for frame in ImageSequence.Iterator(img):
+            rgba = frame.convert("RGBA")
+            canvas = Image.new("RGB", rgba.size)
+            canvas.paste(rgba, mask=rgba)
+            if canvas.size != size:
+                canvas = canvas.resize(size, Image.BICUBIC)
+            frames.append(canvas.tobytes())
+            # Like browsers: delays under 20 ms (often 0) play at 100 ms
+            ms = frame.info.get("duration") or 0
+            durations.append((ms if ms >= 20 else 100) / 1000)
+    return b"".join(frames), size, durations
+
+
+class ImagePool:
+    """Decoded frames shared by every process on the host (see module docstring)."""
+
+    def __init__(self, directory: str = IMAGE_POOL_DIR, max_mb: float = IMAGE_POOL_MAX_MB,
+                 min_age: float = IMAGE_POOL_MIN_AGE, spill_dir: str = IMAGE_POOL_SPILL_DIR):
+        self.directory = directory
+        # Where frames go when directory is full (none if it is the same place)
+        self.directories = [directory] + ([spill_dir] if spill_dir and spill_dir != directory else [])
+        self.max_bytes = int(max_mb * 1024 ** 2)
+        self.min_age = min_age
+        self.hits = 0
+        self.decodes = 0
+        self._hashes = {}  # (ref, signature) -> content hash, so unchanged files aren't re-read
+        self._lock = threading.Lock()
+
+    def _content_hash(self, ref: str) -> tuple:
+        """(content hash, bytes or None) - bytes are returned when they had to be read."""
+        signature = (ref, tuple(image_signature(ref)))
+        with self._lock:
+            digest = self._hashes.get(signature)
+        if digest:
+            return digest, None
+        data = read_image(ref)
+        digest = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            self._hashes[signature] = digest
+        return digest, data
+
+    def path(self, digest: str, width: int, height: int, mode: str) -> str:
+        key = hashlib.sha1(f"{digest}:{width}x{height}:{mode}".encode()).hexdigest()
+        return os.path.join(self.directory, f"{key}.rgb")
+
+    def _find(self, path: str) -> str:
+        """Where the entry at path is (there or in the spill directory), touched; None on a miss."""
+        for directory in self.directories:
+            found = os.path.join(directory, os.path.basename(path))
+            try:
+                os.utime(found)  # Recently used, for eviction
+                return found
+            except FileNotFoundError:
+                pass
+        return None
+
+    def _write(self, path: str, files: dict) -> str:
+        """
+        Write an entry's files ({suffix: bytes}, renamed in order, so the
+        last one marks it complete) as path with those suffixes; in the
+        spill directory if the pool's is full. Returns the entry's path.
+        """
+        stem = os.path.basename(path)[:-4]
+        for directory in self.directories:
+            os.makedirs(directory, exist_ok=True)
+            part = os.path.join(directory, f"{stem}.part.{os.getpid()}.{threading.get_ident()}")
+            try:
+                for suffix, content in files.items():
+                    with open(part + suffix, "wb") as f:
+                        f.write(content)
+            except OSError as e:
+                for suffix in files:
+                    if os.path.exists(part + suffix):
+                        os.remove(part + suffix)
+                if e.errno != errno.ENOSPC or directory == self.directories[-1]:
+                    raise
+                continue
+            for suffix in files:
+                os.replace(part + suffix, os.path.join(directory, stem + suffix))
+            return os.path.join(directory, stem + ".rgb")
+
+    def locate(self, ref: str, width: int, height: int, mode: str = "fill") -> str:
+        """Path ref's frame is (or will be, once acquired) at, without decoding it."""
+        path = self.path(self._content_hash(ref)[0], width, height, mode)
+        return self._find(path) or path
+
+    @traced
+    def acquire(self, ref: str, width: int, height: int, mode: str = "fill") -> str:
+        """
+        Path of ref's width x height frame in the pool, decoding it on a miss
+        (FFmpeg input: -f rawvideo -pix_fmt rgb24 -s WxH -i <path>).
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown pool mode: {mode}")
+        digest, data = self._content_hash(ref)
+        path = self.path(digest, width, height, mode)
+        found = self._find(path)
+        if found:
+            with self._lock:
+                self.hits += 1
+            return found
+
+        frame = decode(data if data is not None else read_image(ref), width, height, mode)
+        path = self._write(path, {".rgb": frame})
+        with self._lock:
+            self.decodes += 1
+        self.evict()
+        return path
+
+    @traced
+    def animation(self, ref: str, max_width: int, max_height: int) -> dict:
+        """
+        ref's frame set in the pool (see decode_animation()), decoding it on
+        a miss: {"path", "width", "height", "durations"}.
+        """
+        digest, data = self._content_hash(ref)
+        path = self.path(digest, max_width, max_height, "frames")
+        found = self._find(path)
+        if found:
+            try:
+                with open(found[:-4] + ".json") as f:
+                    meta = json.load(f)
+                with self._lock:
+                    self.hits += 1
+                return dict(meta, path=found)
+            except (FileNotFoundError, ValueError):
+                pass
+
+        frames, (width, height), durations = decode_animation(
+            data if data is not None else read_image(ref), max_width, max_height
+        )
+        meta = {"width": width, "height": height, "durations": durations}
+        # The .json goes last: a readable .json means the frames are there
+        path = self._write(path, {".rgb": frames, ".json": json.dumps(meta).encode()})
+        with self._lock:
+            self.decodes += 1
+        self.evict()
+        return dict(meta, path=path)
+
+    def view(self, ref: str, width: int, height: int, mode: str = "fill"):
+        """ref's frame as a read-only (height, width, 3) uint8 array mapped from the pool."""
+        import numpy as np
+        path = self.acquire(ref, width, height, mode)
+        return np.memmap(path, dtype=np.uint8, mode="r", shape=(height, width, 3))
+
+    def entries(self) -> list:
+        """(path, size, last used) of every frame, least recently used first."""
+        entries = []
+        for directory in self.directories:
+            for name in os.listdir(directory) if os.path.isdir(directory) else []:
+                if not name.endswith(".rgb") or ".part." in name:
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue  # Evicted by another process
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda e: e[2])
+
+    def evict(self) -> int:
+        """Remove least recently used frames until the pool fits. Returns bytes freed."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        cutoff = time.time() - self.min_age
+        freed = 0
+        for path, size, used in entries:
+            if total - freed <= self.max_bytes or used > cutoff:
+                break
+            try:
+                os.remove(path)  # A process that already opened it keeps reading
+                freed += size
+            except FileNotFoundError:
+                pass
+            _remove_meta(path)
+        return freed
+
+    def clear(self) -> int:
+        """Remove every frame. Returns the number removed."""
+        entries = self.entries()
+        for path, _, _ in entries:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            _remove_meta(path)
+        return len(entries)
+
+
+def _remove_meta(path: str):
+    """Remove a frame set's .json (other entries have none)."""
+    try:
+        os.remove(path[:-4] + ".json")
+    except FileNotFoundError:
+        pass
+
+
+_default = None
+
+
+def default_pool() -> ImagePool:
+    """The process-wide pool on IMAGE_POOL_DIR."""
+    global _default
+    if _default is None:
+        _default = ImagePool()
+    return _default
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show or clear the decoded image pool")
+    parser.add_argument("--clear", action="store_true", help="Remove every decoded frame")
+    args = parser.parse_args()
+
+    pool = default_pool()
+    if args.clear:
+        print(f"Removed {pool.clear()} frames from {', '.join(pool.directories)}")
+        sys.exit(0)
+    entries = pool.entries()
+    size = sum(s for _, s, _ in entries)
+    print(f"{', '.join(pool.directories)}: {len(entries)} frames, {size / 1024 ** 2:.1f} MB "
+          f"(cap {IMAGE_POOL_MAX_MB} MB{'' if IMAGE_POOL_ENABLED else ', pool disabled'})")
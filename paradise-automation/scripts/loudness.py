@@ -0,0 +1,117 @@
+"""
+Loudness - EBU R128 normalization for music beds
+
+Pass 1 measures integrated loudness and true peak with FFmpeg's loudnorm
+filter. The result is cached per source file in assets/loudness/, so each
+track is analysed once. Every later render only applies the resulting
+linear gain through the volume filter already in the music filtergraph.
+
+The gain is limited so the true peak stays under LOUDNESS_TRUE_PEAK (a
+plain gain cannot limit peaks the way loudnorm's dynamic mode does).
+
+Usage:
+    python scripts/loudness.py /path/to/song.mp3
+"""
+import os
+import sys
+import json
+import hashlib
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import LOUDNESS_CACHE_DIR, LOUDNESS_TARGET_LUFS, LOUDNESS_TRUE_PEAK
+from scripts.tracing import run, traced
+
+
+def measure_loudness(audio_path: str) -> dict:
+    """
+    Measure loudness with one loudnorm analysis pass.
+
+    Returns:
+        Dict with input_i (LUFS), input_tp (dBTP), input_lra (LU), input_thresh
+    """
+    cmd = [
+        'ffmpeg', '-hide_banner', '-nostats',
+        '-i', audio_path,
+        '-vn',
+        '-af', f'loudnorm=I={LOUDNESS_TARGET_LUFS}:TP={LOUDNESS_TRUE_PEAK}:print_format=json',
+        '-f', 'null', '-'
+    ]
+    result = run(cmd, capture_output=True, text=True, check=True)
+
+    # loudnorm prints its JSON block at the end of stderr
+    stderr = result.stderr
+    data = json.loads(stderr[stderr.rindex('{'):stderr.rindex('}') + 1])
+    return {key: float(data[key]) for key in ('input_i', 'input_tp', 'input_lra', 'input_thresh')}
+
+
+def _cache_path(audio_path: str) -> str:
+    key = hashlib.sha1(os.path.abspath(audio_path).encode()).hexdigest()[:16]
+    return os.path.join(LOUDNESS_CACHE_DIR, f"{key}.json")
+
+
+@traced
+def get_loudness(audio_path: str) -> dict:
+    """Measured loudness for a file, from cache if the file is unchanged."""
+    stat = os.stat(audio_path)
+    sig = [stat.st_size, int(stat.st_mtime)]
+    cache_path = _cache_path(audio_path)
+
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path) as f:
+                cached = json.load(f)
+            if cached.get("sig") == sig:
+                return cached["loudness"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    loudness = measure_loudness(audio_path)
+    os.makedirs(LOUDNESS_CACHE_DIR, exist_ok=True)
+    with open(cache_path, "w") as f:
+        json.dump({"path": os.path.abspath(audio_path), "sig": sig, "loudness": loudness}, f, indent=2)
+    return loudness
+
+
+def gain_for(
+    measured_lufs: float,
+    measured_tp: float,
+    target_lufs: float = LOUDNESS_TARGET_LUFS,
+    true_peak: float = LOUDNESS_TRUE_PEAK
+) -> float:
+    """
+    Linear gain that brings a track measured at measured_lufs to target_lufs
+    without exceeding true_peak.
+
+    Returns 1.0 for silent or unmeasurable tracks.
+    """
+    if measured_lufs is None or measured_lufs == float("-inf") or measured_lufs != measured_lufs:
+        return 1.0
+
+    gain_db = target_lufs - measured_lufs
+    gain_db = min(gain_db, true_peak - measured_tp)
+    return 10 ** (gain_db / 20)
+
+
+def loudness_gain(
+    audio_path: str,
+    target_lufs: float = LOUDNESS_TARGET_LUFS,
+    true_peak: float = LOUDNESS_TRUE_PEAK
+) -> float:
+    """Gain for a file (see gain_for())."""
+    loudness = get_loudness(audio_path)
+    return gain_for(loudness["input_i"], loudness["input_tp"], target_lufs, true_peak)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure track loudness (EBU R128)")
+    parser.add_argument("audio", help="Path to audio file")
+
+    args = parser.parse_args()
+
+    loudness = get_loudness(args.audio)
+    gain = loudness_gain(args.audio)
+    print(f"Integrated: {loudness['input_i']:.1f} LUFS")
+    print(f"True peak:  {loudness['input_tp']:.1f} dBTP")
+    print(f"Range:      {loudness['input_lra']:.1f} LU")
+    print(f"Gain to {LOUDNESS_TARGET_LUFS} LUFS: x{gain:.3f}")
@@ -0,0 +1,394 @@
+"""
+Music Catalog - One local index of every track, probed once
+
+Curated downloads (assets/music/<track_id>.mp3), YouTube audio
+(assets/music/youtube/) and any user file used with --music-file are
+indexed in a SQLite database (assets/music/catalog.sqlite) with:
+- duration, codec, sample rate, channels, bit rate (one ffprobe call)
+- loudness and true peak (scripts/loudness.py)
+- usable start/end and tempo (scripts/audio_analysis.py)
+- SHA-1 of the content
+
+Rows are keyed by path and checked against size and mtime on every
+lookup. Indexing only probes the file; loudness and the analysis are
+filled in the first time a run asks for them (lookup(loudness=True),
+lookup(analysis=True)), so a run that neither normalizes nor trims
+automatically never decodes the track. A copy of a track that was already
+measured (same hash) takes the measurements over instead of decoding again.
+Planning reads durations and trims from here instead of probing.
+
+Usage:
+    python scripts/music_catalog.py scan [extra_dir ...]
+    python scripts/music_catalog.py list
+    python scripts/music_catalog.py fit 40 --seconds 4
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    MUSIC_DIR, YOUTUBE_MUSIC_DIR, MUSIC_CATALOG_PATH, CROSSFADE_ENABLED, CROSSFADE_DURATION,
+    MIN_IMAGE_DURATION, MAX_IMAGE_DURATION
+)
+from scripts.loudness import get_loudness
+from scripts.audio_analysis import analyse
+from scripts.tracing import run, traced
+
+AUDIO_EXTENSIONS = ('.mp3', '.m4a', '.aac', '.wav', '.flac', '.ogg', '.opus')
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    path TEXT PRIMARY KEY,
+    source TEXT NOT NULL,          -- curated, youtube or user
+    track_id TEXT,                 -- MUSIC_TRACKS / YOUTUBE_TRACKS id or video id
+    name TEXT,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    sha1 TEXT,                     -- hashed when the track is first measured
+    duration REAL NOT NULL,
+    codec TEXT,
+    sample_rate INTEGER,
+    channels INTEGER,
+    bit_rate INTEGER,
+    loudness REAL,
+    true_peak REAL,
+    measured_at INTEGER,           -- loudness filled (NULL: not yet)
+    tempo REAL,
+    trim_start REAL,
+    trim_end REAL,
+    intro INTEGER,
+    analysed_at INTEGER,           -- tempo and trim filled (NULL: not yet)
+    indexed_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tracks_usable ON tracks (trim_end - trim_start);
+CREATE INDEX IF NOT EXISTS tracks_sha1 ON tracks (sha1);
+"""
+
+LOUDNESS_COLUMNS = ("loudness", "true_peak", "measured_at")
+ANALYSIS_COLUMNS = ("tempo", "trim_start", "trim_end", "intro", "analysed_at")
+
+
+def connect(path: str = MUSIC_CATALOG_PATH) -> sqlite3.Connection:
+    """Open (and create or upgrade) the catalog."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        conn.execute("DROP TABLE IF EXISTS tracks")
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+def content_hash(path: str) -> str:
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def probe(path: str) -> dict:
+    """Duration and audio stream parameters from one ffprobe call."""
+    cmd = [
+        'ffprobe', '-v', 'quiet', '-print_format', 'json',
+        '-show_format', '-show_streams', '-select_streams', 'a:0', path
+    ]
+    data = json.loads(run(cmd, capture_output=True, text=True, check=True).stdout)
+    stream = (data.get("streams") or [{}])[0]
+    fmt = data["format"]
+    return {
+        "duration": float(fmt["duration"]),
+        "codec": stream.get("codec_name"),
+        "sample_rate": int(stream["sample_rate"]) if stream.get("sample_rate") else None,
+        "channels": stream.get("channels"),
+        "bit_rate": int(fmt["bit_rate"]) if fmt.get("bit_rate") else None
+    }
+
+
+def classify(path: str) -> tuple:
+    """(source, track_id, name) from where the file lives."""
+    from scripts.music_downloader import MUSIC_TRACKS, YOUTUBE_TRACKS
+    from scripts.youtube_audio import get_video_id
+
+    folder = os.path.dirname(os.path.abspath(path))
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if folder == os.path.abspath(MUSIC_DIR) and stem in MUSIC_TRACKS:
+        return "curated", stem, MUSIC_TRACKS[stem]["name"]
+    if folder == os.path.abspath(YOUTUBE_MUSIC_DIR):
+        for track_id, track in YOUTUBE_TRACKS.items():
+            if stem.startswith(get_video_id(track["url"])):
+                return "youtube", track_id, track["name"]
+        return "youtube", stem, stem
+    return "user", None, stem
+
+
+def _row(conn: sqlite3.Connection, path: str) -> Optional[dict]:
+    row = conn.execute("SELECT * FROM tracks WHERE path = ?", (path,)).fetchone()
+    return dict(row) if row else None
+
+
+@traced
+def index_track(conn: sqlite3.Connection, path: str) -> tuple:
+    """
+    Make sure path's row is current. A new or changed file is probed;
+    its loudness and analysis are left for fill_loudness()/fill_analysis().
+
+    Returns:
+        (row, status) - status is "unchanged" or "indexed"
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    size, mtime = stat.st_size, int(stat.st_mtime)
+    row = _row(conn, path)
+    if row and row["size"] == size and row["mtime"] == mtime:
+        return row, "unchanged"
+
+    source, track_id, name = classify(path)
+    values = probe(path)
+    values.update({
+        "path": path, "source": source, "track_id": track_id, "name": name,
+        "size": size, "mtime": mtime, "indexed_at": int(time.time())
+    })
+    columns = ", ".join(values)
+    conn.execute(f"INSERT OR REPLACE INTO tracks ({columns}) VALUES ({', '.join('?' * len(values))})",
+                 list(values.values()))
+    conn.commit()
+    return _row(conn, path), "indexed"
+
+
+def _fill(conn: sqlite3.Connection, row: dict, columns: tuple, measure, same_intro: bool = False) -> dict:
+    """
+    Fill columns (the last is the *_at marker) of an indexed row: copied
+    from another row with the same content if that one has them, else
+    from measure(row). Returns the updated row.
+    """
+    if row[columns[-1]] is not None:
+        return row
+    sha1 = row["sha1"] or content_hash(row["path"])
+    query = f"SELECT * FROM tracks WHERE sha1 = ? AND path != ? AND {columns[-1]} IS NOT NULL"
+    copies = conn.execute(query, (sha1, row["path"])).fetchall()
+    # The analysis depends on intro detection, which only YouTube audio gets
+    same = next((c for c in copies
+                 if not same_intro or (c["source"] == "youtube") == (row["source"] == "youtube")), None)
+    if same:
+        values = {k: same[k] for k in columns}
+    else:
+        values = dict(measure(row), **{columns[-1]: int(time.time())})
+    values["sha1"] = sha1
+    conn.execute(f"UPDATE tracks SET {', '.join(f'{k} = ?' for k in values)} WHERE path = ?",
+                 [*values.values(), row["path"]])
+    conn.commit()
+    return _row(conn, row["path"])
+
+
+@traced
+def fill_loudness(conn: sqlite3.Connection, row: dict) -> dict:
+    """Loudness and true peak for an indexed row (one loudnorm pass the first time)."""
+    def measure(row):
+        loudness = get_loudness(row["path"])
+        return {"loudness": loudness["input_i"], "true_peak": loudness["input_tp"]}
+    return _fill(conn, row, LOUDNESS_COLUMNS, measure)
+
+
+@traced
+def fill_analysis(conn: sqlite3.Connection, row: dict) -> dict:
+    """Tempo and usable start/end for an indexed row (one decode the first time)."""
+    def measure(row):
+        # Same rule as pipeline.get_music_trim(): only YouTube audio has spoken intros
+        analysis = analyse(row["path"], detect_intro=row["source"] == "youtube")
+        trim = analysis["trim"]
+        return {
+            "tempo": analysis["tempo"],
+            "trim_start": trim["start"],
+            "trim_end": min(trim["end"], row["duration"]),
+            "intro": int(trim["intro"])
+        }
+    return _fill(conn, row, ANALYSIS_COLUMNS, measure, same_intro=True)
+
+
+def lookup(path: str, loudness: bool = False, analysis: bool = False) -> dict:
+    """
+    The catalog row for an audio file, indexing it first if it is new or
+    changed. loudness/analysis fill those columns if they are not yet.
+    """
+    conn = connect()
+    try:
+        row = index_track(conn, path)[0]
+        if loudness:
+            row = fill_loudness(conn, row)
+        if analysis:
+            row = fill_analysis(conn, row)
+        return row
+    finally:
+        conn.close()
+
+
+def beat_grid(path: str) -> tuple:
+    """
+    (tempo, beat times in seconds) for an audio file, from the cached
+    analysis (made now if the track hasn't been analysed yet).
+    """
+    track = lookup(path, analysis=True)
+    analysis = analyse(path, detect_intro=track["source"] == "youtube")
+    return analysis["tempo"], analysis["beats"]
+
+
+def cached(path: str) -> Optional[dict]:
+    """The catalog row for path as last indexed, without checking the file."""
+    if not os.path.exists(MUSIC_CATALOG_PATH):
+        return None
+    conn = connect()
+    try:
+        return _row(conn, os.path.abspath(path))
+    finally:
+        conn.close()
+
+
+def audio_files(directory: str) -> List[str]:
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(AUDIO_EXTENSIONS) and "_temp." not in name and not name.startswith(".")
+    )
+
+
+def scan(extra_dirs: List[str] = ()) -> dict:
+    """
+    Index and measure curated and YouTube tracks plus audio files in
+    extra_dirs, and forget rows whose files are gone.
+
+    Returns:
+        Counts per status (see index_track()) and "removed"
+    """
+    conn = connect()
+    counts = {"unchanged": 0, "indexed": 0, "removed": 0}
+    try:
+        for directory in [MUSIC_DIR, YOUTUBE_MUSIC_DIR, *extra_dirs]:
+            for path in audio_files(directory):
+                row, status = index_track(conn, path)
+                # fit needs the usable length; list shows loudness and tempo
+                fill_analysis(conn, fill_loudness(conn, row))
+                counts[status] += 1
+                if status != "unchanged":
+                    print(f"  {status}: {os.path.basename(path)}")
+        for row in conn.execute("SELECT path FROM tracks").fetchall():
+            if not os.path.exists(row["path"]):
+                conn.execute("DELETE FROM tracks WHERE path = ?", (row["path"],))
+                counts["removed"] += 1
+        conn.commit()
+    finally:
+        conn.close()
+    return counts
+
+
+def timeline_seconds(images: int, seconds: float, crossfade: float) -> float:
+    """Length of images clips of seconds each, crossfades overlapping."""
+    return images * seconds - max(0, images - 1) * crossfade
+
+
+def fits(
+    images: int,
+    seconds: float = None,
+    tolerance: float = 0.1,
+    crossfade: float = CROSSFADE_DURATION if CROSSFADE_ENABLED else 0.0,
+    source: str = None
+) -> List[dict]:
+    """
+    Tracks whose usable length suits a slideshow of images images.
+
+    With seconds: usable length within tolerance of images at seconds each,
+    closest first. Without: every image would get between
+    MIN_IMAGE_DURATION and MAX_IMAGE_DURATION, longest first.
+    """
+    if seconds:
+        target = timeline_seconds(images, seconds, crossfade)
+        low, high = target * (1 - tolerance), target * (1 + tolerance)
+        order = f"ABS((trim_end - trim_start) - {target!r})"
+    else:
+        low = timeline_seconds(images, MIN_IMAGE_DURATION, crossfade)
+        high = timeline_seconds(images, MAX_IMAGE_DURATION, crossfade)
+        order = "(trim_end - trim_start) DESC"
+
+    query = "SELECT *, trim_end - trim_start AS usable FROM tracks WHERE trim_end - trim_start BETWEEN ? AND ?"
+    params = [low, high]
+    if source:
+        query += " AND source = ?"
+        params.append(source)
+    conn = connect()
+    try:
+        rows = conn.execute(f"{query} ORDER BY {order}", params).fetchall()
+    finally:
+        conn.close()
+    return [dict(r) for r in rows]
+
+
+def all_tracks() -> List[dict]:
+    conn = connect()
+    try:
+        return [dict(r) for r in conn.execute(
+            "SELECT *, trim_end - trim_start AS usable FROM tracks ORDER BY source, name"
+        ).fetchall()]
+    finally:
+        conn.close()
+
+
+def _minutes(seconds: float) -> str:
+    return f"{int(seconds // 60)}:{int(seconds % 60):02d}"
+
+
+def print_tracks(rows: List[dict], images: int = None):
+    print(f"{'source':<8} {'track':<24} {'usable':>7} {'tempo':>6} {'LUFS':>6}"
+          + (f" {'s/image':>8}" if images else ""))
+    for row in rows:
+        name = (row["track_id"] or row["name"])[:24]
+        tempo = f"{row['tempo']:.0f}" if row["tempo"] else "-"
+        loudness = f"{row['loudness']:.1f}" if row["loudness"] is not None else "-"
+        usable = _minutes(row["usable"]) if row["usable"] is not None else "-"
+        line = f"{row['source']:<8} {name:<24} {usable:>7} {tempo:>6} {loudness:>6}"
+        if images:
+            fade = CROSSFADE_DURATION if CROSSFADE_ENABLED and images > 1 else 0.0
+            line += f" {(row['usable'] + (images - 1) * fade) / images:>8.2f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index and query local music")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    scan_cmd = sub.add_parser("scan", help="Index curated, YouTube and extra folders' tracks")
+    scan_cmd.add_argument("dirs", nargs="*", help="Extra folders of audio files")
+
+    sub.add_parser("list", help="List indexed tracks")
+
+    fit = sub.add_parser("fit", help="Tracks that fit a number of images")
+    fit.add_argument("images", type=int, help="Number of images")
+    fit.add_argument("--seconds", type=float, help="Seconds per image (default: any allowed duration)")
+    fit.add_argument("--tolerance", type=float, default=0.1, help="Allowed length difference (default: 0.1)")
+    fit.add_argument("--source", choices=["curated", "youtube", "user"], help="Only tracks from this source")
+
+    args = parser.parse_args()
+
+    if args.command == "scan":
+        counts = scan(args.dirs)
+        print(", ".join(f"{n} {status}" for status, n in counts.items()))
+    elif args.command == "list":
+        print_tracks(all_tracks())
+    else:
+        rows = fits(args.images, args.seconds, args.tolerance, source=args.source)
+        if not rows:
+            print("No indexed track fits (run 'scan' to index new music)")
+            sys.exit(1)
+        print_tracks(rows, args.images)
+
+
+if __name__ == "__main__":
+    main()
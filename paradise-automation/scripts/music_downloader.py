@@ -133,13 +133,23 @@ def download_all(output_dir: str = None) -> dict:
 
 def list_tracks():
     """List all available tracks."""
+    from scripts.music_catalog import cached
+
     print("\nAvailable Romantic/Sensuous Music Tracks:")
     print("=" * 60)
     for track_id, track in MUSIC_TRACKS.items():
+        # Downloaded tracks show the catalog's probed numbers
+        indexed = cached(os.path.join(MUSIC_DIR, f"{track_id}.mp3"))
+        duration = track['duration']
+        if indexed:
+            seconds = indexed["duration"]
+            duration = f"{int(seconds // 60)}:{int(seconds % 60):02d}"
+            if indexed["tempo"]:
+                duration += f" ({indexed['tempo']:.0f} BPM)"
         print(f"\n  {track_id}")
         print(f"    Name: {track['name']}")
         print(f"    Description: {track['description']}")
-        print(f"    Duration: {track['duration']}")
+        print(f"    Duration: {duration}")
         print(f"    Mood: {track['mood']}")
     print("\n" + "=" * 60)
     print("All tracks are FREE and safe for YouTube monetization")
@@ -0,0 +1,687 @@
+"""
+Render Plan - A declarative timeline and the compiler that renders it
+
+A plan is plain JSON describing what the video is, not how to make it:
+
+    {
+      "version": 1,
+      "output": {"width": 1920, "height": 1080, "fps": 25, "encoder": [...]},
+      "clips": [{"source": "a.jpg", "sig": [...], "size": [w, h],
+                 "frames": 75, "effect": "ken_burns" | "none",
+                 "framing": "classic" | "blur", "indices": [0],
+                 "animation": "loop" | "stretch" (animated sources only)}],
+      "transition": {"type": "fade" | "cut", "frames": 12},
+      "audio": {"source": "song.mp3", "sig": [...], "volume": 1.0,
+                "loop": true, "fades": true, "bitrate": "192k", "codec": "aac"} | null
+    }
+
+build_plan() creates it, optimize_plan() simplifies it and compile_plan()
+turns it into FFmpeg steps:
+- Adjacent holds of the same image (no effect) become one longer hold
+- Sources that already have the output size skip scale/pad
+- A cut-only run of static holds is encoded in one pass (concat demuxer,
+  or image2pipe for zip members) instead of one clip per image
+- Clips start from the photo's decoded working frame in the host's image
+  pool (scripts/image_pool.py) instead of decoding it in every FFmpeg;
+  animated GIF/WebP clips play their pooled frame set (scripts/animation.py)
+- Clips are joined with stream copy when there is no crossfade
+- Music is muxed with stream copy of the video
+
+Every step is keyed by a hash of everything that affects its output, and
+outputs are cached under those keys, so re-rendering an edited plan only
+runs the steps whose inputs changed. diff_plans() reports what changed.
+
+Usage:
+    python scripts/render_plan.py show plan.json
+    python scripts/render_plan.py diff old_plan.json new_plan.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import difflib
+import contextlib
+import threading
+import subprocess
+import uuid
+from collections import Counter
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import VIDEO_FPS, AUDIO_CODEC, AUDIO_BITRATE, FRAMING, ANIMATION_TIMING
+from scripts.archive import is_member, read_image, open_image, image_signature
+from scripts.timeline import to_frames
+from scripts.animation import is_animated
+from scripts.tracing import run, span, traced, is_tracing, parse_benchmark
+from scripts.cost_model import children_cpu, record_step
+from scripts.streaming import fragment_args, tee_output, fragmented_tee_output, track_fragments
+from scripts.video_assembler import (
+    image_clip_command, working_frame, blur_framing_filter, music_filter
+)
+from scripts.render_settings import DEFAULT_SETTINGS
+from scripts import image_pool
+
+PLAN_VERSION = 1
+IMAGE_CODECS = {'.jpg': 'mjpeg', '.jpeg': 'mjpeg', '.png': 'png'}
+
+
+def image_size(ref: str):
+    """(width, height) of an image, or None if Pillow is not installed."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    with Image.open(open_image(ref)) as img:
+        return list(img.size)
+
+
+def audio_track(
+    music_path: str,
+    music_volume: float = 1.0,
+    loop_music: bool = True,
+    music_fades: bool = True,
+    audio_bitrate: str = AUDIO_BITRATE,
+    music_start: float = 0.0,
+    audio_codec: str = AUDIO_CODEC
+) -> dict:
+    """The "audio" entry of a plan. music_start skips the track's intro."""
+    stat = os.stat(music_path)
+    return {
+        "source": os.path.abspath(music_path),
+        "sig": [stat.st_size, int(stat.st_mtime)],
+        "start": music_start,
+        "volume": music_volume,
+        "loop": loop_music,
+        "fades": music_fades,
+        "bitrate": audio_bitrate,
+        "codec": audio_codec
+    }
+
+
+def build_plan(
+    images: List[str],
+    durations: List[float],
+    width: int = 1920,
+    height: int = 1080,
+    ken_burns: bool = True,
+    crossfade: bool = True,
+    crossfade_duration: float = 0.5,
+    music_path: str = None,
+    music_volume: float = 1.0,
+    loop_music: bool = True,
+    music_fades: bool = True,
+    audio_bitrate: str = AUDIO_BITRATE,
+    encoder: List[str] = None,
+    fps: int = VIDEO_FPS,
+    music_start: float = 0.0,
+    framing: str = FRAMING,
+    audio_codec: str = AUDIO_CODEC,
+    animation_timing: str = ANIMATION_TIMING
+) -> dict:
+    """Describe a slideshow as a render plan."""
+    clips = []
+    for i, (image, duration) in enumerate(zip(images, durations)):
+        clip = {
+            "source": image,
+            "sig": image_signature(image),
+            "size": image_size(image),
+            "frames": to_frames(duration, fps),
+            "effect": "ken_burns" if ken_burns else "none",
+            "framing": framing,
+            "indices": [i]
+        }
+        if image_pool.available() and is_animated(image):
+            clip["animation"] = animation_timing
+        clips.append(clip)
+
+    audio = None
+    if music_path:
+        audio = audio_track(music_path, music_volume, loop_music, music_fades, audio_bitrate, music_start,
+                            audio_codec)
+
+    fade = to_frames(crossfade_duration, fps) if crossfade and len(clips) > 1 else 0
+    return {
+        "version": PLAN_VERSION,
+        "output": {
+            "width": width,
+            "height": height,
+            "fps": fps,
+            "encoder": encoder or DEFAULT_SETTINGS.encoder_args()
+        },
+        "clips": clips,
+        "transition": {"type": "fade" if fade else "cut", "frames": fade},
+        "audio": audio
+    }
+
+
+def optimize_plan(plan: dict) -> dict:
+    """
+    Merge adjacent holds of the same image and mark sources that already
+    match the output size. Returns a new plan.
+    """
+    out = plan["output"]
+    fade = plan["transition"]["frames"]
+    clips = []
+    for clip in plan["clips"]:
+        clip = dict(clip, fitted=clip.get("size") == [out["width"], out["height"]])
+        prev = clips[-1] if clips else None
+        if (prev and clip["effect"] == "none" and prev["effect"] == "none"
+                and not clip.get("animation")
+                and (prev["source"], prev["sig"]) == (clip["source"], clip["sig"])):
+            # Two holds of one image: a crossfade between them is invisible
+            prev["frames"] += clip["frames"] - fade
+            prev["indices"] = prev["indices"] + clip["indices"]
+            continue
+        clips.append(clip)
+
+    optimized = dict(plan, clips=clips)
+    if len(clips) < 2:
+        optimized["transition"] = {"type": "cut", "frames": 0}
+    return optimized
+
+
+def plan_frames(plan: dict) -> int:
+    """Length of the planned video in frames."""
+    clips = plan["clips"]
+    return sum(c["frames"] for c in clips) - max(0, len(clips) - 1) * plan["transition"]["frames"]
+
+
+def _key(*parts) -> str:
+    return hashlib.sha1(json.dumps(parts, sort_keys=True).encode()).hexdigest()[:20]
+
+
+def _megapixels(out: dict) -> float:
+    return out["width"] * out["height"] / 1e6
+
+
+def _fit_filter(out: dict, fitted: bool, framing: str = "classic") -> str:
+    if fitted:
+        return "setsar=1"
+    w, h = out["width"], out["height"]
+    if framing == "blur":
+        return blur_framing_filter(w, h) + ",setsar=1"
+    return f"scale={w}:{h}:force_original_aspect_ratio=decrease,pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,setsar=1"
+
+
+def _part(path: str, tag: str) -> str:
+    """Where a step writes path before renaming it into the cache (unique per compile)."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{tag}.part{ext}"
+
+
+def _holds_step(plan: dict, cache_dir: str, tag: str):
+    """One-pass encode of a cut-only run of static holds, or None."""
+    out = plan["output"]
+    clips = plan["clips"]
+    fps = out["fps"]
+    total = plan_frames(plan)
+    fitted = all(c["fitted"] for c in clips)
+    framings = {c.get("framing", "classic") for c in clips}
+    if len(framings) > 1:
+        return None
+    framing = framings.pop()
+    key = _key("holds", out, [(c["source"], c["sig"], c["frames"]) for c in clips], fitted,
+               *([framing] if framing != "classic" else []))
+    output = os.path.join(cache_dir, f"{key}.mp4")
+    part = _part(output, tag)
+    tail = [
+        '-vf', _fit_filter(out, fitted, framing),
+        '-r', str(fps), '-frames:v', str(total),
+        *out["encoder"], '-tune', 'stillimage',
+        '-pix_fmt', 'yuv420p', '-an'
+    ]
+
+    cost = {"class": "holds", "work": total * _megapixels(out)}
+    members = [is_member(c["source"]) for c in clips]
+    if not any(members):
+        list_file = _part(os.path.join(cache_dir, f"{key}.txt"), tag)
+        lines = []
+        for c in clips:
+            path = os.path.abspath(c["source"]).replace("'", "'\\''")
+            lines += [f"file '{path}'", f"duration {c['frames'] / fps}"]
+        lines.append(lines[-2])  # concat demuxer needs the last file repeated
+        return {
+            "kind": "holds", "key": key, "output": output, "part": part, "cost": cost,
+            "files": {list_file: "\n".join(lines) + "\n"},
+            "cmd": ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', list_file, *tail, part]
+        }
+
+    frames = {c["frames"] for c in clips}
+    if all(members) and len(frames) == 1:
+        # image2pipe has one frame rate, so only uniform holds can stream
+        return {
+            "kind": "holds", "key": key, "output": output, "part": part, "cost": cost,
+            "pipe_images": [c["source"] for c in clips],
+            "cmd": [
+                'ffmpeg', '-y', '-f', 'image2pipe', '-framerate', f"{fps}/{frames.pop()}",
+                '-i', 'pipe:0', *tail, part
+            ]
+        }
+    return None
+
+
+def compile_plan(
+    plan: dict,
+    cache_dir: str,
+    output_path: str = None,
+    stills: bool = False,
+    stream: bool = False
+) -> List[dict]:
+    """
+    Compile an (optimized) plan into FFmpeg steps.
+
+    Each step: kind, key, output, cmd, cost (class and work units for
+    scripts/cost_model.py), and optionally stdin (zip member), pool (pooled
+    working frame, read from frame), animation (source, size and timing of
+    a pooled frame set; cmd is None and is built from clip when it runs),
+    pipe_images (zip members streamed back to back), files (written before
+    running) and still (working-resolution frame, keyed like the clip but
+    made from the cached clip by still_cmd if only the clip is cached, so
+    asking for stills doesn't re-render anything). The last video step's
+    output is the silent video; with audio and output_path a final
+    uncached mux step writes output_path.
+
+    Cached steps write part (and still_part) and rename it to output when
+    done. Part and list file names are unique to this compile, so jobs
+    sharing a step in one cache directory don't write over each other.
+
+    stream writes output_path as fragmented MP4 with a fragment manifest
+    (scripts/streaming.py). A crossfade step then also gets stream_cmd,
+    which encodes and muxes in one pass; the mux step (fused_into that
+    step) is skipped when stream_cmd ran.
+    """
+    out = plan["output"]
+    clips = plan["clips"]
+    fps = out["fps"]
+    fade = plan["transition"]["frames"]
+    megapixels = _megapixels(out)
+    steps = []
+    xfade_graph = None
+    tag = uuid.uuid4().hex[:12]
+
+    holds = None
+    if not stills and not fade and all(c["effect"] == "none" and not c.get("animation") for c in clips):
+        holds = _holds_step(plan, cache_dir, tag)
+
+    if holds:
+        steps.append(holds)
+        video = holds
+    else:
+        clip_steps = []
+        pooled = image_pool.available()
+        for c in clips:
+            framing = c.get("framing", "classic")
+            timing = c.get("animation")
+            key = _key("clip", out, c["source"], c["sig"], c["frames"], c["effect"], c["fitted"],
+                       *(["pooled"] if pooled else []), *([framing] if framing != "classic" else []),
+                       *(["animation", timing] if timing else []))
+            output = os.path.join(cache_dir, f"{key}.mp4")
+            still = os.path.join(cache_dir, f"{key}.jpg") if stills else None
+            part, still_part = _part(output, tag), still and _part(still, tag)
+            frame = working_frame(out["width"], out["height"], c["effect"] == "ken_burns", framing)
+            frame_path = None
+            if pooled and not timing:
+                # Decoded when the step runs; FFmpeg reads it by path
+                frame_path = image_pool.default_pool().locate(c["source"], *frame)
+            clip = dict(
+                image_path=frame_path or c["source"], duration=c["frames"] / fps, output_path=part,
+                width=out["width"], height=out["height"], ken_burns=c["effect"] == "ken_burns",
+                still_path=still_part, video_args=out["encoder"], audio=False, fitted=c["fitted"],
+                raw_size=frame[:2] if pooled and not timing else None, framing=framing, fps=fps
+            )
+            step = {
+                "kind": "clip", "key": key, "output": output, "part": part, "indices": c["indices"],
+                "cmd": None if timing else image_clip_command(**clip),
+                "cost": {"class": f"clip_{c['effect']}", "work": c["frames"] * megapixels}
+            }
+            if timing:
+                # The frame set is only decoded when the step runs (its command
+                # needs the frame durations), so cached clips never decode it
+                step["animation"], step["clip"] = [c["source"], *frame[:2], timing], clip
+            elif pooled:
+                step["pool"], step["frame"] = [c["source"], *frame], frame_path
+            elif is_member(c["source"]):
+                step["stdin"] = c["source"]
+            if still:
+                step["still"], step["still_part"] = still, still_part
+                # For a clip cached without its still: the clip's first frame
+                step["still_cmd"] = ['ffmpeg', '-y', '-i', output, '-frames:v', '1', '-q:v', '3', still_part]
+            clip_steps.append(step)
+        steps += clip_steps
+        video = clip_steps[0]
+
+        if len(clip_steps) > 1 and fade:
+            key = _key("xfade", [s["key"] for s in clip_steps], fade)
+            output = os.path.join(cache_dir, f"{key}.mp4")
+            inputs = []
+            for s in clip_steps:
+                inputs += ['-i', s["output"]]
+            # Offsets come from the plan's frame counts - no probing
+            parts, offset, prev = [], 0, "0:v"
+            for i in range(1, len(clips)):
+                offset += clips[i - 1]["frames"] - fade
+                label = f"v{i}"
+                parts.append(
+                    f"[{prev}][{i}:v]xfade=transition=fade:duration={fade / fps}:"
+                    f"offset={offset / fps}[{label}]"
+                )
+                prev = label
+            xfade_graph = (inputs, ';'.join(parts), prev)
+            video = {
+                "kind": "xfade", "key": key, "output": output, "part": _part(output, tag),
+                "cost": {"class": "xfade", "work": plan_frames(plan) * megapixels},
+                "cmd": ['ffmpeg', '-y', *inputs, '-filter_complex', ';'.join(parts),
+                        '-map', f'[{prev}]', *out["encoder"], '-pix_fmt', 'yuv420p',
+                        _part(output, tag)]
+            }
+            steps.append(video)
+        elif len(clip_steps) > 1:
+            key = _key("concat", [s["key"] for s in clip_steps])
+            output = os.path.join(cache_dir, f"{key}.mp4")
+            list_file = _part(os.path.join(cache_dir, f"{key}.txt"), tag)
+            video = {
+                "kind": "concat", "key": key, "output": output, "part": _part(output, tag),
+                "cost": {"class": "concat", "work": plan_frames(plan) * megapixels},
+                "files": {list_file: "".join(f"file '{s['output']}'\n" for s in clip_steps)},
+                "cmd": ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', list_file,
+                        '-c', 'copy', _part(output, tag)]
+            }
+            steps.append(video)
+
+    audio = plan.get("audio")
+    if audio and output_path:
+        duration = plan_frames(plan) / fps
+        music = []
+        if audio.get("start"):
+            # Input seek: the intro is skipped without re-encoding the track
+            music += ['-ss', str(audio["start"])]
+        if audio["loop"]:
+            music += ['-stream_loop', '-1']
+        music += ['-i', audio["source"]]
+
+        def audio_graph(index: int) -> tuple:
+            """(filter graph or None, audio map) for the music as input number index."""
+            if audio["fades"] or audio["volume"] != 1.0:
+                return f'[{index}:a]{music_filter(duration, audio["volume"])}[music]', '[music]'
+            return None, f'{index}:a'
+
+        graph, audio_map = audio_graph(1)
+        cmd = ['ffmpeg', '-y', '-i', video["output"], *music]
+        if graph:
+            cmd += ['-filter_complex', graph]
+        cmd += ['-map', '0:v', '-map', audio_map,
+                '-c:v', 'copy', '-c:a', audio.get("codec", AUDIO_CODEC), '-b:a', audio["bitrate"],
+                '-t', str(duration), '-shortest']
+        if stream:
+            cmd += fragment_args()
+        mux = {
+            "kind": "mux", "key": None, "output": output_path, "cmd": cmd + [output_path],
+            "stream": stream, "cost": {"class": "mux", "work": duration, "input": video["output"]}
+        }
+
+        if stream and xfade_graph and audio["loop"]:
+            # Encode and mux in one pass, so output_path grows while the
+            # crossfades encode; the tee muxer still writes the silent video
+            # for the cache. If that is cached already, the mux runs alone.
+            inputs, parts, label = xfade_graph
+            graph, audio_map = audio_graph(len(inputs) // 2)
+            video["stream_cmd"] = [
+                'ffmpeg', '-y', *inputs, *music,
+                '-filter_complex', ';'.join([parts] + ([graph] if graph else [])),
+                '-map', f'[{label}]', '-map', audio_map, *out["encoder"], '-pix_fmt', 'yuv420p',
+                '-flags', '+global_header',  # tee can't tell the encoder mp4 wants it
+                '-c:a', audio.get("codec", AUDIO_CODEC), '-b:a', audio["bitrate"], '-t', str(duration), '-f', 'tee',
+                tee_output(video["part"], "select=v:f=mp4") + "|" +
+                fragmented_tee_output(output_path)
+            ]
+            video["stream_output"] = output_path
+            mux["fused_into"] = video["key"]
+        steps.append(mux)
+
+    return steps
+
+
+def _transcode_image(data: bytes, codec: str) -> bytes:
+    """Re-encode one image in memory (e.g. png -> mjpeg)."""
+    cmd = ['ffmpeg', '-v', 'error', '-i', 'pipe:0', '-c:v', codec, '-q:v', '2', '-f', 'image2pipe', 'pipe:1']
+    return run(cmd, input=data, capture_output=True, check=True).stdout
+
+
+def _codec_of(ref: str) -> str:
+    """image2pipe codec of ref, or None for formats that are always transcoded (webp, gif, bmp)."""
+    return IMAGE_CODECS.get(os.path.splitext(ref)[1].lower())
+
+
+def _run_piped(cmd: List[str], refs: List[str]):
+    """Run FFmpeg while streaming images into its stdin."""
+    # image2pipe decodes with one codec; others are converted to the most common
+    counts = Counter(c for c in map(_codec_of, refs) if c)
+    codec = counts.most_common(1)[0][0] if counts else 'mjpeg'
+    # Named, not probed: FFmpeg's own JPEGs (transcoded images) fail the probe
+    index = cmd.index('pipe:0') - 1
+    cmd = [*cmd[:index], '-c:v', codec, *cmd[index:]]
+    if is_tracing():
+        cmd = [cmd[0], '-benchmark', *cmd[1:]]
+    with span('ffmpeg', cat='subprocess', cmd=subprocess.list2cmdline(cmd)) as info:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        # Drain stderr on a thread so FFmpeg never blocks while we write
+        errors = []
+        reader = threading.Thread(target=lambda: errors.append(proc.stderr.read()))
+        reader.start()
+        try:
+            for ref in refs:
+                data = read_image(ref)
+                proc.stdin.write(data if _codec_of(ref) == codec else _transcode_image(data, codec))
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass  # FFmpeg stopped reading (frame limit reached)
+        returncode = proc.wait()
+        reader.join()
+        info['exit_code'] = returncode
+        info.update(parse_benchmark(errors[0]))
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd, stderr=errors[0])
+
+
+@traced
+def execute_steps(steps: List[dict]) -> dict:
+    """
+    Run compiled steps, skipping those whose output is already cached.
+
+    Each step run is timed and recorded for the cost model
+    (scripts/cost_model.py), except from worker threads, where CPU time
+    can't be told apart.
+
+    Returns:
+        {"run": steps run, "cached": steps reused}
+    """
+    measure = threading.current_thread() is threading.main_thread()
+    stats = {"run": 0, "cached": 0}
+    fused = set()
+    for step in steps:
+        if step["key"] and os.path.exists(step["output"]):
+            os.utime(step["output"])  # recently used, for cache pruning
+            if step.get("still") and not os.path.exists(step["still"]):
+                try:
+                    run(step["still_cmd"], check=True, capture_output=True)
+                    os.replace(step["still_part"], step["still"])
+                finally:
+                    if os.path.exists(step["still_part"]):
+                        os.remove(step["still_part"])
+            stats["cached"] += 1
+            continue
+        if step.get("fused_into") in fused:
+            continue  # Already written by the step it was fused into
+
+        os.makedirs(os.path.dirname(os.path.abspath(step["output"])), exist_ok=True)
+        for path, content in step.get("files", {}).items():
+            with open(path, "w") as f:
+                f.write(content)
+
+        started, cpu = time.time(), children_cpu()
+        try:
+            if step.get("stream_cmd"):
+                with track_fragments(step["stream_output"]):
+                    run(step["stream_cmd"], check=True, capture_output=True)
+                fused.add(step["key"])
+            elif step.get("pipe_images"):
+                _run_piped(step["cmd"], step["pipe_images"])
+            else:
+                cmd, data = step["cmd"], None
+                if step.get("animation"):
+                    source, width, height, timing = step["animation"]
+                    animation = dict(image_pool.default_pool().animation(source, width, height), timing=timing)
+                    cmd = image_clip_command(**step["clip"], animation=animation)
+                elif step.get("pool"):
+                    # Decoded now on a miss; it may land in the spill directory, not where compile put it
+                    frame_path = image_pool.default_pool().acquire(*step["pool"])
+                    cmd = [frame_path if arg == step["frame"] else arg for arg in cmd]
+                elif step.get("stdin"):
+                    data = read_image(step["stdin"])
+                with track_fragments(step["output"]) if step.get("stream") else contextlib.nullcontext():
+                    run(cmd, input=data, check=True, capture_output=True)
+
+            if step["key"]:
+                if step.get("still"):
+                    os.replace(step["still_part"], step["still"])
+                os.replace(step["part"], step["output"])
+        finally:
+            # After a success only list files are left; after a failure, parts too
+            for path in [*step.get("files", {}), step.get("part"), step.get("still_part")]:
+                if path and os.path.exists(path):
+                    os.remove(path)
+        if measure:
+            record_step(step, time.time() - started, children_cpu() - cpu)
+        stats["run"] += 1
+    return stats
+
+
+def _clip_fingerprint(clip: dict) -> str:
+    return json.dumps([clip["source"], clip["sig"], clip["frames"], clip["effect"], clip.get("framing", "classic"),
+                       clip.get("animation")])
+
+
+def diff_plans(old: dict, new: dict) -> dict:
+    """
+    Compare two plans clip by clip.
+
+    Returns:
+        {"same": clips unchanged, "changed": new clip indices added or
+         changed, "removed": old clips gone, "output": output settings
+         changed, "audio": audio changed, "transition": transition changed}
+    """
+    old_clips = [_clip_fingerprint(c) for c in old.get("clips", [])]
+    new_clips = [_clip_fingerprint(c) for c in new.get("clips", [])]
+    matcher = difflib.SequenceMatcher(a=old_clips, b=new_clips, autojunk=False)
+
+    same, changed, removed = 0, [], 0
+    for op, a1, a2, b1, b2 in matcher.get_opcodes():
+        if op == "equal":
+            same += a2 - a1
+        else:
+            changed += list(range(b1, b2))
+            removed += max(0, (a2 - a1) - (b2 - b1))
+    return {
+        "same": same,
+        "changed": changed,
+        "removed": removed,
+        "output": old.get("output") != new.get("output"),
+        "audio": old.get("audio") != new.get("audio"),
+        "transition": old.get("transition") != new.get("transition")
+    }
+
+
+def describe_diff(diff: dict) -> str:
+    parts = [f"{diff['same']} clips unchanged", f"{len(diff['changed'])} new or changed"]
+    if diff["removed"]:
+        parts.append(f"{diff['removed']} removed")
+    for name in ("output", "transition", "audio"):
+        if diff[name]:
+            parts.append(f"{name} changed")
+    return ", ".join(parts)
+
+
+def save_plan(plan: dict, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(plan, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def load_plan(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def render_plan(
+    plan: dict,
+    cache_dir: str,
+    output_path: str = None,
+    stills_dir: str = None,
+    plan_path: str = None,
+    stream: bool = False
+) -> str:
+    """
+    Optimize, compile and execute a plan.
+
+    If plan_path is given, the plan is diffed against the one saved there
+    by the last render and then saved in its place. If stills_dir is
+    given, each image's working-resolution frame is copied there as
+    still_NNNN.jpg (numbered by position in the original plan). stream
+    writes output_path progressively (see compile_plan()).
+
+    Returns the output path (the cached silent video if there is no mux).
+    """
+    from scripts.video_assembler import still_path
+
+    if plan_path and os.path.exists(plan_path):
+        try:
+            print(f"  Since last render: {describe_diff(diff_plans(load_plan(plan_path), plan))}")
+        except (OSError, ValueError, KeyError):
+            pass
+
+    steps = compile_plan(optimize_plan(plan), cache_dir, output_path, stills=bool(stills_dir), stream=stream)
+    stats = execute_steps(steps)
+    print(f"  Render plan: {stats['run']} steps run, {stats['cached']} reused from cache")
+
+    if stills_dir:
+        os.makedirs(stills_dir, exist_ok=True)
+        for step in steps:
+            for index in step.get("indices", []) if step.get("still") else []:
+                shutil.copy(step["still"], still_path(stills_dir, index))
+
+    if plan_path:
+        save_plan(plan, plan_path)
+    return steps[-1]["output"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect render plans")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    show = sub.add_parser("show", help="Print the compiled steps of a plan")
+    show.add_argument("plan", help="Plan JSON")
+    show.add_argument("--cache-dir", default="cache", help="Cache directory to compile against")
+
+    diff = sub.add_parser("diff", help="Compare two plans")
+    diff.add_argument("old", help="Old plan JSON")
+    diff.add_argument("new", help="New plan JSON")
+
+    args = parser.parse_args()
+
+    if args.command == "show":
+        plan = optimize_plan(load_plan(args.plan))
+        print(f"{len(plan['clips'])} clips after optimization, {plan_frames(plan)} frames")
+        for step in compile_plan(plan, args.cache_dir, "output.mp4", stills=False):
+            cached = " (cached)" if step["key"] and os.path.exists(step["output"]) else ""
+            cmd = subprocess.list2cmdline(step["cmd"]) if step["cmd"] else "(animated, built from the frame set when run)"
+            print(f"[{step['kind']}]{cached} {cmd}")
+    elif args.command == "diff":
+        print(describe_diff(diff_plans(load_plan(args.old), load_plan(args.new))))
+
+
+if __name__ == "__main__":
+    main()
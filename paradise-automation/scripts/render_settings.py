@@ -0,0 +1,91 @@
+"""
+Render Settings - Everything one render job is configured with, in one object
+
+config.py holds the defaults; a job captures them once in an immutable
+RenderSettings and passes it down (generate_video -> assemble_slideshow ->
+render plan / segment workers / create_image_clip / concatenation / mux),
+so nothing below reads the module-level constants. Several jobs with
+different sizes, frame rates or timings can then render at the same time
+in one process (threads or an async runner):
+
+    settings = RenderSettings(width=1080, height=1920, fps=30)
+    short = settings.replace(max_image_duration=4)
+
+Settings cross to segment workers as JSON (to_dict() / from_dict()).
+"""
+import os
+import sys
+from dataclasses import dataclass, asdict, fields, replace as _replace
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_FPS, VIDEO_CODEC, ENCODER_PRESET, ENCODER_CRF,
+    AUDIO_CODEC, AUDIO_BITRATE, KEN_BURNS_ENABLED, CROSSFADE_ENABLED, CROSSFADE_DURATION,
+    FRAMING, MIN_IMAGE_DURATION, MAX_IMAGE_DURATION, TIMELINE_POLICY, ANIMATION_TIMING
+)
+from scripts.timeline import TIMELINE_POLICIES, to_frames
+from scripts.animation import TIMINGS
+
+FRAMINGS = ("classic", "blur")
+
+
+@dataclass(frozen=True)
+class RenderSettings:
+    """Output, encoder, effect and timeline settings of one render job."""
+    width: int = VIDEO_WIDTH
+    height: int = VIDEO_HEIGHT
+    fps: int = VIDEO_FPS
+    video_codec: str = VIDEO_CODEC
+    preset: str = ENCODER_PRESET
+    crf: int = ENCODER_CRF
+    audio_codec: str = AUDIO_CODEC
+    audio_bitrate: str = AUDIO_BITRATE
+    ken_burns: bool = KEN_BURNS_ENABLED
+    crossfade: bool = CROSSFADE_ENABLED
+    crossfade_duration: float = CROSSFADE_DURATION
+    framing: str = FRAMING
+    min_image_duration: float = MIN_IMAGE_DURATION
+    max_image_duration: float = MAX_IMAGE_DURATION
+    timeline_policy: str = TIMELINE_POLICY
+    animation_timing: str = ANIMATION_TIMING
+
+    def __post_init__(self):
+        if self.width <= 0 or self.height <= 0 or self.width % 2 or self.height % 2:
+            raise ValueError(f"Output size must be positive and even: {self.width}x{self.height}")
+        if self.fps <= 0:
+            raise ValueError(f"Frame rate must be positive: {self.fps}")
+        if self.framing not in FRAMINGS:
+            raise ValueError(f"Unknown framing: {self.framing} (use one of {', '.join(FRAMINGS)})")
+        if self.timeline_policy not in TIMELINE_POLICIES:
+            raise ValueError(f"Unknown timeline policy: {self.timeline_policy} "
+                             f"(use one of {', '.join(TIMELINE_POLICIES)})")
+        if self.animation_timing not in TIMINGS:
+            raise ValueError(f"Unknown animation timing: {self.animation_timing} (use one of {', '.join(TIMINGS)})")
+        if not 0 < self.min_image_duration <= self.max_image_duration:
+            raise ValueError(f"Image durations must satisfy 0 < min <= max: "
+                             f"{self.min_image_duration}, {self.max_image_duration}")
+
+    def replace(self, **changes) -> "RenderSettings":
+        """A copy with some settings changed."""
+        return _replace(self, **changes)
+
+    def encoder_args(self) -> List[str]:
+        """Video encoder arguments."""
+        return ['-c:v', self.video_codec, '-preset', self.preset, '-crf', str(self.crf)]
+
+    def fade_frames(self, clips: int) -> int:
+        """Crossfade length in frames for a timeline of clips images (0 = cuts)."""
+        return to_frames(self.crossfade_duration, self.fps) if self.crossfade and clips > 1 else 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RenderSettings":
+        """Settings from to_dict() output; unknown keys are ignored, missing ones default."""
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+
+DEFAULT_SETTINGS = RenderSettings()
@@ -0,0 +1,157 @@
+"""
+Renditions - Write several output sizes from one rendered timeline
+
+The slideshow timeline (clips + crossfades) is rendered once. A single FFmpeg
+pass then splits it into one branch per rendition, scales/crops each branch
+and encodes all outputs in parallel, sharing the decode and the music filter.
+
+Crop strategies:
+- fit:  scale to fit, letterbox/pillarbox with black bars
+- fill: scale to cover, centre crop (loses edges)
+- blur: scale to fit over a blurred, cropped copy of the frame (for Shorts)
+"""
+import os
+import sys
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import RENDITIONS
+from scripts.video_assembler import get_video_duration, music_filter
+from scripts.render_settings import RenderSettings, DEFAULT_SETTINGS
+from scripts.tracing import run, traced
+
+CROP_STRATEGIES = ("fit", "fill", "blur")
+
+
+def get_renditions(names: str) -> Dict[str, dict]:
+    """Resolve a comma separated list of rendition names ('all' for every one)."""
+    if names.strip().lower() == "all":
+        return dict(RENDITIONS)
+
+    renditions = {}
+    for name in names.split(","):
+        name = name.strip()
+        if name not in RENDITIONS:
+            raise ValueError(f"Unknown rendition: {name} (available: {', '.join(RENDITIONS)})")
+        renditions[name] = RENDITIONS[name]
+    return renditions
+
+
+def rendition_output_path(output_path: str, name: str) -> str:
+    """output/video.mp4 + '720p' -> output/video_720p.mp4"""
+    base, ext = os.path.splitext(output_path)
+    return f"{base}_{name}{ext or '.mp4'}"
+
+
+def rendition_filter(label_in: str, label_out: str, width: int, height: int, crop: str) -> str:
+    """Build the filter chain for one rendition branch."""
+    if crop == "fit":
+        return (
+            f"[{label_in}]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1[{label_out}]"
+        )
+    if crop == "fill":
+        return (
+            f"[{label_in}]scale={width}:{height}:force_original_aspect_ratio=increase,"
+            f"crop={width}:{height},setsar=1[{label_out}]"
+        )
+    if crop == "blur":
+        # Blur at quarter resolution and scale back up - far cheaper than a
+        # full resolution blur and indistinguishable behind the foreground
+        bw, bh = max(2, width // 8 * 2), max(2, height // 8 * 2)
+        return (
+            f"[{label_in}]split[{label_out}_bg][{label_out}_fg];"
+            f"[{label_out}_bg]scale={bw}:{bh}:force_original_aspect_ratio=increase,"
+            f"crop={bw}:{bh},boxblur=8:2,scale={width}:{height}[{label_out}_bb];"
+            f"[{label_out}_fg]scale={width}:{height}:force_original_aspect_ratio=decrease[{label_out}_ff];"
+            f"[{label_out}_bb][{label_out}_ff]overlay=(W-w)/2:(H-h)/2,setsar=1[{label_out}]"
+        )
+    raise ValueError(f"Unknown crop strategy: {crop} (use one of {', '.join(CROP_STRATEGIES)})")
+
+
+def get_video_size(video_path: str) -> tuple:
+    """Get (width, height) of the first video stream."""
+    cmd = [
+        'ffprobe', '-v', 'quiet', '-select_streams', 'v:0',
+        '-show_entries', 'stream=width,height', '-of', 'csv=p=0', video_path
+    ]
+    result = run(cmd, capture_output=True, text=True)
+    width, height = result.stdout.strip().split(',')[:2]
+    return int(width), int(height)
+
+
+@traced
+def render_renditions(
+    video_path: str,
+    music_path: str,
+    output_path: str,
+    renditions: Dict[str, dict],
+    music_volume: float = 1.0,
+    music_start: float = 0.0,
+    settings: RenderSettings = None
+) -> Dict[str, str]:
+    """
+    Mux music into the silent timeline video and write every rendition.
+    music_start skips the track's intro (input seek). Encoder and audio
+    come from settings.
+
+    A rendition with the same size as the source video is stream copied.
+
+    Returns:
+        Dict of rendition name -> output path
+    """
+    settings = settings or DEFAULT_SETTINGS
+    duration = get_video_duration(video_path)
+    src_width, src_height = get_video_size(video_path)
+
+    names = list(renditions.keys())
+    encoded = [
+        n for n in names
+        if (renditions[n]["width"], renditions[n]["height"]) != (src_width, src_height)
+    ]
+
+    # Shared work: one music filter, split per output; one video split per
+    # rendition that needs scaling
+    filter_parts = []
+    audio_labels = "".join(f"[a{i}]" for i in range(len(names)))
+    filter_parts.append(f"[1:a]{music_filter(duration, music_volume)},asplit={len(names)}{audio_labels}")
+    if encoded:
+        split_labels = "".join(f"[s{i}]" for i in range(len(encoded)))
+        filter_parts.append(f"[0:v]split={len(encoded)}{split_labels}")
+        for i, name in enumerate(encoded):
+            spec = renditions[name]
+            filter_parts.append(rendition_filter(
+                f"s{i}", f"v{i}", spec["width"], spec["height"], spec.get("crop", "fit")
+            ))
+
+    cmd = [
+        'ffmpeg', '-y',
+        '-i', video_path,
+        *(['-ss', str(music_start)] if music_start else []),
+        '-stream_loop', '-1',
+        '-i', music_path,
+        '-filter_complex', ';'.join(filter_parts)
+    ]
+
+    outputs = {}
+    for i, name in enumerate(names):
+        out = rendition_output_path(output_path, name)
+        if name in encoded:
+            video_args = [
+                '-map', f'[v{encoded.index(name)}]',
+                *settings.encoder_args(),
+                '-pix_fmt', 'yuv420p'
+            ]
+        else:
+            video_args = ['-map', '0:v', '-c:v', 'copy']
+        cmd += video_args + [
+            '-map', f'[a{i}]',
+            '-c:a', settings.audio_codec,
+            '-b:a', settings.audio_bitrate,
+            '-t', str(duration),
+            out
+        ]
+        outputs[name] = out
+
+    run(cmd, check=True, capture_output=True)
+    return outputs
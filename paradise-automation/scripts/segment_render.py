@@ -0,0 +1,446 @@
+"""
+Segment Renderer - Split a long timeline into chunks rendered by workers
+
+The timeline is cut into segments of SEGMENT_SIZE images. Each segment is an
+independent job that includes the crossfade into the next segment's first
+image (the overlap), so segments can be joined with stream copy:
+
+    segment k = clips a..b crossfaded, trimmed to [a + fade, b + fade)
+
+Jobs are exchanged through a spool directory on a shared filesystem:
+
+    <spool>/<job>/job.json          job settings
+    <spool>/<job>/pending/*.json    segments waiting for a worker
+    <spool>/<job>/running/*.json    claimed segments (mtime = heartbeat)
+    <spool>/<job>/done/*.mp4        finished segments
+    <spool>/<job>/failed/*.json     segments that failed SEGMENT_MAX_ATTEMPTS times
+    <spool>/<job>/COMPLETE          written when the coordinator is done
+
+Workers claim a segment with an atomic rename and touch it while rendering.
+If a worker dies, its claim goes stale and the coordinator puts the segment
+back into pending for another worker. A segment whose render fails goes back
+to pending too. Either way, once a segment has failed SEGMENT_MAX_ATTEMPTS
+times it moves to failed/ and the coordinator stops with an error.
+
+Usage (extra worker nodes sharing the spool):
+    python scripts/segment_render.py worker /shared/spool
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import socket
+import argparse
+import threading
+import subprocess
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    VIDEO_FPS, SEGMENT_SIZE, SEGMENT_HEARTBEAT_INTERVAL,
+    SEGMENT_HEARTBEAT_TIMEOUT, SEGMENT_MAX_ATTEMPTS
+)
+from scripts.video_assembler import create_image_clip, concatenate_videos, still_path
+from scripts.render_settings import RenderSettings, DEFAULT_SETTINGS
+from scripts.timeline import to_frames
+from scripts.tracing import run, traced, start_trace_from_env, stop_trace
+
+POLL_INTERVAL = 1.0
+
+
+def plan_segments(
+    images: List[str],
+    durations: List[float],
+    segment_size: int = SEGMENT_SIZE,
+    crossfade: bool = True,
+    crossfade_duration: float = 0.5,
+    fps: int = VIDEO_FPS
+) -> List[dict]:
+    """
+    Split the timeline into independently renderable segments.
+
+    All positions are in frames so segment boundaries line up exactly.
+    """
+    n = len(images)
+    frames = [to_frames(d, fps) for d in durations]
+    fade = to_frames(crossfade_duration, fps) if crossfade and n > 1 else 0
+
+    # Global start frame of every clip
+    starts = [0]
+    for f in frames[:-1]:
+        starts.append(starts[-1] + f - fade)
+    total = starts[-1] + frames[-1]
+
+    segments = []
+    for a in range(0, n, segment_size):
+        b = min(a + segment_size, n)
+        # Include the next image so the transition into it is rendered here
+        last = b + 1 if (fade and b < n) else b
+
+        start = starts[a] + (fade if a > 0 else 0)
+        end = starts[b] + fade if b < n else total
+
+        segments.append({
+            "index": len(segments),
+            "images": images[a:last],
+            "indices": list(range(a, b)),
+            "frames": frames[a:last],
+            "fade": fade,
+            "start_frame": start - starts[a],
+            "end_frame": end - starts[a],
+            "attempts": 0
+        })
+    return segments
+
+
+@traced
+def render_segment(spec: dict, job: dict, output_path: str, work_dir: str) -> str:
+    """Render one segment: its clips, crossfades and trim, without audio."""
+    os.makedirs(work_dir, exist_ok=True)
+    settings = RenderSettings.from_dict(job["settings"])
+    fps = settings.fps
+
+    clips = []
+    for i, (image, frames) in enumerate(zip(spec["images"], spec["frames"])):
+        clip_path = os.path.join(work_dir, f"clip_{i:03d}.mp4")
+        # Only this segment's own images write stills, not the overlap image
+        still = None
+        if job.get("stills_dir") and i < len(spec["indices"]):
+            still = still_path(job["stills_dir"], spec["indices"][i])
+        create_image_clip(image, frames / fps, clip_path, still_path=still, settings=settings)
+        clips.append(clip_path)
+
+    inputs = []
+    for clip in clips:
+        inputs.extend(['-i', clip])
+
+    fade = spec["fade"]
+    filter_parts = []
+    prev = "0:v"
+    if fade and len(clips) > 1:
+        offset = 0
+        for i in range(1, len(clips)):
+            offset += spec["frames"][i - 1] - fade
+            filter_parts.append(
+                f"[{prev}][{i}:v]xfade=transition=fade:duration={fade / fps}:offset={offset / fps}[x{i}]"
+            )
+            prev = f"x{i}"
+    elif len(clips) > 1:
+        streams = "".join(f"[{i}:v]" for i in range(len(clips)))
+        filter_parts.append(f"{streams}concat=n={len(clips)}:v=1:a=0[x]")
+        prev = "x"
+    filter_parts.append(
+        f"[{prev}]trim=start_frame={spec['start_frame']}:end_frame={spec['end_frame']},"
+        f"setpts=PTS-STARTPTS[out]"
+    )
+
+    cmd = ['ffmpeg', '-y'] + inputs + [
+        '-filter_complex', ';'.join(filter_parts),
+        '-map', '[out]',
+        '-an',
+        *settings.encoder_args(),
+        '-pix_fmt', 'yuv420p',
+        '-r', str(fps),
+        output_path
+    ]
+    run(cmd, check=True, capture_output=True)
+
+    for clip in clips:
+        os.remove(clip)
+    return output_path
+
+
+def segment_name(index: int) -> str:
+    return f"seg_{index:04d}"
+
+
+def create_job(spool_dir: str, job_id: str, job: dict, segments: List[dict]) -> str:
+    """Write job settings and pending segments into the spool."""
+    job_dir = os.path.join(spool_dir, job_id)
+    for sub in ("pending", "running", "done", "failed", "work"):
+        os.makedirs(os.path.join(job_dir, sub), exist_ok=True)
+
+    with open(os.path.join(job_dir, "job.json"), "w") as f:
+        json.dump(job, f, indent=2)
+
+    for spec in segments:
+        path = os.path.join(job_dir, "pending", segment_name(spec["index"]) + ".json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(spec, f)
+        os.replace(path + ".tmp", path)
+    return job_dir
+
+
+def _heartbeat(path: str, stop: threading.Event):
+    while not stop.wait(SEGMENT_HEARTBEAT_INTERVAL):
+        try:
+            os.utime(path)
+        except OSError:
+            # Claim was requeued by the coordinator; finish anyway, the
+            # done file is written atomically so duplicates are harmless
+            pass
+
+
+def claim_segment(job_dir: str, worker_id: str) -> Optional[str]:
+    """Atomically move one pending segment into running. Returns claimed path."""
+    pending_dir = os.path.join(job_dir, "pending")
+    for name in sorted(os.listdir(pending_dir)):
+        if not name.endswith(".json"):
+            continue
+        claimed = os.path.join(job_dir, "running", f"{name}.{worker_id}")
+        try:
+            os.rename(os.path.join(pending_dir, name), claimed)
+        except OSError:
+            continue  # another worker got it first
+        os.utime(claimed)
+        return claimed
+    return None
+
+
+def release_segment(job_dir: str, claimed: str, spec: dict, error: str,
+                    max_attempts: int = SEGMENT_MAX_ATTEMPTS) -> str:
+    """
+    Give a claim whose render failed back: to pending/ for another attempt,
+    or to failed/ once it has failed max_attempts times. Returns the state.
+    """
+    spec = dict(spec, attempts=spec.get("attempts", 0) + 1, error=error)
+    state = "failed" if spec["attempts"] >= max_attempts else "pending"
+    path = os.path.join(job_dir, state, segment_name(spec["index"]) + ".json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(spec, f)
+    os.replace(path + ".tmp", path)
+    try:
+        os.remove(claimed)
+    except OSError:
+        pass
+    return state
+
+
+def work_on(job_dir: str, claimed: str, worker_id: str) -> bool:
+    """
+    Render a claimed segment and publish it to done/. A failed render is
+    released (see release_segment()). Returns True if the segment is done.
+    """
+    with open(os.path.join(job_dir, "job.json")) as f:
+        job = json.load(f)
+    with open(claimed) as f:
+        spec = json.load(f)
+
+    name = segment_name(spec["index"])
+    work_dir = os.path.join(job_dir, "work", f"{worker_id}_{name}")
+    partial = os.path.join(work_dir, f"{name}.mp4")
+
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(claimed, stop), daemon=True)
+    beat.start()
+    try:
+        render_segment(spec, job, partial, work_dir)
+        os.replace(partial, os.path.join(job_dir, "done", f"{name}.mp4"))
+    except Exception as e:
+        state = release_segment(job_dir, claimed, spec, f"{type(e).__name__}: {e}"[:500])
+        print(f"  {worker_id}: {name} failed ({e}), moved to {state}")
+        return False
+    finally:
+        stop.set()
+        beat.join()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    try:
+        os.remove(claimed)
+    except OSError:
+        pass
+    return True
+
+
+def run_worker(spool_dir: str, worker_id: str = None, exit_when_idle: bool = False):
+    """Claim and render segments from every active job in the spool."""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    print(f"Worker {worker_id} watching {spool_dir}")
+
+    while True:
+        claimed = None
+        active_jobs = 0
+        if os.path.isdir(spool_dir):
+            for job_id in sorted(os.listdir(spool_dir)):
+                job_dir = os.path.join(spool_dir, job_id)
+                if not os.path.exists(os.path.join(job_dir, "job.json")):
+                    continue
+                if os.path.exists(os.path.join(job_dir, "COMPLETE")):
+                    continue
+                active_jobs += 1
+                claimed = claim_segment(job_dir, worker_id)
+                if claimed:
+                    print(f"  {worker_id}: {os.path.basename(claimed)}")
+                    work_on(job_dir, claimed, worker_id)
+                    break
+
+        if claimed is None:
+            if exit_when_idle and active_jobs == 0:
+                return
+            time.sleep(POLL_INTERVAL)
+
+
+def requeue_stale(job_dir: str, max_attempts: int = SEGMENT_MAX_ATTEMPTS) -> int:
+    """
+    Release claims whose heartbeat stopped, like a failed render (see
+    release_segment()). Returns the number released.
+    """
+    running_dir = os.path.join(job_dir, "running")
+    now = time.time()
+    requeued = 0
+    for name in os.listdir(running_dir):
+        claimed = os.path.join(running_dir, name)
+        try:
+            if now - os.path.getmtime(claimed) < SEGMENT_HEARTBEAT_TIMEOUT:
+                continue
+            with open(claimed) as f:
+                spec = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        seg = segment_name(spec["index"])
+        if os.path.exists(os.path.join(job_dir, "done", f"{seg}.mp4")):
+            continue
+
+        worker_id = name.split('.json.')[-1]
+        state = release_segment(job_dir, claimed, spec, f"Worker {worker_id} stalled", max_attempts)
+        print(f"  Worker {worker_id} stalled, moved {seg} to {state}")
+        requeued += 1
+    return requeued
+
+
+def _queued(job_dir: str) -> int:
+    """Segments pending or running."""
+    return sum(
+        1 for sub in ("pending", "running")
+        for name in os.listdir(os.path.join(job_dir, sub)) if not name.endswith(".tmp")
+    )
+
+
+def spawn_worker(spool_dir: str, worker_id: str) -> subprocess.Popen:
+    """Start a local worker process (stands in for a separate node)."""
+    cmd = [
+        sys.executable, os.path.abspath(__file__),
+        'worker', spool_dir, '--id', worker_id, '--exit-when-idle'
+    ]
+    return subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+
+
+@traced
+def render_segmented(
+    images: List[str],
+    durations: List[float],
+    temp_dir: str,
+    width: int = 1920,
+    height: int = 1080,
+    ken_burns: bool = True,
+    crossfade: bool = True,
+    crossfade_duration: float = 0.5,
+    workers: int = 2,
+    spool_dir: str = None,
+    segment_size: int = SEGMENT_SIZE,
+    stills_dir: str = None,
+    settings: RenderSettings = None
+) -> str:
+    """
+    Render the timeline as segments on worker processes and stitch them.
+
+    Args:
+        workers: Local worker processes to start (0 = rely on remote workers)
+        spool_dir: Shared spool directory (default: <temp_dir>/spool)
+        stills_dir: Where workers write working-resolution stills (shared)
+        settings: Frame rate, encoder and framing (sent to workers with the job)
+
+    Returns path to silent_video.mp4 inside temp_dir.
+    """
+    spool_dir = os.path.abspath(spool_dir or os.path.join(temp_dir, "spool"))
+    job_id = os.path.basename(os.path.normpath(temp_dir))
+    settings = (settings or DEFAULT_SETTINGS).replace(
+        width=width, height=height, ken_burns=ken_burns, crossfade=crossfade,
+        crossfade_duration=crossfade_duration
+    )
+
+    segments = plan_segments(images, durations, segment_size, crossfade, crossfade_duration, settings.fps)
+    job = {
+        "settings": settings.to_dict(),
+        "stills_dir": os.path.abspath(stills_dir) if stills_dir else None,
+        "segments": len(segments)
+    }
+    job_dir = create_job(spool_dir, job_id, job, segments)
+    print(f"  {len(segments)} segments queued in {job_dir}")
+
+    procs = {f"local{i}": spawn_worker(spool_dir, f"local{i}") for i in range(workers)}
+    done_dir = os.path.join(job_dir, "done")
+    done_files = [os.path.join(done_dir, f"{segment_name(s['index'])}.mp4") for s in segments]
+
+    try:
+        finished = 0
+        while finished < len(done_files):
+            time.sleep(POLL_INTERVAL)
+            requeue_stale(job_dir)
+
+            # Replace local workers that died while work remains
+            for worker_id, proc in list(procs.items()):
+                if proc.poll() not in (None, 0):
+                    print(f"  Worker {worker_id} exited ({proc.returncode}), restarting")
+                    procs[worker_id] = spawn_worker(spool_dir, worker_id)
+
+            failed = sorted(os.listdir(os.path.join(job_dir, "failed")))
+            if failed:
+                with open(os.path.join(job_dir, "failed", failed[0])) as f:
+                    error = json.load(f).get("error")
+                raise RuntimeError(f"Segment {failed[0][:-5]} failed {SEGMENT_MAX_ATTEMPTS} times: {error}")
+
+            now_finished = sum(1 for p in done_files if os.path.exists(p))
+            if now_finished != finished:
+                finished = now_finished
+                print(f"  Segments done: {finished}/{len(done_files)}")
+            if finished < len(done_files) and not _queued(job_dir):
+                # Done files are published before claims are removed, so a
+                # segment in no state at all is lost
+                if sum(1 for p in done_files if os.path.exists(p)) < len(done_files):
+                    raise RuntimeError("Segments are neither pending, running nor done")
+    finally:
+        open(os.path.join(job_dir, "COMPLETE"), "w").close()
+        for proc in procs.values():
+            if proc.poll() is None:
+                proc.terminate()
+            proc.wait()
+
+    print("Stitching segments...")
+    silent_video = os.path.join(temp_dir, "silent_video.mp4")
+    concatenate_videos(done_files, silent_video)
+    shutil.rmtree(job_dir, ignore_errors=True)
+    return silent_video
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Segment render worker - renders timeline chunks from a shared spool"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    worker = sub.add_parser("worker", help="Run a worker on a spool directory")
+    worker.add_argument("spool", help="Shared spool directory")
+    worker.add_argument("--id", help="Worker id (default: <hostname>-<pid>)")
+    worker.add_argument("--exit-when-idle", action="store_true",
+                        help="Exit when no job in the spool is active")
+
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        # Local workers join the parent's --trace, if any; exit cleanly on
+        # terminate so the trace part is written
+        tracing = start_trace_from_env(f"{args.id or 'worker'}-{os.getpid()}")
+        if tracing:
+            signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        try:
+            run_worker(args.spool, args.id, args.exit_when_idle)
+        finally:
+            if tracing:
+                stop_trace()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Storage Manager - Keep caches and job directories under BASE_DIR in budget
+
+Tracks everything the pipeline writes:
+- job directories in temp/ (one per render or tuning run), claimed with an
+  owner file (pid, host); a directory whose process is gone, or that is
+  older than STORAGE_ORPHAN_HOURS without an owner, is an orphan left by a
+  crashed job and is removed
+- caches with a budget in config.STORAGE_BUDGETS (render cache, watch
+  state, YouTube audio): entries unused for max_age_days are removed, then
+  the least recently used are evicted until the cache fits max_gb (paths
+  in a budget's keep, like the saved render plans, are left alone; the
+  image pool is trimmed by ImagePool.evict(), which spares frames in use)
+- partial files (*_temp.* from yt-dlp, *.part.* from renders) older than
+  STORAGE_PARTIAL_HOURS
+
+Entries are grouped by file stem (a render step's .mp4 and .jpg go
+together) and "last used" is the newest mtime in the group; the caches
+touch their files on every hit.
+
+prepare_storage() runs all of this before a render and then checks that
+STORAGE_MIN_FREE_GB is free, evicting further if needed.
+
+Usage:
+    python scripts/storage.py             # Usage report
+    python scripts/storage.py --clean     # Reclaim orphans, enforce budgets
+    python scripts/storage.py --clean --dry-run
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    BASE_DIR, OUTPUT_DIR, TEMP_DIR, MUSIC_DIR, LOUDNESS_CACHE_DIR, AUDIO_ANALYSIS_CACHE_DIR,
+    IMAGE_HASH_CACHE, STORAGE_BUDGETS, STORAGE_MIN_FREE_GB, STORAGE_ORPHAN_HOURS, STORAGE_PARTIAL_HOURS,
+    IMAGE_POOL_MIN_AGE
+)
+from scripts.image_pool import ImagePool
+
+OWNER_FILE = ".owner"
+GB = 1024 ** 3
+
+
+def human(size: float) -> str:
+    """Bytes as MB or GB for messages."""
+    return f"{size / GB:.2f} GB" if size >= GB else f"{size / 1024 ** 2:.1f} MB"
+
+
+def path_size(path: str) -> int:
+    """Bytes used by a file or directory tree."""
+    if not os.path.isdir(path):
+        return os.path.getsize(path) if os.path.exists(path) else 0
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def last_used(path: str) -> float:
+    """Newest mtime in a file or directory tree."""
+    newest = os.path.getmtime(path)
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    newest = max(newest, os.path.getmtime(os.path.join(root, name)))
+                except OSError:
+                    pass
+    return newest
+
+
+def remove(path: str):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def cache_entries(path: str, prefix: str = "", keep: List[str] = ()) -> List[dict]:
+    """
+    Entries of a cache directory: top-level files and folders grouped by stem,
+    leaving out the paths in keep.
+
+    Returns:
+        List of {"name", "paths", "size", "last_used"}, least recently used first
+    """
+    if not os.path.isdir(path):
+        return []
+    groups = {}
+    keep = {os.path.abspath(p) for p in keep}
+    for name in os.listdir(path):
+        if not name.startswith(prefix) or name == OWNER_FILE:
+            continue
+        if os.path.abspath(os.path.join(path, name)) in keep:
+            continue
+        groups.setdefault(name.split(".")[0], []).append(os.path.join(path, name))
+
+    entries = []
+    for stem, paths in groups.items():
+        try:
+            entries.append({
+                "name": stem,
+                "paths": paths,
+                "size": sum(path_size(p) for p in paths),
+                "last_used": max(last_used(p) for p in paths)
+            })
+        except OSError:
+            continue  # Removed while we looked
+    return sorted(entries, key=lambda e: e["last_used"])
+
+
+def budget_entries(budget: dict) -> List[dict]:
+    """cache_entries() of a STORAGE_BUDGETS entry."""
+    return cache_entries(budget["path"], budget.get("prefix", ""), budget.get("keep", ()))
+
+
+def claim_job_dir(path: str) -> str:
+    """Create a job directory owned by this process (see find_orphans())."""
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, OWNER_FILE), "w") as f:
+        json.dump({"pid": os.getpid(), "host": socket.gethostname(), "started": time.time()}, f)
+    return path
+
+
+def _owner_alive(owner: dict) -> bool:
+    if owner.get("host") != socket.gethostname():
+        return True  # Can't check another host's processes; age decides
+    try:
+        os.kill(owner["pid"], 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        pass
+    return True
+
+
+def _budget_dirs() -> set:
+    return {os.path.abspath(b["path"]) for b in STORAGE_BUDGETS.values()}
+
+
+def job_dirs(temp_dir: str = TEMP_DIR) -> List[str]:
+    """Directories in temp_dir that belong to jobs (everything that isn't a cache)."""
+    if not os.path.isdir(temp_dir):
+        return []
+    cache_dirs = _budget_dirs()
+    prefixes = tuple(b["prefix"] for b in STORAGE_BUDGETS.values()
+                     if b.get("prefix") and os.path.abspath(b["path"]) == os.path.abspath(temp_dir))
+    jobs = []
+    for name in sorted(os.listdir(temp_dir)):
+        path = os.path.join(temp_dir, name)
+        if not os.path.isdir(path) or os.path.abspath(path) in cache_dirs:
+            continue
+        if prefixes and name.startswith(prefixes):
+            continue
+        jobs.append(path)
+    return jobs
+
+
+def find_orphans(temp_dir: str = TEMP_DIR, max_hours: float = STORAGE_ORPHAN_HOURS) -> List[str]:
+    """Job directories in temp_dir left behind by jobs that are no longer running."""
+    cutoff = time.time() - max_hours * 3600
+    orphans = []
+    for path in job_dirs(temp_dir):
+        try:
+            owner_path = os.path.join(path, OWNER_FILE)
+            if not os.path.exists(owner_path):
+                if last_used(path) < cutoff:
+                    orphans.append(path)
+                continue
+            with open(owner_path) as f:
+                owner = json.load(f)
+            if not _owner_alive(owner):
+                orphans.append(path)
+            elif owner.get("host") != socket.gethostname() and last_used(path) < cutoff:
+                orphans.append(path)
+        except (OSError, ValueError, KeyError):
+            continue
+    return orphans
+
+
+def find_partials(max_hours: float = STORAGE_PARTIAL_HOURS) -> List[str]:
+    """Partial downloads and outputs in the caches older than max_hours."""
+    cutoff = time.time() - max_hours * 3600
+    partials = []
+    for directory in sorted(_budget_dirs()):
+        for name in os.listdir(directory) if os.path.isdir(directory) else []:
+            path = os.path.join(directory, name)
+            if ("_temp." in name or ".part." in name) and os.path.isfile(path) \
+                    and os.path.getmtime(path) < cutoff:
+                partials.append(path)
+    return partials
+
+
+def enforce_budgets(budgets: dict = STORAGE_BUDGETS, dry_run: bool = False) -> int:
+    """Remove expired entries, then evict LRU entries until each cache fits. Returns bytes freed."""
+    freed = 0
+    now = time.time()
+    for name, budget in budgets.items():
+        entries = budget_entries(budget)
+        total = sum(e["size"] for e in entries)
+        max_bytes = budget["max_gb"] * GB
+        cutoff = now - budget["max_age_days"] * 86400
+        for entry in entries:
+            if entry["last_used"] >= cutoff and (total <= max_bytes or budget.get("pool")):
+                break  # Sorted by last use: everything after is newer
+            print(f"  {name}: evicting {entry['name']} ({human(entry['size'])})")
+            if not dry_run:
+                for path in entry["paths"]:
+                    remove(path)
+            total -= entry["size"]
+            freed += entry["size"]
+        if budget.get("pool") and total > max_bytes and not dry_run:
+            # The pool spares frames a running FFmpeg may still be reading
+            evicted = ImagePool(budget["path"], budget["max_gb"] * 1024, spill_dir=None).evict()
+            print(f"  {name}: evicted {human(evicted)} of frames")
+            freed += evicted
+    return freed
+
+
+def reclaim(dry_run: bool = False) -> int:
+    """Remove orphaned job directories and stale partial files. Returns bytes freed."""
+    freed = 0
+    for path in find_orphans() + find_partials():
+        size = path_size(path)
+        print(f"  Reclaiming {os.path.relpath(path, BASE_DIR)} ({human(size)})")
+        if not dry_run:
+            remove(path)
+        freed += size
+    return freed
+
+
+def free_gb(path: str = BASE_DIR) -> float:
+    return shutil.disk_usage(path).free / GB
+
+
+def make_room(needed_gb: float, path: str = BASE_DIR) -> bool:
+    """Evict least recently used cache entries (across caches) until needed_gb is free."""
+    entries = []
+    for budget in STORAGE_BUDGETS.values():
+        # Pooled frames used in the last IMAGE_POOL_MIN_AGE seconds may be being read
+        recent = time.time() - IMAGE_POOL_MIN_AGE if budget.get("pool") else float("inf")
+        entries += [e for e in budget_entries(budget) if e["last_used"] < recent]
+    for entry in sorted(entries, key=lambda e: e["last_used"]):
+        if free_gb(path) >= needed_gb:
+            break
+        print(f"  Low on disk: evicting {entry['name']} ({human(entry['size'])})")
+        for p in entry["paths"]:
+            remove(p)
+    return free_gb(path) >= needed_gb
+
+
+def prepare_storage(min_free_gb: float = STORAGE_MIN_FREE_GB) -> bool:
+    """Reclaim orphans, enforce budgets and make sure min_free_gb is free. Returns False if not."""
+    freed = reclaim() + enforce_budgets()
+    if freed:
+        print(f"  Storage: freed {human(freed)}")
+    if free_gb() >= min_free_gb:
+        return True
+    return make_room(min_free_gb)
+
+
+def usage_report() -> List[tuple]:
+    """(name, path, bytes, budget bytes or None) for everything tracked under BASE_DIR."""
+    rows = [("output", OUTPUT_DIR, path_size(OUTPUT_DIR), None)]
+    orphans = set(find_orphans())
+    jobs = job_dirs()
+    rows.append(("jobs (running)", TEMP_DIR, sum(path_size(p) for p in jobs if p not in orphans), None))
+    rows.append(("jobs (orphaned)", TEMP_DIR, sum(path_size(p) for p in orphans), None))
+    for name, budget in STORAGE_BUDGETS.items():
+        size = sum(e["size"] for e in budget_entries(budget))
+        rows.append((name, budget["path"], size, budget["max_gb"] * GB))
+    rows.append(("music", MUSIC_DIR, sum(path_size(os.path.join(MUSIC_DIR, n))
+                                         for n in os.listdir(MUSIC_DIR)
+                                         if os.path.isfile(os.path.join(MUSIC_DIR, n))), None))
+    rows.append(("loudness", LOUDNESS_CACHE_DIR, path_size(LOUDNESS_CACHE_DIR), None))
+    rows.append(("audio analysis", AUDIO_ANALYSIS_CACHE_DIR, path_size(AUDIO_ANALYSIS_CACHE_DIR), None))
+    rows.append(("image hashes", IMAGE_HASH_CACHE, path_size(IMAGE_HASH_CACHE), None))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report and clean PassParadise disk usage")
+    parser.add_argument("--clean", action="store_true", help="Reclaim orphaned jobs and enforce cache budgets")
+    parser.add_argument("--dry-run", action="store_true", help="With --clean: only list what would be removed")
+    args = parser.parse_args()
+
+    if args.clean:
+        freed = reclaim(args.dry_run) + enforce_budgets(dry_run=args.dry_run)
+        verb = "Would free" if args.dry_run else "Freed"
+        print(f"{verb} {human(freed)}")
+        print()
+
+    print(f"{'':<16} {'size':>10} {'budget':>10}  path")
+    for name, path, size, budget in usage_report():
+        limit = human(budget) if budget else "-"
+        print(f"{name:<16} {human(size):>10} {limit:>10}  {os.path.relpath(path, BASE_DIR)}")
+    print(f"\nFree: {free_gb():.1f} GB (renders need {STORAGE_MIN_FREE_GB} GB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Streaming Output - Fragmented MP4 that can be uploaded while it is written
+
+With --stream the final video is written as fragmented MP4: a small header
+(ftyp + empty moov) followed by self-contained moof/mdat fragments of about
+STREAM_FRAGMENT_SECONDS each. Bytes are only ever appended, so everything
+up to the last complete fragment can be sent before the render finishes.
+
+While FFmpeg writes, a thread scans the growing file's top-level boxes and
+keeps a sidecar manifest, <output>.fragments.json:
+
+    {"output": "video.mp4", "init": 1211, "bytes_ready": 412000,
+     "fragments": [{"offset": 1211, "size": 198000}, ...],
+     "complete": false, "failed": false, "size": null}
+
+bytes_ready is the end of the last complete box; size is set and complete
+is true once FFmpeg has exited. scripts/uploader.py follows the manifest.
+"""
+import os
+import sys
+import json
+import time
+import struct
+import threading
+from contextlib import contextmanager
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import STREAM_FRAGMENT_SECONDS
+
+MANIFEST_POLL_INTERVAL = 0.5
+
+
+def fragment_args(seconds: float = STREAM_FRAGMENT_SECONDS) -> List[str]:
+    """Output options for an appending, fragmented MP4."""
+    return [
+        '-movflags', '+frag_keyframe+empty_moov+default_base_moof',
+        '-frag_duration', str(int(seconds * 1e6))
+    ]
+
+
+def tee_output(path: str, options: str = "") -> str:
+    """One output of FFmpeg's tee muxer: [options]path, escaped."""
+    escaped = "".join("\\" + c if c in "\\'|[]" else c for c in path)
+    return f"[{options}]{escaped}"
+
+
+def fragmented_tee_output(path: str, seconds: float = STREAM_FRAGMENT_SECONDS) -> str:
+    """tee_output() writing a fragmented MP4 (see fragment_args())."""
+    return tee_output(
+        path, f"f=mp4:movflags=+frag_keyframe+empty_moov+default_base_moof:"
+              f"frag_duration={int(seconds * 1e6)}"
+    )
+
+
+def manifest_path(output_path: str) -> str:
+    return output_path + ".fragments.json"
+
+
+def scan_boxes(path: str, offset: int = 0) -> List[tuple]:
+    """
+    Top-level MP4 boxes from offset that are completely on disk.
+
+    Returns:
+        List of (type, offset, size); stops at the first partial box
+    """
+    boxes = []
+    try:
+        size_on_disk = os.path.getsize(path)
+    except OSError:
+        return boxes
+    with open(path, "rb") as f:
+        while offset + 8 <= size_on_disk:
+            f.seek(offset)
+            header = f.read(16)
+            size, kind = struct.unpack(">I4s", header[:8])
+            if size == 1:
+                if len(header) < 16:
+                    break
+                size = struct.unpack(">Q", header[8:16])[0]
+            if size < 8 or offset + size > size_on_disk:
+                break  # size 0 (to end of file) or still being written
+            boxes.append((kind.decode("latin-1"), offset, size))
+            offset += size
+    return boxes
+
+
+def _write_manifest(path: str, manifest: dict):
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def read_manifest(output_path: str) -> dict:
+    """The manifest for output_path, or None if there is none (yet)."""
+    try:
+        with open(manifest_path(output_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class FragmentTracker:
+    """Follows a growing fragmented MP4 and keeps its manifest up to date."""
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.manifest = {
+            "output": os.path.basename(output_path),
+            "init": None,
+            "bytes_ready": 0,
+            "fragments": [],
+            "complete": False,
+            "failed": False,
+            "size": None
+        }
+        self._pending = None  # moof waiting for its mdat
+
+    def update(self) -> bool:
+        """Scan for new complete boxes. Returns True if the manifest changed."""
+        boxes = scan_boxes(self.output_path, self.manifest["bytes_ready"])
+        for kind, offset, size in boxes:
+            if kind == "moov":
+                self.manifest["init"] = offset + size
+            elif kind == "moof":
+                self._pending = offset
+            elif kind == "mdat" and self._pending is not None:
+                self.manifest["fragments"].append({"offset": self._pending, "size": offset + size - self._pending})
+                self._pending = None
+            self.manifest["bytes_ready"] = offset + size
+        return bool(boxes)
+
+    def save(self):
+        _write_manifest(manifest_path(self.output_path), self.manifest)
+
+
+@contextmanager
+def track_fragments(output_path: str, interval: float = MANIFEST_POLL_INTERVAL):
+    """
+    Keep output_path's manifest current while the block runs (FFmpeg writing it).
+
+    The manifest is marked complete when the block exits normally, failed
+    if it raises.
+    """
+    for path in (output_path, manifest_path(output_path)):
+        if os.path.exists(path):
+            os.remove(path)  # An uploader must not follow the last render's file
+    tracker = FragmentTracker(output_path)
+    tracker.save()
+    done = threading.Event()
+
+    def follow():
+        while not done.wait(interval):
+            if tracker.update():
+                tracker.save()
+
+    thread = threading.Thread(target=follow, daemon=True)
+    thread.start()
+    try:
+        yield tracker
+    except BaseException:
+        done.set()
+        thread.join()
+        tracker.manifest["failed"] = True
+        tracker.save()
+        raise
+    done.set()
+    thread.join()
+    tracker.update()
+    tracker.manifest["complete"] = True
+    tracker.manifest["size"] = os.path.getsize(output_path)
+    tracker.save()
+
+
+def wait_for_manifest(output_path: str, timeout: float = None, interval: float = MANIFEST_POLL_INTERVAL) -> dict:
+    """Block until output_path has a manifest (or timeout seconds pass)."""
+    started = time.time()
+    while True:
+        manifest = read_manifest(output_path)
+        if manifest is not None:
+            return manifest
+        if timeout is not None and time.time() - started > timeout:
+            return None
+        time.sleep(interval)
@@ -0,0 +1,205 @@
+"""
+Thumbnail Picker - Rank images as YouTube thumbnail candidates
+
+Scores the working-resolution stills written during the render (so the
+original photos are not decoded again) on:
+- Sharpness: variance of the Laplacian
+- Exposure: mid-tone brightness, penalising clipped shadows/highlights
+- Colorfulness: Hasler & Suesstrunk colorfulness metric
+
+Stills are loaded at reduced size in a thread pool (JPEG draft mode decodes
+straight to 1/8 scale) and scored in batches with NumPy.
+
+Usage:
+    python scripts/thumbnails.py /path/to/stills/ --output /path/to/thumbs/
+"""
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    THUMBNAIL_CANDIDATES, THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT, THUMBNAIL_WEIGHTS
+)
+from scripts.archive import is_archive, open_image
+from scripts.tracing import traced
+
+SCORE_SIZE = (256, 144)  # Analysis resolution (width, height)
+BATCH_SIZE = 64
+
+
+def load_small(path: str):
+    """Decode an image at analysis resolution as float32 RGB in [0, 1]."""
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(open_image(path)) as img:
+        img.draft("RGB", SCORE_SIZE)
+        img = img.convert("RGB").resize(SCORE_SIZE, Image.BILINEAR)
+        return np.asarray(img, dtype=np.float32) / 255.0
+
+
+def laplacian_variance(gray):
+    """Variance of the 4-neighbour Laplacian for a batch (N, H, W)."""
+    lap = (
+        gray[:, :-2, 1:-1] + gray[:, 2:, 1:-1] +
+        gray[:, 1:-1, :-2] + gray[:, 1:-1, 2:] -
+        4 * gray[:, 1:-1, 1:-1]
+    )
+    return lap.reshape(len(gray), -1).var(axis=1)
+
+
+def score_batch(batch) -> dict:
+    """Raw metrics for a batch of RGB arrays (N, H, W, 3)."""
+    import numpy as np
+
+    r, g, b = batch[..., 0], batch[..., 1], batch[..., 2]
+    gray = 0.299 * r + 0.587 * g + 0.114 * b
+    flat = gray.reshape(len(batch), -1)
+
+    # Exposure: 1 at mid-grey mean, minus the fraction of clipped pixels
+    clipped = ((flat < 0.02) | (flat > 0.98)).mean(axis=1)
+    exposure = 1 - np.abs(flat.mean(axis=1) - 0.5) * 2 - clipped
+
+    # Colorfulness (Hasler & Suesstrunk 2003)
+    rg = (r - g).reshape(len(batch), -1)
+    yb = (0.5 * (r + g) - b).reshape(len(batch), -1)
+    colorfulness = (
+        np.sqrt(rg.std(axis=1) ** 2 + yb.std(axis=1) ** 2) +
+        0.3 * np.sqrt(rg.mean(axis=1) ** 2 + yb.mean(axis=1) ** 2)
+    )
+
+    return {
+        "sharpness": laplacian_variance(gray),
+        "exposure": exposure,
+        "colorfulness": colorfulness
+    }
+
+
+def _percentile_rank(values):
+    """Map values to [0, 1] by rank so metrics on different scales combine."""
+    import numpy as np
+
+    if len(values) < 2:
+        return np.ones(len(values), dtype=np.float32)
+    ranks = values.argsort().argsort()
+    return ranks / (len(values) - 1)
+
+
+def score_images(paths: List[str], max_workers: int = None) -> List[dict]:
+    """
+    Score images as thumbnail candidates.
+
+    Returns:
+        List of {"path", "score", "sharpness", "exposure", "colorfulness"},
+        best first
+    """
+    import numpy as np
+
+    metrics = {"sharpness": [], "exposure": [], "colorfulness": []}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for start in range(0, len(paths), BATCH_SIZE):
+            batch = np.stack(list(pool.map(load_small, paths[start:start + BATCH_SIZE])))
+            for name, values in score_batch(batch).items():
+                metrics[name].append(values)
+
+    metrics = {name: np.concatenate(values) for name, values in metrics.items()}
+    score = (
+        THUMBNAIL_WEIGHTS["sharpness"] * _percentile_rank(metrics["sharpness"]) +
+        THUMBNAIL_WEIGHTS["exposure"] * np.clip(metrics["exposure"], 0, 1) +
+        THUMBNAIL_WEIGHTS["colorfulness"] * _percentile_rank(metrics["colorfulness"])
+    )
+
+    ranked = []
+    for i in np.argsort(-score):
+        ranked.append({
+            "path": paths[i],
+            "score": round(float(score[i]), 4),
+            "sharpness": round(float(metrics["sharpness"][i]), 6),
+            "exposure": round(float(metrics["exposure"][i]), 4),
+            "colorfulness": round(float(metrics["colorfulness"][i]), 4)
+        })
+    return ranked
+
+
+def export_thumbnails(
+    ranked: List[dict],
+    output_dir: str,
+    count: int = THUMBNAIL_CANDIDATES,
+    source_of: dict = None
+) -> List[str]:
+    """
+    Save the top candidates as 1280x720 JPEGs plus ranking.json.
+
+    Args:
+        ranked: Output of score_images()
+        output_dir: Folder for thumb_1.jpg, thumb_2.jpg, ...
+        count: Number of candidates to export
+        source_of: Optional scored path -> original image, for ranking.json
+    """
+    from PIL import Image, ImageOps
+
+    os.makedirs(output_dir, exist_ok=True)
+    exported = []
+    for rank, entry in enumerate(ranked[:count], start=1):
+        out_path = os.path.join(output_dir, f"thumb_{rank}.jpg")
+        with Image.open(open_image(entry["path"])) as img:
+            thumb = ImageOps.fit(img.convert("RGB"), (THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT), Image.LANCZOS)
+            thumb.save(out_path, "JPEG", quality=90)
+        exported.append(out_path)
+
+    if source_of:
+        for entry in ranked:
+            entry["source"] = source_of.get(entry["path"])
+
+    with open(os.path.join(output_dir, "ranking.json"), "w") as f:
+        json.dump(ranked, f, indent=2)
+    return exported
+
+
+@traced
+def pick_thumbnails(
+    stills: List[str],
+    output_dir: str,
+    count: int = THUMBNAIL_CANDIDATES,
+    sources: List[str] = None
+) -> List[str]:
+    """
+    Score stills and export the best count as thumbnails.
+
+    sources, if given, lists the original image for each still (same order).
+    """
+    source_of = dict(zip(stills, sources)) if sources else None
+    stills = [p for p in stills if os.path.exists(p)]
+    if not stills:
+        return []
+    ranked = score_images(stills)
+    return export_thumbnails(ranked, output_dir, count, source_of)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank images as thumbnail candidates")
+    parser.add_argument("folder", help="Folder (or .zip) of images or render stills")
+    parser.add_argument("--output", "-o", help="Output folder (default: <folder>/thumbnails)")
+    parser.add_argument("--count", "-n", type=int, default=THUMBNAIL_CANDIDATES,
+                        help=f"Number of candidates (default: {THUMBNAIL_CANDIDATES})")
+
+    args = parser.parse_args()
+
+    from scripts.image_loader import load_images_from_folder
+    images = load_images_from_folder(args.folder, "filename")
+    if args.output:
+        output_dir = args.output
+    elif is_archive(args.folder):
+        output_dir = os.path.splitext(args.folder)[0] + "_thumbnails"
+    else:
+        output_dir = os.path.join(args.folder, "thumbnails")
+    for path in pick_thumbnails(images, output_dir, args.count):
+        print(f"  {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Timeline Planner - Decide exactly which images and frames reach the output
+
+The slideshow is planned in whole frames against the music length before
+anything is rendered, so no clip is encoded only to be cut off or padded
+out. When the images fit between MIN_IMAGE_DURATION and MAX_IMAGE_DURATION,
+every image is used and the music length is shared out frame-exactly.
+
+When there are more images than the track can show at the minimum
+duration, the policy decides what happens:
+- drop:      show images in order until the music ends; skip the rest
+- subsample: show as many images as fit, picked evenly across the set
+- spread:    show every image, shorter than the minimum if needed (down to
+             SPREAD_MIN_SECONDS of hold after the crossfade)
+- loop:      previous behaviour - every image at the clamped duration, the
+             music loops to cover the extra length
+
+If there are too few images to fill the track at the maximum duration,
+every image is shown at the maximum and the video ends before the music.
+
+snap_to_beats() then optionally moves the image changes onto the music's
+beats (scripts/audio_analysis.py), keeping the length and duration limits.
+"""
+import os
+import sys
+from bisect import bisect_left
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import VIDEO_FPS, MIN_IMAGE_DURATION, MAX_IMAGE_DURATION, TIMELINE_POLICY
+
+TIMELINE_POLICIES = ("drop", "subsample", "spread", "loop")
+SPREAD_MIN_SECONDS = 1.0
+
+
+def to_frames(seconds: float, fps: int = VIDEO_FPS) -> int:
+    """Round a duration to a whole number of frames."""
+    return int(seconds * fps + 0.5)
+
+
+def share_frames(total: int, count: int) -> List[int]:
+    """Split total frames into count near-equal whole parts."""
+    base, extra = divmod(total, count)
+    return [base + 1 if i < extra else base for i in range(count)]
+
+
+def pick_evenly(items: list, count: int) -> list:
+    """count items spread evenly across items, keeping order and both ends."""
+    if count >= len(items):
+        return list(items)
+    if count == 1:
+        return [items[0]]
+    step = (len(items) - 1) / (count - 1)
+    return [items[int(i * step + 0.5)] for i in range(count)]
+
+
+def plan_timeline(
+    images: List[str],
+    music_duration: float,
+    policy: str = TIMELINE_POLICY,
+    crossfade: bool = True,
+    crossfade_duration: float = 0.5,
+    fps: int = VIDEO_FPS,
+    min_duration: float = MIN_IMAGE_DURATION,
+    max_duration: float = MAX_IMAGE_DURATION
+) -> dict:
+    """
+    Plan the images and per-image durations to render.
+
+    Returns:
+        Dict with:
+        - images: images to render, in order
+        - durations: seconds per image (whole frames)
+        - frames: frames per image
+        - total_frames: timeline length including crossfade overlaps
+        - dropped: number of input images left out
+    """
+    if policy not in TIMELINE_POLICIES:
+        raise ValueError(f"Unknown timeline policy: {policy} (use one of {', '.join(TIMELINE_POLICIES)})")
+    if not images:
+        raise ValueError("No images to plan")
+
+    n = len(images)
+    fade = to_frames(crossfade_duration, fps) if crossfade and n > 1 else 0
+    target = max(1, to_frames(music_duration, fps))
+    min_f = max(to_frames(min_duration, fps), fade + 1)
+    max_f = max(to_frames(max_duration, fps), min_f)
+
+    def frames_for(count: int) -> List[int]:
+        # Whole frames for count clips that add up to the music exactly
+        return share_frames(target + (count - 1) * fade, count)
+
+    per_image = (target + (n - 1) * fade) / n
+    selected = list(images)
+
+    if policy == "loop":
+        frames = [min(max_f, max(min_f, int(per_image)))] * n
+    elif per_image > max_f:
+        # Too few images: each at the maximum, video ends before the music
+        frames = [max_f] * n
+    elif per_image >= min_f:
+        frames = frames_for(n)
+    elif policy == "spread" and per_image >= fade + to_frames(SPREAD_MIN_SECONDS, fps):
+        frames = frames_for(n)
+    else:
+        # More images than the track can show: keep as many as fit at the
+        # minimum duration (spread falls back to this below its floor)
+        floor = min_f if policy != "spread" else fade + to_frames(SPREAD_MIN_SECONDS, fps)
+        count = max(1, min(n, (target - fade) // (floor - fade)))
+        selected = images[:count] if policy == "drop" else pick_evenly(images, count)
+        fade = fade if count > 1 else 0
+        frames = share_frames(target + (count - 1) * fade, count)
+
+    total_frames = sum(frames) - (len(frames) - 1) * fade
+    return {
+        "images": selected,
+        "durations": [f / fps for f in frames],
+        "frames": frames,
+        "total_frames": total_frames,
+        "dropped": n - len(selected)
+    }
+
+
+def snap_to_beats(
+    plan: dict,
+    beats: List[float],
+    music_start: float = 0.0,
+    fps: int = VIDEO_FPS,
+    min_duration: float = MIN_IMAGE_DURATION,
+    max_duration: float = MAX_IMAGE_DURATION
+) -> dict:
+    """
+    Move every image change of a planned timeline onto a beat.
+
+    The middle of each crossfade (or the cut) goes to the beat nearest the
+    evenly spaced position of the images still to place, as long as every
+    image keeps between min_duration and max_duration (or the plan's own
+    extremes, if it already went past them) and the rest still fit. A
+    change with no such beat stays evenly spaced. The total length is
+    unchanged.
+
+    beats are seconds into the music file; music_start is where the video's
+    music begins.
+
+    Returns:
+        The plan with new durations and frames, plus "snapped": changes
+        moved onto a beat
+    """
+    frames = plan["frames"]
+    n = len(frames)
+    if n < 2 or not beats:
+        return dict(plan, snapped=0)
+
+    total = plan["total_frames"]
+    fade = (sum(frames) - total) // (n - 1)
+    half = fade // 2
+    lo = min(to_frames(min_duration, fps), min(frames))
+    hi = max(to_frames(max_duration, fps), max(frames))
+    # Beat positions in timeline frames, as transition starts
+    starts = sorted({to_frames(b - music_start, fps) - half for b in beats if b >= music_start})
+
+    new_frames, previous, snapped = [], 0, 0  # previous: start of the last transition (0 before the first)
+    for i in range(n - 1):
+        rest = n - 1 - i  # images after this change
+        # Range for this transition's start: this image within limits, and
+        # the images after it able to fill what is left
+        earliest = max(previous + lo - fade, total - (rest * hi - (rest - 1) * fade))
+        latest = min(previous + hi - fade, total - (rest * lo - (rest - 1) * fade))
+        ideal = previous + (total - previous + rest * fade) / (rest + 1) - fade
+
+        start = None
+        k = bisect_left(starts, ideal)
+        for candidate in starts[max(0, k - 1):k + 1]:
+            if earliest <= candidate <= latest and (start is None or abs(candidate - ideal) < abs(start - ideal)):
+                start = candidate
+        if start is None:
+            start = min(max(int(ideal + 0.5), earliest), latest)
+        else:
+            snapped += 1
+
+        new_frames.append(start - previous + fade)
+        previous = start
+    new_frames.append(total - previous)
+
+    return dict(
+        plan,
+        frames=new_frames,
+        durations=[f / fps for f in new_frames],
+        snapped=snapped
+    )
@@ -0,0 +1,215 @@
+"""
+Tracing - Chrome trace-event timeline of a render
+
+Records a span for every traced stage (Python function) and every
+subprocess started through run(): command, wall and CPU time, exit code and
+FFmpeg's -benchmark figures (user/system/real time, max RSS). The result is
+a Chrome trace JSON file; open it in https://ui.perfetto.dev or
+chrome://tracing.
+
+With profile=True the Python side is also run under cProfile: the stats are
+saved next to the trace (<trace>.prof, for pstats/snakeviz) and the top
+functions are listed in the trace metadata.
+
+Local segment workers (scripts/segment_render.py) inherit the trace through
+an environment variable and write their own part files, which are merged
+into the main trace when it is stopped.
+
+Tracing is off unless start_trace() is called; run() and traced() then cost
+one check. Only the standard library is used so create_music_video.py can
+share this module.
+"""
+import os
+import re
+import sys
+import glob
+import json
+import time
+import functools
+import threading
+import subprocess
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TRACE_ENV = "PARADISE_TRACE"
+PROFILE_TOP = 30
+
+_trace = None
+_BENCH_TIMES = re.compile(r"bench: utime=([\d.]+)s stime=([\d.]+)s rtime=([\d.]+)s")
+_BENCH_RSS = re.compile(r"bench: maxrss=(\d+)(?:KiB|kB)")
+
+
+def _now_us() -> int:
+    # Epoch based so spans from worker processes line up
+    return time.time_ns() // 1000
+
+
+def is_tracing() -> bool:
+    return _trace is not None
+
+
+def start_trace(path: str, profile: bool = False, part: bool = False):
+    """
+    Start recording. part=True is used by worker processes: their events
+    are written for the main process to merge and not inherited further.
+    """
+    global _trace
+    _trace = {"path": path, "events": [], "profiler": None, "part": part}
+    pid = os.getpid()
+    _trace["events"].append({
+        "name": "process_name", "ph": "M", "pid": pid,
+        "args": {"name": f"{os.path.basename(sys.argv[0])} ({pid})"}
+    })
+    if not part:
+        os.environ[TRACE_ENV] = os.path.abspath(path)
+    if profile:
+        import cProfile
+        _trace["profiler"] = cProfile.Profile()
+        _trace["profiler"].enable()
+
+
+def start_trace_from_env(name: str) -> bool:
+    """Join the parent's trace (if any) as a part file. Returns True if tracing."""
+    path = os.environ.get(TRACE_ENV)
+    if not path:
+        return False
+    start_trace(f"{path}.{name}.part.json", part=True)
+    return True
+
+
+def _profile_summary(profiler) -> list:
+    import pstats
+
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP]
+    return [
+        {
+            "function": f"{os.path.basename(filename)}:{line}({name})",
+            "calls": calls,
+            "self_ms": round(self_time * 1000, 2),
+            "cumulative_ms": round(cumulative * 1000, 2)
+        }
+        for (filename, line, name), (_, calls, self_time, cumulative, _) in rows
+    ]
+
+
+def stop_trace() -> str:
+    """Write the trace file (merging worker parts) and stop. Returns its path."""
+    global _trace
+    if _trace is None:
+        return None
+    trace, _trace = _trace, None
+    path = trace["path"]
+    events = trace["events"]
+    other = {}
+
+    if trace["profiler"]:
+        trace["profiler"].disable()
+        trace["profiler"].dump_stats(path + ".prof")
+        other["python_profile"] = _profile_summary(trace["profiler"])
+        other["python_profile_file"] = path + ".prof"
+
+    if not trace["part"]:
+        os.environ.pop(TRACE_ENV, None)
+        for part_path in sorted(glob.glob(glob.escape(os.path.abspath(path)) + ".*.part.json")):
+            try:
+                with open(part_path) as f:
+                    events.extend(json.load(f)["traceEvents"])
+                os.remove(part_path)
+            except (OSError, ValueError, KeyError):
+                pass
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms", "otherData": other}, f)
+    return path
+
+
+@contextmanager
+def span(name: str, cat: str = "stage", **args):
+    """
+    Record a span around a block. Yields a dict; keys added to it are
+    stored with the span.
+    """
+    if _trace is None:
+        yield args
+        return
+
+    start = _now_us()
+    cpu_start = time.thread_time()
+    try:
+        yield args
+    finally:
+        args["cpu_ms"] = round((time.thread_time() - cpu_start) * 1000, 2)
+        _trace["events"].append({
+            "name": name, "cat": cat, "ph": "X",
+            "ts": start, "dur": _now_us() - start,
+            "pid": os.getpid(), "tid": threading.get_ident(),
+            "args": args
+        })
+
+
+def traced(func):
+    """Decorator: record a span for every call of func."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _trace is None:
+            return func(*args, **kwargs)
+        with span(func.__name__, cat="python"):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def parse_benchmark(stderr) -> dict:
+    """FFmpeg -benchmark lines -> {"utime_s", "stime_s", "rtime_s", "maxrss_kib"}."""
+    if not stderr:
+        return {}
+    if isinstance(stderr, bytes):
+        stderr = stderr.decode(errors="replace")
+    bench = {}
+    times = _BENCH_TIMES.search(stderr)
+    if times:
+        bench["utime_s"], bench["stime_s"], bench["rtime_s"] = (float(v) for v in times.groups())
+    rss = _BENCH_RSS.search(stderr)
+    if rss:
+        bench["maxrss_kib"] = int(rss.group(1))
+    return bench
+
+
+def run(cmd: list, **kwargs) -> subprocess.CompletedProcess:
+    """
+    subprocess.run() that records a span when tracing.
+
+    FFmpeg commands whose stderr is captured get -benchmark added, which
+    reports that process's own CPU time. For other commands CPU time comes
+    from the children rusage delta (approximate when processes overlap).
+    """
+    if _trace is None:
+        return subprocess.run(cmd, **kwargs)
+
+    captured = kwargs.get("capture_output") or kwargs.get("stderr") == subprocess.PIPE
+    is_ffmpeg = os.path.basename(cmd[0]) == "ffmpeg"
+    if is_ffmpeg and captured and "-benchmark" not in cmd:
+        cmd = [cmd[0], "-benchmark", *cmd[1:]]
+
+    before = resource.getrusage(resource.RUSAGE_CHILDREN) if resource else None
+    with span(os.path.basename(cmd[0]), cat="subprocess", cmd=subprocess.list2cmdline(cmd)) as info:
+        try:
+            result = subprocess.run(cmd, **kwargs)
+        except subprocess.CalledProcessError as e:
+            info["exit_code"] = e.returncode
+            info.update(parse_benchmark(e.stderr))
+            raise
+        info["exit_code"] = result.returncode
+        if is_ffmpeg:
+            info.update(parse_benchmark(result.stderr))
+        if before and "utime_s" not in info:
+            after = resource.getrusage(resource.RUSAGE_CHILDREN)
+            info["utime_s"] = round(after.ru_utime - before.ru_utime, 3)
+            info["stime_s"] = round(after.ru_stime - before.ru_stime, 3)
+    return result
@@ -0,0 +1,169 @@
+"""
+Uploader - Send a video to a resumable upload session while it renders
+
+Follows the fragment manifest of a --stream render (scripts/streaming.py)
+and sends every byte that is ready, so the upload finishes shortly after
+the render instead of starting after it.
+
+Speaks the resumable upload protocol used by YouTube and Google APIs: the
+session URL (created beforehand, e.g. with the Data API's
+uploadType=resumable) receives PUT requests with
+
+    Content-Range: bytes <first>-<last>/*        while the size is unknown
+    Content-Range: bytes <first>-<last>/<size>   for the final chunk
+
+and answers 308 (with a Range header of what it has) until the last chunk,
+then 200/201. Chunks are multiples of 256 KiB except the last. After a
+network error or 5xx the session is asked what it has received
+(Content-Range: bytes */*) and the upload resumes from there.
+
+Usage:
+    python scripts/uploader.py output/video.mp4 "https://upload.example/session"
+"""
+import os
+import sys
+import time
+import argparse
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import UPLOAD_CHUNK_BYTES, UPLOAD_MAX_RETRIES
+from scripts.streaming import read_manifest, wait_for_manifest, MANIFEST_POLL_INTERVAL
+from scripts.tracing import traced
+
+CHUNK_GRANULARITY = 256 * 1024
+
+
+class UploadError(Exception):
+    pass
+
+
+def _received(response) -> int:
+    """Bytes the session has, from a 308's Range header ("bytes=0-N")."""
+    value = response.headers.get("Range")
+    if not value:
+        return 0
+    return int(value.rsplit("-", 1)[1]) + 1
+
+
+def query_offset(session: requests.Session, url: str, size: int = None) -> int:
+    """Ask the upload session how many bytes it has (-1 if the upload is finished)."""
+    response = session.put(url, data=b"", headers={
+        "Content-Range": f"bytes */{size if size is not None else '*'}"
+    })
+    if response.status_code in (200, 201):
+        return -1
+    if response.status_code != 308:
+        raise UploadError(f"Session status query failed: HTTP {response.status_code}")
+    return _received(response)
+
+
+def _send(session: requests.Session, url: str, data: bytes, offset: int, size: int = None) -> int:
+    """PUT one chunk. Returns the next offset to send (-1 when the upload is complete)."""
+    last = offset + len(data) - 1
+    total = size if size is not None else "*"
+    headers = {"Content-Range": f"bytes {offset}-{last}/{total}" if data else f"bytes */{total}"}
+    response = session.put(url, data=data, headers=headers)
+    if response.status_code in (200, 201):
+        return -1
+    if response.status_code == 308:
+        return _received(response)
+    if response.status_code >= 500:
+        raise requests.ConnectionError(f"HTTP {response.status_code}")
+    raise UploadError(f"Upload rejected: HTTP {response.status_code} {response.text[:200]}")
+
+
+@traced
+def upload_stream(
+    output_path: str,
+    url: str,
+    chunk_bytes: int = UPLOAD_CHUNK_BYTES,
+    max_retries: int = UPLOAD_MAX_RETRIES,
+    wait_timeout: float = None,
+    quiet: bool = False
+) -> dict:
+    """
+    Upload output_path to a resumable session as its manifest says bytes are ready.
+
+    Works on a finished file too (no manifest: the whole file is ready).
+
+    Returns:
+        Dict with bytes, seconds, sent_before_finish (bytes that were already
+        sent when the render finished) and retries
+    """
+    chunk_bytes = max(CHUNK_GRANULARITY, chunk_bytes // CHUNK_GRANULARITY * CHUNK_GRANULARITY)
+    manifest = read_manifest(output_path)
+    if manifest is None and not os.path.exists(output_path):
+        manifest = wait_for_manifest(output_path, wait_timeout)
+        if manifest is None:
+            raise UploadError(f"No output or manifest for {output_path}")
+
+    started = time.time()
+    session = requests.Session()
+    offset, retries, sent_before_finish = 0, 0, None
+    while True:
+        manifest = read_manifest(output_path) if manifest is not None else None
+        if manifest is None:
+            ready, size = os.path.getsize(output_path), os.path.getsize(output_path)
+        elif manifest["failed"]:
+            raise UploadError(f"Render of {output_path} failed; upload abandoned at {offset} bytes")
+        else:
+            ready, size = manifest["bytes_ready"], manifest["size"] if manifest["complete"] else None
+        if size is not None and sent_before_finish is None:
+            sent_before_finish = offset
+
+        # Whole chunks while the size is unknown; the rest once it is final
+        end = min(ready, offset + chunk_bytes)
+        if size is None:
+            end = offset + (end - offset) // CHUNK_GRANULARITY * CHUNK_GRANULARITY
+            if end <= offset:
+                time.sleep(MANIFEST_POLL_INTERVAL)
+                continue
+
+        with open(output_path, "rb") as f:
+            f.seek(offset)
+            data = f.read(end - offset)
+        try:
+            offset = _send(session, url, data, offset, size if end == size else None)
+        except requests.RequestException as e:
+            retries += 1
+            if retries > max_retries:
+                raise UploadError(f"Upload failed after {max_retries} retries: {e}")
+            time.sleep(min(2 ** retries, 30))
+            try:
+                offset = query_offset(session, url)
+            except requests.RequestException:
+                continue  # Still unreachable; the next attempt counts as a retry
+            if not quiet:
+                print(f"  Upload: retrying from {offset} bytes ({e})")
+        if offset == -1:
+            break
+        if not quiet:
+            print(f"  Upload: {offset / 1024 ** 2:.1f} MB sent" + ("" if size else " (render running)"))
+
+    return {
+        "bytes": size,
+        "seconds": round(time.time() - started, 1),
+        "sent_before_finish": sent_before_finish or 0,
+        "retries": retries
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upload a (still rendering) video to a resumable upload session")
+    parser.add_argument("video", help="Output video of a --stream render, or any finished file")
+    parser.add_argument("url", help="Resumable upload session URL")
+    parser.add_argument("--chunk-mb", type=float, default=UPLOAD_CHUNK_BYTES / 1024 ** 2,
+                        help=f"Chunk size in MB (default: {UPLOAD_CHUNK_BYTES / 1024 ** 2:g})")
+    parser.add_argument("--wait", type=float, default=None,
+                        help="Seconds to wait for the render to start writing (default: forever)")
+    args = parser.parse_args()
+
+    try:
+        result = upload_stream(args.video, args.url, int(args.chunk_mb * 1024 ** 2), wait_timeout=args.wait)
+    except UploadError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Uploaded {result['bytes'] / 1024 ** 2:.1f} MB in {result['seconds']:.1f}s "
+          f"({result['sent_before_finish'] / 1024 ** 2:.1f} MB sent before the render finished)")
@@ -0,0 +1,125 @@
+"""
+Soundtrack Variants - One slideshow, several soundtracks
+
+For A/B tests of the same images against different tracks. Each track gets
+a timeline (scripts/timeline.py), but tracks are grouped so the silent
+video is rendered once per distinct timeline:
+- tracks that plan to the same images and frames share it
+- a track at most VARIANT_LENGTH_TOLERANCE longer than an already planned
+  timeline reuses that one (the music is cut, with its fade-out, at the
+  end of the video) instead of being re-planned
+
+Silent videos go through render plans (scripts/render_plan.py), so they
+are cached by timeline and reused by later runs as well. Every variant is
+then a stream-copy mux of its silent video with its track, run in
+parallel.
+"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import RENDER_CACHE_DIR, VARIANT_MUX_JOBS, VARIANT_LENGTH_TOLERANCE
+from scripts.timeline import plan_timeline
+from scripts.render_plan import (
+    build_plan, render_plan, optimize_plan, compile_plan, execute_steps, audio_track
+)
+from scripts.render_settings import RenderSettings, DEFAULT_SETTINGS
+from scripts.tracing import traced
+
+
+def variant_output_path(output_base: str, name: str) -> str:
+    """<output_base>_<name>.mp4"""
+    return f"{os.path.splitext(output_base)[0]}_{name}.mp4"
+
+
+def group_timelines(
+    images: List[str],
+    variants: List[dict],
+    settings: RenderSettings = DEFAULT_SETTINGS,
+    tolerance: float = VARIANT_LENGTH_TOLERANCE
+) -> List[dict]:
+    """
+    Plan a timeline per distinct track length (policy, crossfade, frame
+    rate and duration limits from settings).
+
+    variants: dicts with "name" and "duration" (seconds of music).
+
+    Returns:
+        List of timelines (see plan_timeline()), each with "variants": the
+        names of the variants that use it
+    """
+    timelines = []
+    # Shortest first, so longer tracks can reuse a shorter timeline
+    for variant in sorted(variants, key=lambda v: v["duration"]):
+        planned = plan_timeline(
+            images, variant["duration"], settings.timeline_policy, settings.crossfade,
+            settings.crossfade_duration, settings.fps, settings.min_image_duration,
+            settings.max_image_duration
+        )
+        key = (planned["images"], planned["frames"])
+        for timeline in timelines:
+            length = timeline["total_frames"] / settings.fps
+            if (timeline["images"], timeline["frames"]) == key or \
+                    length <= variant["duration"] <= length * (1 + tolerance):
+                timeline["variants"].append(variant["name"])
+                break
+        else:
+            planned["variants"] = [variant["name"]]
+            timelines.append(planned)
+    return timelines
+
+
+@traced
+def render_variants(
+    images: List[str],
+    variants: List[dict],
+    output_base: str,
+    jobs: int = VARIANT_MUX_JOBS,
+    cache_dir: str = RENDER_CACHE_DIR,
+    settings: RenderSettings = None
+) -> dict:
+    """
+    Render one output per soundtrack variant, all with the size, effects,
+    timing and encoders of settings (default: config.py).
+
+    variants: dicts with "name", "music_path", "duration" (of the music
+    used), "volume" and optionally "start" (seconds of intro to skip).
+
+    Returns:
+        Dict of variant name -> output path (<output_base>_<name>.mp4)
+    """
+    settings = settings or DEFAULT_SETTINGS
+    by_name = {v["name"]: v for v in variants}
+    timelines = group_timelines(images, variants, settings)
+    print(f"  {len(variants)} variants, {len(timelines)} timelines to render")
+
+    muxes = {}
+    for i, timeline in enumerate(timelines, 1):
+        print(f"  Timeline {i}/{len(timelines)}: {len(timeline['images'])} images, "
+              f"{timeline['total_frames'] / settings.fps:.1f}s for {', '.join(timeline['variants'])}")
+        plan = build_plan(
+            timeline["images"], timeline["durations"], settings.width, settings.height,
+            settings.ken_burns, settings.crossfade, settings.crossfade_duration,
+            encoder=settings.encoder_args(), fps=settings.fps, framing=settings.framing,
+            animation_timing=settings.animation_timing
+        )
+        render_plan(plan, cache_dir)
+
+        # The silent steps are cached now, so each variant is only its mux
+        for name in timeline["variants"]:
+            variant = by_name[name]
+            with_audio = dict(plan, audio=audio_track(
+                variant["music_path"], variant["volume"], audio_bitrate=settings.audio_bitrate,
+                music_start=variant.get("start", 0.0), audio_codec=settings.audio_codec
+            ))
+            output = variant_output_path(output_base, name)
+            muxes[name] = compile_plan(optimize_plan(with_audio), cache_dir, output)[-1]
+
+    print(f"  Muxing {len(muxes)} soundtracks...")
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        for name, _ in zip(muxes, pool.map(lambda step: execute_steps([step]), muxes.values())):
+            print(f"    {name}: {muxes[name]['output']}")
+
+    return {name: step["output"] for name, step in muxes.items()}
@@ -0,0 +1,273 @@
+"""
+Verify - Check a finished video against its timeline without decoding it
+
+A render can exit cleanly and still be wrong: audio cut short, or a video
+stream that ends early so players freeze on its last frame. After every
+render the output is checked against the timeline it was made from:
+
+- Container, video and audio durations match the timeline (within
+  VERIFY_DURATION_TOLERANCE seconds)
+- The video has one packet per planned frame, at the planned size
+- The first packet is a keyframe and keyframes are at most
+  VERIFY_MAX_KEYFRAME_SECONDS apart (seeking, streaming)
+- Frames sampled either side of up to VERIFY_SAMPLE_TRANSITIONS image
+  changes differ (the picture keeps moving) and the last frame shows the
+  last image
+
+Everything but the samples comes from one ffprobe pass over the packets
+(demuxing only). Each sample is one small seek-and-decode, so a long video
+is verified in seconds.
+
+Usage:
+    python scripts/verify.py output/video.mp4 --frames 75,75,75 --fade 12
+    python scripts/verify.py output/video.mp4 --duration 150
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    VIDEO_FPS, VIDEO_WIDTH, VIDEO_HEIGHT, VERIFY_DURATION_TOLERANCE,
+    VERIFY_MAX_KEYFRAME_SECONDS, VERIFY_SAMPLE_TRANSITIONS
+)
+from scripts.tracing import run, traced
+
+SAMPLE_SIZE = (64, 36)  # Sampled frames are compared as tiny grey thumbnails
+UNCHANGED_DIFFERENCE = 0.5  # Mean absolute difference (0-255) below which two samples are the same frame
+
+
+class VerificationError(Exception):
+    pass
+
+
+def probe_packets(path: str) -> dict:
+    """Format, streams and every packet's (stream, pts, duration, flags) from one ffprobe pass."""
+    cmd = [
+        'ffprobe', '-v', 'error', '-of', 'json',
+        '-show_entries',
+        'format=duration:stream=index,codec_type,width,height:packet=stream_index,pts_time,duration_time,flags',
+        path
+    ]
+    result = run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise VerificationError(f"ffprobe could not read {path}: {result.stderr.strip()[:200]}")
+    return json.loads(result.stdout)
+
+
+def _stream_summary(packets: List[dict]) -> dict:
+    """Packet count, start, end and keyframe times of one stream's packets."""
+    times, end, keyframes = [], 0.0, []
+    for packet in packets:
+        if packet.get("pts_time") in (None, "N/A"):
+            continue
+        pts = float(packet["pts_time"])
+        times.append(pts)
+        end = max(end, pts + float(packet.get("duration_time") or 0))
+        if "K" in packet.get("flags", ""):
+            keyframes.append(pts)
+    return {
+        "packets": len(packets),
+        "start": min(times) if times else 0.0,
+        "end": end,
+        "first_is_key": bool(packets) and "K" in packets[0].get("flags", ""),
+        "keyframes": sorted(keyframes)
+    }
+
+
+def boundaries(frames: List[int], fade: int) -> List[int]:
+    """First frame of each image change (the start of its crossfade)."""
+    starts, position = [], 0
+    for count in frames[:-1]:
+        position += count - fade
+        starts.append(position)
+    return starts
+
+
+def sample_frame(path: str, frame: int, fps: int = VIDEO_FPS) -> bytes:
+    """One decoded frame as a tiny grey thumbnail (an input seek decodes from the previous keyframe only)."""
+    width, height = SAMPLE_SIZE
+    cmd = [
+        'ffmpeg', '-v', 'error', '-ss', f"{frame / fps:.3f}", '-i', path,
+        '-frames:v', '1', '-vf', f'scale={width}:{height},format=gray', '-f', 'rawvideo', 'pipe:1'
+    ]
+    data = run(cmd, capture_output=True).stdout
+    if len(data) != width * height:
+        raise VerificationError(f"Frame {frame} could not be decoded")
+    return data
+
+
+def difference(a: bytes, b: bytes) -> float:
+    """Mean absolute difference of two samples (0-255)."""
+    return sum(abs(x - y) for x, y in zip(a, b)) / len(a)
+
+
+def sample_points(frames: List[int], fade: int, sources: List[str] = None,
+                  limit: int = VERIFY_SAMPLE_TRANSITIONS) -> List[tuple]:
+    """
+    (before, after) frame pairs around up to limit image changes, spread
+    evenly; changes between two holds of the same source are skipped.
+    """
+    changes = []
+    for i, start in enumerate(boundaries(frames, fade), 1):
+        if sources and sources[i - 1] == sources[i]:
+            continue
+        changes.append((start - 1, start + fade))
+    if len(changes) > limit:
+        step = len(changes) / limit
+        picked = [changes[int(i * step)] for i in range(limit - 1)]
+        changes = picked + [changes[-1]]  # Always the last one, for the tail check
+    return changes
+
+
+@traced
+def verify_output(
+    path: str,
+    frames: List[int],
+    fade: int = 0,
+    fps: int = VIDEO_FPS,
+    width: int = VIDEO_WIDTH,
+    height: int = VIDEO_HEIGHT,
+    audio: bool = True,
+    sources: List[str] = None,
+    tolerance: float = VERIFY_DURATION_TOLERANCE,
+    max_keyframe_seconds: float = VERIFY_MAX_KEYFRAME_SECONDS,
+    samples: int = VERIFY_SAMPLE_TRANSITIONS
+) -> dict:
+    """
+    Check a rendered video against its timeline.
+
+    Args:
+        frames: Frames per image, as planned (see scripts/timeline.py)
+        fade: Crossfade length in frames (0 for cuts)
+        audio: Whether the video should have a soundtrack
+        sources: Image per clip, to skip repeated holds when sampling
+
+    Returns:
+        Dict with ok, problems (list of messages), duration, video and audio
+        ({packets, start, end}), max_keyframe_gap, sampled (frames decoded)
+        and seconds
+    """
+    started = time.time()
+    expected_frames = sum(frames) - max(0, len(frames) - 1) * fade
+    expected = expected_frames / fps
+    problems = []
+    info = probe_packets(path)
+
+    streams = {s["index"]: s for s in info.get("streams", [])}
+    by_type = {}
+    for packet in info.get("packets", []):
+        stream = streams.get(packet.get("stream_index"))
+        if stream:
+            by_type.setdefault(stream["codec_type"], []).append(packet)
+    video_stream = next((s for s in streams.values() if s["codec_type"] == "video"), None)
+
+    duration = float(info.get("format", {}).get("duration", 0))
+    if abs(duration - expected) > tolerance:
+        problems.append(f"Duration is {duration:.2f}s, the timeline is {expected:.2f}s")
+
+    video = _stream_summary(by_type.get("video", []))
+    if video_stream is None:
+        problems.append("No video stream")
+    else:
+        if (video_stream.get("width"), video_stream.get("height")) != (width, height):
+            problems.append(f"Video is {video_stream.get('width')}x{video_stream.get('height')}, "
+                            f"expected {width}x{height}")
+        if abs(video["packets"] - expected_frames) > 1:
+            problems.append(f"Video has {video['packets']} frames, the timeline has {expected_frames}")
+        if abs(video["end"] - expected) > tolerance:
+            problems.append(f"Video ends at {video['end']:.2f}s, the timeline at {expected:.2f}s "
+                            f"(players freeze on the last frame)")
+        if not video["first_is_key"]:
+            problems.append("First video frame is not a keyframe")
+
+    keyframes = video.pop("keyframes")
+    gaps = [b - a for a, b in zip(keyframes, keyframes[1:] + [video["end"]])]
+    max_gap = max(gaps) if gaps else video["end"]
+    if video_stream is not None and max_gap > max_keyframe_seconds:
+        problems.append(f"Keyframes up to {max_gap:.1f}s apart (limit {max_keyframe_seconds:g}s)")
+
+    audio_summary = None
+    if audio:
+        audio_summary = _stream_summary(by_type.get("audio", []))
+        audio_summary.pop("keyframes")
+        if not audio_summary["packets"]:
+            problems.append("No audio")
+        elif abs(audio_summary["end"] - expected) > tolerance:
+            problems.append(f"Audio ends at {audio_summary['end']:.2f}s, the timeline at {expected:.2f}s")
+
+    sampled = 0
+    if video_stream is not None and video["packets"]:
+        last = min(expected_frames, video["packets"]) - 1
+        pairs = sample_points(frames, fade, sources, samples)
+        wanted = sorted({n for pair in pairs for n in pair if 0 <= n <= last} | {last})
+        try:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                decoded = dict(zip(wanted, pool.map(lambda n: sample_frame(path, n, fps), wanted)))
+        except VerificationError as e:
+            problems.append(str(e))
+        else:
+            sampled = len(decoded)
+            for before, after in pairs:
+                if before in decoded and after in decoded and \
+                        difference(decoded[before], decoded[after]) < UNCHANGED_DIFFERENCE:
+                    problems.append(f"Picture doesn't change at {after / fps:.2f}s (frozen?)")
+            if pairs and pairs[-1][1] in decoded:
+                # The tail must show the last image, not an earlier one held over
+                before, after = pairs[-1]
+                if difference(decoded[last], decoded[after]) > difference(decoded[last], decoded[before]):
+                    problems.append("Last frame doesn't show the last image")
+
+    return {
+        "ok": not problems,
+        "problems": problems,
+        "duration": round(duration, 3),
+        "video": video,
+        "audio": audio_summary,
+        "max_keyframe_gap": round(max_gap, 2),
+        "sampled": sampled,
+        "seconds": round(time.time() - started, 2)
+    }
+
+
+def describe(result: dict) -> str:
+    """One line summary of a verification result."""
+    audio = f", audio {result['audio']['end']:.2f}s" if result["audio"] else ""
+    return (f"{result['duration']:.2f}s, {result['video']['packets']} frames{audio}, "
+            f"keyframes <= {result['max_keyframe_gap']:.1f}s apart, "
+            f"{result['sampled']} frames sampled ({result['seconds']:.1f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check a rendered video against its timeline")
+    parser.add_argument("video", help="Rendered video")
+    parser.add_argument("--frames", help="Comma separated frames per image (from the render plan)")
+    parser.add_argument("--duration", type=float, help="Expected length in seconds (one clip, no samples)")
+    parser.add_argument("--fade", type=int, default=0, help="Crossfade frames (default: 0)")
+    parser.add_argument("--fps", type=int, default=VIDEO_FPS)
+    parser.add_argument("--size", default=f"{VIDEO_WIDTH}x{VIDEO_HEIGHT}", help="Expected WIDTHxHEIGHT")
+    parser.add_argument("--no-audio", action="store_true", help="The video has no soundtrack")
+    args = parser.parse_args()
+
+    if args.frames:
+        frames = [int(f) for f in args.frames.split(",")]
+    elif args.duration:
+        frames = [round(args.duration * args.fps)]
+    else:
+        print("Error: Give --frames or --duration")
+        sys.exit(1)
+    width, height = (int(v) for v in args.size.lower().split("x"))
+
+    try:
+        result = verify_output(args.video, frames, args.fade, args.fps, width, height, not args.no_audio)
+    except VerificationError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(describe(result))
+    for problem in result["problems"]:
+        print(f"  FAILED: {problem}")
+    sys.exit(0 if result["ok"] else 1)
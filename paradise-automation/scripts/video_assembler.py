@@ -7,10 +7,44 @@ Features:
 - Background music (full volume)
 """
 import os
-import subprocess
+import sys
 import json
 from typing import List
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import RENDER_CACHE_DIR
+from scripts.archive import is_member, read_image
+from scripts.timeline import plan_timeline
+from scripts.render_settings import RenderSettings, DEFAULT_SETTINGS
+from scripts.animation import is_animated, animation_filter
+from scripts.tracing import run, traced
+from scripts.streaming import fragment_args, track_fragments
+
+KEN_BURNS_HEADROOM = 1.1  # Zoompan input size over the output's: room for the 4% zoom
+# A pooled rgb24 frame is converted once, before it is held, not per output frame
+RAW_WORKING_FILTER = "format=yuv420p,setsar=1"
+
+
+def blur_framing_filter(width: int, height: int) -> str:
+    """
+    Fit the image over a blurred, cropped copy of itself (FFmpeg filter, for
+    when the image pool can't do it once in Pillow). Blurs at quarter
+    resolution like the "blur" rendition (scripts/renditions.py).
+    """
+    bw, bh = max(2, width // 8 * 2), max(2, height // 8 * 2)
+    return (
+        f"split=2[frame_bg][frame_fg];"
+        f"[frame_bg]scale={bw}:{bh}:force_original_aspect_ratio=increase,"
+        f"crop={bw}:{bh},boxblur=8:2,scale={width}:{height},setsar=1[frame_bb];"
+        f"[frame_fg]scale={width}:{height}:force_original_aspect_ratio=decrease,setsar=1[frame_ff];"
+        f"[frame_bb][frame_ff]overlay=(W-w)/2:(H-h)/2"
+    )
+
+
+def ken_burns_size(width: int, height: int) -> tuple:
+    """Zoompan input size for a width x height output (even, for yuv420p)."""
+    return tuple(int(round(v * KEN_BURNS_HEADROOM / 2)) * 2 for v in (width, height))
+
 
 def get_audio_duration(audio_path: str) -> float:
     """Get duration of audio file in seconds using ffprobe."""
@@ -18,7 +52,7 @@ def get_audio_duration(audio_path: str) -> float:
         'ffprobe', '-v', 'quiet', '-print_format', 'json',
         '-show_format', '-show_streams', audio_path
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run(cmd, capture_output=True, text=True)
     data = json.loads(result.stdout)
     return float(data['format']['duration'])
 
@@ -29,139 +63,199 @@ def get_video_duration(video_path: str) -> float:
         'ffprobe', '-v', 'quiet', '-print_format', 'json',
         '-show_format', video_path
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run(cmd, capture_output=True, text=True)
     data = json.loads(result.stdout)
     return float(data['format']['duration'])
 
 
-def create_image_clip(
+def image_clip_command(
     image_path: str,
     duration: float,
     output_path: str,
     width: int = 1920,
     height: int = 1080,
-    ken_burns: bool = True
-) -> str:
+    ken_burns: bool = True,
+    still_path: str = None,
+    video_args: List[str] = None,
+    audio: bool = True,
+    fitted: bool = False,
+    raw_size: tuple = None,
+    framing: str = DEFAULT_SETTINGS.framing,
+    fps: int = DEFAULT_SETTINGS.fps,
+    animation: dict = None
+) -> List[str]:
     """
-    Create video clip from a single image with Ken Burns effect.
+    FFmpeg command for create_image_clip (see there). A zip member is read
+    from stdin. audio=False leaves out the silent audio track; fitted=True
+    skips the scale/pad of a source that is already width x height.
+    raw_size=(w, h) reads image_path as an already decoded rgb24 working
+    frame (see working_frame() and scripts/image_pool.py).
+    framing="blur" fits the image over a blurred copy of itself instead of
+    stretching it (Ken Burns) or letterboxing it (see config.FRAMING).
+    animation (a pooled frame set plus "timing", see scripts/animation.py)
+    plays an animated source instead of holding one frame.
     """
-    fps = 25
+    video_args = video_args or DEFAULT_SETTINGS.encoder_args()
     total_frames = int(duration * fps)
+    if animation:
+        raw_size, fitted = None, False
+
+    # The image is decoded and scaled once: zoompan makes all of a Ken
+    # Burns clip's frames from that one frame, and a static clip repeats it
+    # with the loop filter (-loop 1 would re-read and re-decode the file for
+    # every output frame)
+    image_input = ['-i', image_path]
+    if raw_size:
+        image_input = [
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{raw_size[0]}x{raw_size[1]}', '-i', image_path
+        ]
+    elif is_member(image_path):
+        image_input = ['-f', 'image2pipe', '-i', 'pipe:0']
+    source_filter = ""
+    if animation:
+        # The frame set is read once; the loop filter replays it from memory
+        image_input = [
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f"{animation['width']}x{animation['height']}",
+            '-i', animation['path']
+        ]
+        source_filter = animation_filter(animation["durations"], duration, fps, animation["timing"]) + ","
+
+    audio_input = ['-f', 'lavfi', '-i', 'anullsrc=r=44100:cl=stereo'] if audio else []
+    audio_args = ['-c:a', 'aac'] if audio else ['-an']
 
     if ken_burns and total_frames > 0:
         # Ken Burns: 4% zoom over duration
         zoom_increment = 0.04 / total_frames
 
-        filter_complex = (
-            f"scale=2112:1188,setsar=1,"
+        if raw_size:
+            working_filter = RAW_WORKING_FILTER
+        elif framing == "blur":
+            working_filter = source_filter + blur_framing_filter(*ken_burns_size(width, height)) + ",setsar=1"
+        else:
+            working_filter = source_filter + "scale={}:{},setsar=1".format(*ken_burns_size(width, height))
+        # One output frame per input frame of an animation, all of them from a still
+        effect_filter = (
             f"zoompan=z='1+{zoom_increment}*in':x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':"
-            f"d={total_frames}:s={width}x{height}:fps={fps}"
+            f"d={1 if animation else total_frames}:s={width}x{height}:fps={fps}"
         )
+        filter_complex = f"{working_filter},{effect_filter}"
 
         cmd = [
             'ffmpeg', '-y',
-            '-loop', '1',
-            '-i', image_path,
-            '-f', 'lavfi',
-            '-i', 'anullsrc=r=44100:cl=stereo',
+            *image_input,
+            *audio_input,
             '-vf', filter_complex,
-            '-c:v', 'libx264',
-            '-preset', 'medium',
-            '-crf', '23',
-            '-c:a', 'aac',
+            *video_args,
+            *audio_args,
             '-pix_fmt', 'yuv420p',
             '-t', str(duration),
             output_path
         ]
     else:
+        if raw_size:
+            working_filter = RAW_WORKING_FILTER
+        elif fitted:
+            working_filter = 'setsar=1'
+        elif framing == "blur":
+            working_filter = source_filter + blur_framing_filter(width, height) + ',setsar=1'
+        else:
+            working_filter = source_filter + f'scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2'
+        effect_filter = 'null' if animation else 'loop=loop=-1:size=1'
         cmd = [
             'ffmpeg', '-y',
-            '-loop', '1',
-            '-i', image_path,
-            '-f', 'lavfi',
-            '-i', 'anullsrc=r=44100:cl=stereo',
-            '-vf', f'scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2',
-            '-c:v', 'libx264',
-            '-tune', 'stillimage',
-            '-c:a', 'aac',
+            *image_input,
+            *audio_input,
+            '-vf', f"{working_filter},{effect_filter}",
+            *video_args,
+            *([] if animation else ['-tune', 'stillimage']),
+            *audio_args,
             '-pix_fmt', 'yuv420p',
             '-t', str(duration),
             output_path
         ]
 
-    subprocess.run(cmd, check=True, capture_output=True)
-    return output_path
+    if still_path:
+        # Split after scaling: one branch feeds the clip, one frame of the
+        # other is saved as the still (the loop stays on the clip branch)
+        vf_index = cmd.index('-vf')
+        cmd[vf_index:vf_index + 2] = [
+            '-filter_complex',
+            f"[0:v]{working_filter},split=2[clip][still];[clip]{effect_filter}[v]",
+            '-map', '[v]',
+            *(['-map', '1:a'] if audio else [])
+        ]
+        cmd += ['-map', '[still]', '-frames:v', '1', '-q:v', '3', still_path]
 
+    return cmd
 
-def concatenate_with_crossfade(
-    video_files: List[str],
-    output_path: str,
-    crossfade_duration: float = 0.5
-) -> str:
-    """Concatenate videos with crossfade transitions between them."""
-
-    if len(video_files) < 2:
-        if video_files:
-            import shutil
-            shutil.copy(video_files[0], output_path)
-        return output_path
-
-    # Build xfade filter chain
-    n = len(video_files)
-    inputs = []
-    for f in video_files:
-        inputs.extend(['-i', f])
-
-    # Get durations
-    durations = [get_video_duration(f) for f in video_files]
-
-    # Build filter: chain of xfade filters
-    filter_parts = []
-    offset = durations[0] - crossfade_duration
-
-    # First xfade
-    filter_parts.append(
-        f"[0:v][1:v]xfade=transition=fade:duration={crossfade_duration}:offset={offset}[v1];"
-        f"[0:a][1:a]acrossfade=d={crossfade_duration}[a1]"
-    )
 
-    # Chain remaining xfades
-    for i in range(2, n):
-        offset += durations[i-1] - crossfade_duration
-        prev_v = f"v{i-1}"
-        prev_a = f"a{i-1}"
-        out_v = f"v{i}"
-        out_a = f"a{i}"
-
-        filter_parts.append(
-            f"[{prev_v}][{i}:v]xfade=transition=fade:duration={crossfade_duration}:offset={offset}[{out_v}];"
-            f"[{prev_a}][{i}:a]acrossfade=d={crossfade_duration}[{out_a}]"
-        )
+def working_frame(width: int, height: int, ken_burns: bool, framing: str = DEFAULT_SETTINGS.framing) -> tuple:
+    """(width, height, pool mode) of the decoded frame a clip starts from (a still's)."""
+    if ken_burns:
+        return (*ken_burns_size(width, height), "blur" if framing == "blur" else "fill")
+    return width, height, "blur" if framing == "blur" else "fit"
 
-    filter_str = ';'.join(filter_parts)
-    final_v = f"v{n-1}"
-    final_a = f"a{n-1}"
-
-    cmd = ['ffmpeg', '-y'] + inputs + [
-        '-filter_complex', filter_str,
-        '-map', f'[{final_v}]',
-        '-map', f'[{final_a}]',
-        '-c:v', 'libx264',
-        '-preset', 'medium',
-        '-c:a', 'aac',
-        '-b:a', '128k',
-        output_path
-    ]
 
-    try:
-        subprocess.run(cmd, check=True, capture_output=True)
-    except subprocess.CalledProcessError as e:
-        print(f"  Crossfade failed, using simple concat: {e}")
-        concatenate_videos(video_files, output_path)
+@traced
+def create_image_clip(
+    image_path: str,
+    duration: float,
+    output_path: str,
+    width: int = None,
+    height: int = None,
+    ken_burns: bool = None,
+    still_path: str = None,
+    video_args: List[str] = None,
+    framing: str = None,
+    settings: RenderSettings = None
+) -> str:
+    """
+    Create video clip from a single image with Ken Burns effect.
 
+    If still_path is given, the scaled working-resolution frame is also
+    written there as a JPEG from the same decode (used for thumbnails).
+    video_args replaces the encoder arguments. Size, effect, framing, frame
+    rate and encoder come from settings (default: config.py) unless given.
+    Zip members ("<archive>::<member>") are piped to FFmpeg from memory.
+    With the image pool (scripts/image_pool.py) FFmpeg reads the decoded
+    working frame from the pool instead, so the photo is decoded once per
+    host; an animated GIF/WebP plays from its pooled frame set (see
+    scripts/animation.py).
+    """
+    from scripts import image_pool
+    settings = settings or DEFAULT_SETTINGS
+    width = settings.width if width is None else width
+    height = settings.height if height is None else height
+    ken_burns = settings.ken_burns if ken_burns is None else ken_burns
+    framing = framing or settings.framing
+    video_args = video_args or settings.encoder_args()
+    if image_pool.available() and is_animated(image_path):
+        frame_width, frame_height, _ = working_frame(width, height, ken_burns, framing)
+        animation = image_pool.default_pool().animation(image_path, frame_width, frame_height)
+        cmd = image_clip_command(
+            image_path, duration, output_path, width, height, ken_burns, still_path, video_args,
+            framing=framing, fps=settings.fps, animation=dict(animation, timing=settings.animation_timing)
+        )
+        image_data = None
+    elif image_pool.available():
+        frame_width, frame_height, mode = working_frame(width, height, ken_burns, framing)
+        frame_path = image_pool.default_pool().acquire(image_path, frame_width, frame_height, mode)
+        cmd = image_clip_command(
+            frame_path, duration, output_path, width, height, ken_burns, still_path, video_args,
+            raw_size=(frame_width, frame_height), framing=framing, fps=settings.fps
+        )
+        image_data = None
+    else:
+        cmd = image_clip_command(
+            image_path, duration, output_path, width, height, ken_burns, still_path, video_args,
+            framing=framing, fps=settings.fps
+        )
+        image_data = read_image(image_path) if is_member(image_path) else None
+    run(cmd, input=image_data, check=True, capture_output=True)
     return output_path
 
 
+@traced
 def concatenate_videos(video_files: List[str], output_path: str) -> str:
     """Simple concatenation without effects."""
     list_file = output_path + '.txt'
@@ -178,69 +272,77 @@ def concatenate_videos(video_files: List[str], output_path: str) -> str:
         output_path
     ]
 
-    subprocess.run(cmd, check=True, capture_output=True)
+    run(cmd, check=True, capture_output=True)
     os.remove(list_file)
     return output_path
 
 
+def music_filter(duration: float, music_volume: float = 1.0) -> str:
+    """Audio filter chain for the music bed: volume, 2s fade in, 3s fade out."""
+    fade_out_start = max(0, duration - 3)
+    return f'volume={music_volume},afade=t=in:d=2,afade=t=out:st={fade_out_start}:d=3'
+
+
+@traced
 def add_background_music(
     video_path: str,
     music_path: str,
     output_path: str,
-    music_volume: float = 1.0
+    music_volume: float = 1.0,
+    music_start: float = 0.0,
+    stream: bool = False,
+    settings: RenderSettings = None
 ) -> str:
     """
-    Replace video audio with background music.
+    Replace video audio with background music (audio codec and bitrate
+    from settings).
     Music is looped if shorter than video.
     Fades in at start and out at end.
+    music_start skips the track's intro (input seek, no re-encode).
+    stream writes fragmented MP4 with a fragment manifest (scripts/streaming.py).
     """
     duration = get_video_duration(video_path)
-    fade_out_start = max(0, duration - 3)
 
     cmd = [
         'ffmpeg', '-y',
         '-i', video_path,
+        *(['-ss', str(music_start)] if music_start else []),
         '-stream_loop', '-1',
         '-i', music_path,
         '-filter_complex',
-        f'[1:a]volume={music_volume},afade=t=in:d=2,afade=t=out:st={fade_out_start}:d=3[music]',
+        f'[1:a]{music_filter(duration, music_volume)}[music]',
         '-map', '0:v',
         '-map', '[music]',
         '-c:v', 'copy',
-        '-c:a', 'aac',
-        '-b:a', '192k',
+        '-c:a', (settings or DEFAULT_SETTINGS).audio_codec,
+        '-b:a', (settings or DEFAULT_SETTINGS).audio_bitrate,
         '-shortest',
+        *(fragment_args() if stream else []),
         output_path
     ]
 
-    subprocess.run(cmd, check=True, capture_output=True)
+    if stream:
+        with track_fragments(output_path):
+            run(cmd, check=True, capture_output=True)
+    else:
+        run(cmd, check=True, capture_output=True)
     return output_path
 
 
-def assemble_slideshow(
-    images: List[str],
-    music_path: str,
-    output_path: str,
-    temp_dir: str,
-    width: int = 1920,
-    height: int = 1080,
-    ken_burns: bool = True,
-    crossfade: bool = True,
-    crossfade_duration: float = 0.5,
-    music_volume: float = 1.0
-) -> str:
-    """
-    Assemble complete slideshow video from images with music.
-
-    Duration per image is calculated from music duration / number of images.
-    """
-    os.makedirs(temp_dir, exist_ok=True)
+def still_path(stills_dir: str, index: int) -> str:
+    """Path of the working-resolution still for image number index."""
+    return os.path.join(stills_dir, f"still_{index:04d}.jpg")
 
-    # Get music duration
-    music_duration = get_audio_duration(music_path)
 
+def calculate_image_duration(
+    music_duration: float,
+    num_images: int,
+    crossfade: bool = True,
+    crossfade_duration: float = 0.5,
+    settings: RenderSettings = None
+) -> float:
+    """Seconds per image so the slideshow fills the music, clamped to settings' min/max."""
     # Calculate duration per image (accounting for crossfades)
-    num_images = len(images)
     if crossfade and num_images > 1:
         # Crossfades reduce total duration
         total_crossfade_time = crossfade_duration * (num_images - 1)
@@ -251,42 +353,144 @@ def assemble_slideshow(
     duration_per_image = available_duration / num_images
 
     # Clamp to min/max
-    from config import MIN_IMAGE_DURATION, MAX_IMAGE_DURATION
-    duration_per_image = max(MIN_IMAGE_DURATION, min(MAX_IMAGE_DURATION, duration_per_image))
-
-    print(f"Music duration: {music_duration:.1f}s")
-    print(f"Images: {num_images}")
-    print(f"Duration per image: {duration_per_image:.1f}s")
-
-    # Create individual clips
-    video_clips = []
-    for i, image in enumerate(images):
-        clip_path = os.path.join(temp_dir, f"clip_{i:03d}.mp4")
-        print(f"  Creating clip {i+1}/{num_images}...")
-        create_image_clip(image, duration_per_image, clip_path, width, height, ken_burns)
-        video_clips.append(clip_path)
-
-    # Concatenate clips
-    print("Concatenating clips...")
-    silent_video = os.path.join(temp_dir, "silent_video.mp4")
-    if crossfade and len(video_clips) > 1:
-        try:
-            concatenate_with_crossfade(video_clips, silent_video, crossfade_duration)
-        except Exception as e:
-            print(f"  Crossfade failed: {e}")
-            concatenate_videos(video_clips, silent_video)
+    settings = settings or DEFAULT_SETTINGS
+    return max(settings.min_image_duration, min(settings.max_image_duration, duration_per_image))
+
+
+@traced
+def assemble_slideshow(
+    images: List[str],
+    music_path: str,
+    output_path: str,
+    temp_dir: str,
+    width: int = None,
+    height: int = None,
+    ken_burns: bool = None,
+    crossfade: bool = None,
+    crossfade_duration: float = None,
+    music_volume: float = 1.0,
+    renditions: dict = None,
+    workers: int = 0,
+    spool_dir: str = None,
+    stills_dir: str = None,
+    durations: List[float] = None,
+    timeline_policy: str = None,
+    plan_path: str = None,
+    music_start: float = 0.0,
+    stream: bool = False,
+    beat_sync: bool = False,
+    settings: RenderSettings = None
+) -> str:
+    """
+    Assemble complete slideshow video from images with music.
+
+    Everything the render is configured with comes from settings (see
+    scripts/render_settings.py; default: config.py). width, height,
+    ken_burns, crossfade, crossfade_duration and timeline_policy override
+    it when given.
+
+    Images and durations are planned against the music length (see
+    scripts/timeline.py and timeline_policy), with image changes on the
+    beat if beat_sync is set, unless durations is given, in which case
+    images is rendered as is.
+
+    If renditions is given (name -> spec, see config.RENDITIONS), the timeline
+    is rendered once and every rendition is written from it in a single
+    FFmpeg pass, named <output>_<name>.mp4.
+
+    If workers or spool_dir is given, the timeline is split into segments
+    rendered by worker processes (see scripts/segment_render.py).
+
+    If stills_dir is given, the working-resolution frame of every image is
+    kept there as still_NNNN.jpg for thumbnail selection.
+
+    Otherwise the slideshow is described as a render plan and compiled (see
+    scripts/render_plan.py); steps cached by an earlier render are reused.
+    If plan_path is given, the plan is compared with the one saved there by
+    the last render and then replaces it.
+
+    music_start skips the track's intro (see scripts/audio_analysis.py).
+
+    stream writes output_path as fragmented MP4 while it renders, with a
+    manifest of finished fragments for uploads (see scripts/streaming.py);
+    not with renditions.
+    """
+    overrides = {
+        "width": width, "height": height, "ken_burns": ken_burns, "crossfade": crossfade,
+        "crossfade_duration": crossfade_duration, "timeline_policy": timeline_policy
+    }
+    settings = (settings or DEFAULT_SETTINGS).replace(
+        **{name: value for name, value in overrides.items() if value is not None}
+    )
+    width, height = settings.width, settings.height
+    ken_burns, crossfade, crossfade_duration = settings.ken_burns, settings.crossfade, settings.crossfade_duration
+
+    os.makedirs(temp_dir, exist_ok=True)
+    if stills_dir:
+        os.makedirs(stills_dir, exist_ok=True)
+
+    if durations is None:
+        # Get music duration
+        music_duration = get_audio_duration(music_path) - music_start
+        plan = plan_timeline(
+            images, music_duration, settings.timeline_policy, crossfade, crossfade_duration,
+            settings.fps, settings.min_image_duration, settings.max_image_duration
+        )
+        if beat_sync:
+            from scripts.music_catalog import beat_grid
+            from scripts.timeline import snap_to_beats
+            plan = snap_to_beats(
+                plan, beat_grid(music_path)[1], music_start,
+                settings.fps, settings.min_image_duration, settings.max_image_duration
+            )
+            print(f"Beat sync: {plan['snapped']} image changes on the beat")
+        images, durations = plan["images"], plan["durations"]
+        print(f"Music duration: {music_duration:.1f}s")
+
+    print(f"Images: {len(images)}")
+    print(f"Duration per image: {min(durations):.2f}-{max(durations):.2f}s")
+
+    if workers or spool_dir:
+        from scripts.segment_render import render_segmented
+        silent_video = render_segmented(
+            images, durations, temp_dir, width, height,
+            ken_burns, crossfade, crossfade_duration, workers, spool_dir,
+            stills_dir=stills_dir, settings=settings
+        )
     else:
-        concatenate_videos(video_clips, silent_video)
+        from scripts.render_plan import build_plan, render_plan
+        plan = build_plan(
+            images, durations, width, height, ken_burns, crossfade, crossfade_duration,
+            music_path, music_volume, audio_bitrate=settings.audio_bitrate,
+            encoder=settings.encoder_args(), fps=settings.fps, music_start=music_start,
+            framing=settings.framing, audio_codec=settings.audio_codec,
+            animation_timing=settings.animation_timing
+        )
+        if not renditions:
+            # The plan's last step muxes the music into output_path
+            print("Rendering plan...")
+            render_plan(plan, RENDER_CACHE_DIR, output_path, stills_dir, plan_path, stream)
+            print(f"Video saved to: {output_path}")
+            return output_path
+        silent_video = render_plan(plan, RENDER_CACHE_DIR, stills_dir=stills_dir, plan_path=plan_path)
 
     # Add music
-    print("Adding music...")
-    add_background_music(silent_video, music_path, output_path, music_volume)
-
-    # Cleanup
-    for clip in video_clips:
-        if os.path.exists(clip):
-            os.remove(clip)
-    if os.path.exists(silent_video):
+    if renditions:
+        print(f"Adding music and writing {len(renditions)} renditions...")
+        from scripts.renditions import render_renditions
+        outputs = render_renditions(
+            silent_video, music_path, output_path, renditions, music_volume, music_start, settings
+        )
+        for name, path in outputs.items():
+            print(f"  {name}: {path}")
+    else:
+        print("Adding music...")
+        add_background_music(
+            silent_video, music_path, output_path, music_volume, music_start, stream, settings
+        )
+
+    # A render plan's silent video stays in the cache for the next render
+    if (workers or spool_dir) and os.path.exists(silent_video):
         os.remove(silent_video)
 
     print(f"Video saved to: {output_path}")
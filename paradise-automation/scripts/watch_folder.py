@@ -0,0 +1,258 @@
+"""
+Watch Folder - Re-render only what changed when images are edited
+
+The timeline is cut into one piece per image (see segment_render.py with a
+segment size of 1): the image's clip plus its crossfade into the next image.
+Each piece is cached under a key built from everything that affects its
+pixels - the image and next image (path, size, mtime), frame counts, trims,
+resolution, effects and encoder settings.
+
+When the folder changes, only pieces whose key changed are rendered:
+replacing one photo re-renders its own piece and the previous piece (whose
+transition fades into it). All pieces are then spliced with stream copy and
+the music is muxed again.
+
+The per-image duration is locked on the first render so adding or removing
+images does not change every other piece (the music loops or is cut to the
+new length). Use relock to recompute it from the music.
+
+Pieces get their own cache here rather than going through the render plan
+(scripts/render_plan.py): the plan crossfades all clips in one encode, so
+any edit would re-encode the whole video, while pieces are joined with
+stream copy and an edit only re-encodes the pieces around it.
+
+The folder is polled; a change is picked up once two polls agree, so files
+still being copied are not rendered half-written. A change to the music,
+its trim or volume, or the render settings re-renders too. A render that
+fails (an unreadable image, FFmpeg erroring) is logged and tried again
+once the folder changes; the watcher keeps running.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import TEMP_DIR, SUPPORTED_IMAGE_FORMATS, WATCH_POLL_INTERVAL
+from scripts.image_loader import load_images_from_folder
+from scripts.segment_render import plan_segments, render_segment
+from scripts.video_assembler import (
+    get_audio_duration, calculate_image_duration, concatenate_videos, add_background_music
+)
+from scripts.render_settings import RenderSettings, DEFAULT_SETTINGS
+
+
+def file_signature(path: str) -> list:
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def folder_signature(folder: str) -> dict:
+    """{filename: [size, mtime_ns]} for every image in the folder."""
+    signature = {}
+    for entry in os.scandir(folder):
+        if entry.is_file() and entry.name.lower().endswith(SUPPORTED_IMAGE_FORMATS):
+            stat = entry.stat()
+            signature[entry.name] = [stat.st_size, stat.st_mtime_ns]
+    return signature
+
+
+def piece_key(spec: dict, job: dict) -> str:
+    """Cache key covering everything that changes a piece's pixels."""
+    payload = {
+        "images": [os.path.abspath(p) for p in spec["images"]],
+        "sigs": [file_signature(p) for p in spec["images"]],
+        "frames": spec["frames"],
+        "fade": spec["fade"],
+        "start_frame": spec["start_frame"],
+        "end_frame": spec["end_frame"],
+        "job": job
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:20]
+
+
+def render_digest(settings: RenderSettings, music_start: float, music_end: float, music_volume: float) -> str:
+    """Hash of everything besides the images and music file that changes the output."""
+    payload = [settings.to_dict(), music_start, music_end, music_volume]
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:20]
+
+
+def load_state(state_dir: str) -> dict:
+    path = os.path.join(state_dir, "plan.json")
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state_dir: str, state: dict):
+    path = os.path.join(state_dir, "plan.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def describe_changes(old: dict, new: dict) -> str:
+    added = [n for n in new if n not in old]
+    removed = [n for n in old if n not in new]
+    replaced = [n for n in new if n in old and old[n] != new[n]]
+    parts = []
+    if added:
+        parts.append(f"{len(added)} added")
+    if removed:
+        parts.append(f"{len(removed)} removed")
+    if replaced:
+        parts.append(f"{len(replaced)} replaced")
+    return ", ".join(parts) or "no changes"
+
+
+def render_incremental(
+    images: List[str],
+    duration_per_image: float,
+    music_path: str,
+    output_path: str,
+    state_dir: str,
+    music_volume: float = 1.0,
+    max_workers: int = 2,
+    music_start: float = 0.0,
+    settings: RenderSettings = None
+) -> dict:
+    """
+    Render the slideshow, reusing cached pieces. Returns render stats.
+    Size, effects, frame rate and encoders come from settings (default:
+    config.py); they are part of every piece's key.
+    """
+    settings = settings or DEFAULT_SETTINGS
+    pieces_dir = os.path.join(state_dir, "pieces")
+    os.makedirs(pieces_dir, exist_ok=True)
+
+    job = {"settings": settings.to_dict()}
+    specs = plan_segments(
+        images, [duration_per_image] * len(images), 1, settings.crossfade,
+        settings.crossfade_duration, settings.fps
+    )
+
+    pieces = []
+    todo = []
+    for spec in specs:
+        piece = os.path.join(pieces_dir, f"{piece_key(spec, job)}.mp4")
+        pieces.append(piece)
+        if not os.path.exists(piece):
+            todo.append((spec, piece))
+
+    def render(item):
+        spec, piece = item
+        work_dir = os.path.join(state_dir, "work", os.path.basename(piece)[:-4])
+        partial = os.path.join(work_dir, "piece.mp4")
+        render_segment(spec, job, partial, work_dir)
+        os.replace(partial, piece)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if todo:
+        print(f"  Rendering {len(todo)} of {len(specs)} pieces...")
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(render, todo))
+
+    print("  Splicing pieces...")
+    silent_video = os.path.join(state_dir, "silent_video.mp4")
+    concatenate_videos(pieces, silent_video)
+    add_background_music(silent_video, music_path, output_path, music_volume, music_start, settings=settings)
+    os.remove(silent_video)
+
+    # Drop pieces no longer in the timeline
+    keep = {os.path.basename(p) for p in pieces}
+    for name in os.listdir(pieces_dir):
+        if name not in keep:
+            os.remove(os.path.join(pieces_dir, name))
+
+    return {"rendered": len(todo), "reused": len(specs) - len(todo)}
+
+
+def watch_folder(
+    images_folder: str,
+    music_path: str,
+    output_path: str,
+    sort_by: str = "date_modified",
+    music_volume: float = 1.0,
+    interval: float = WATCH_POLL_INTERVAL,
+    relock: bool = False,
+    once: bool = False,
+    music_start: float = 0.0,
+    music_end: float = None,
+    settings: RenderSettings = None
+):
+    """
+    Render the folder, then re-render incrementally whenever it changes.
+
+    Runs until interrupted (Ctrl+C), or renders once if once=True.
+    music_start/music_end trim the track (default: all of it). Every
+    render uses settings (default: config.py).
+    """
+    settings = settings or DEFAULT_SETTINGS
+    if sort_by == "random":
+        print("  Random order would reshuffle every piece; watching with filename order")
+        sort_by = "filename"
+
+    folder_name = os.path.basename(os.path.normpath(images_folder))
+    state_dir = os.path.join(TEMP_DIR, f"watch_{folder_name}")
+    os.makedirs(state_dir, exist_ok=True)
+    state = load_state(state_dir)
+
+    wanted = {
+        "music": music_path,
+        "render": render_digest(settings, music_start, music_end, music_volume)
+    }
+    last_seen = None
+    failed = None
+    while True:
+        signature = folder_signature(images_folder)
+        wanted["folder"] = signature
+        changed = any(state.get(key) != value for key, value in wanted.items())
+        # Wait for two identical polls so copies in progress settle; a
+        # failed render waits for the folder to change again
+        if signature == last_seen and changed and signature != failed:
+            print(f"\nChange detected: {describe_changes(state.get('folder', {}), signature)}")
+            try:
+                images = load_images_from_folder(images_folder, sort_by)
+                if not images:
+                    raise ValueError(f"No images in {images_folder}")
+
+                duration = state.get("duration_per_image")
+                if duration is None or relock:
+                    music_length = (music_end or get_audio_duration(music_path)) - music_start
+                    duration = calculate_image_duration(
+                        music_length, len(images), settings.crossfade, settings.crossfade_duration, settings
+                    )
+                print(f"  {len(images)} images at {duration:.2f}s each")
+
+                start = time.time()
+                stats = render_incremental(
+                    images, duration, music_path, output_path, state_dir, music_volume,
+                    music_start=music_start, settings=settings
+                )
+            except Exception as e:
+                if once:
+                    raise
+                failed = signature
+                print(f"  ERROR: Render failed, retrying when the folder changes: {e}")
+            else:
+                print(f"  Done in {time.time() - start:.1f}s "
+                      f"({stats['rendered']} rendered, {stats['reused']} reused): {output_path}")
+
+                state = dict(wanted, duration_per_image=duration)
+                save_state(state_dir, state)
+                relock = False
+                failed = None
+                if once:
+                    return
+
+        elif once and not changed:
+            print("  No changes since last render")
+            return
+
+        last_seen = signature
+        time.sleep(interval if not once else 0)
@@ -16,6 +16,7 @@ from typing import Optional
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import YOUTUBE_MUSIC_DIR
+from scripts.tracing import run
 
 
 def get_video_id(url: str) -> str:
@@ -58,6 +59,7 @@ def extract_audio(
 
     if os.path.exists(cached_path):
         print(f"Using cached audio: {cached_path}")
+        os.utime(cached_path)  # recently used, for the storage budget
         if output_path and output_path != cached_path:
             import shutil
             shutil.copy(cached_path, output_path)
@@ -83,7 +85,7 @@ def extract_audio(
     ]
 
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        result = run(cmd, capture_output=True, text=True, timeout=300)
 
         if result.returncode != 0:
             print(f"yt-dlp error: {result.stderr}")
@@ -106,7 +108,7 @@ def extract_audio(
                 '-b:a', '192k',
                 cached_path
             ]
-            trim_result = subprocess.run(trim_cmd, capture_output=True, text=True)
+            trim_result = run(trim_cmd, capture_output=True, text=True)
             if trim_result.returncode != 0:
                 print(f"  Trim failed: {trim_result.stderr}")
                 # Fallback: use untrimmed
@@ -148,7 +150,7 @@ def get_video_info(youtube_url: str) -> Optional[dict]:
     ]
 
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        result = run(cmd, capture_output=True, text=True, timeout=60)
         if result.returncode == 0:
             import json
             return json.loads(result.stdout)
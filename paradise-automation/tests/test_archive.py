@@ -0,0 +1,35 @@
+import os
+import zipfile
+
+from scripts.archive import is_member, list_archive_images, member_ref, read_image, split_ref
+
+
+def _zip(tmp_path):
+    path = tmp_path / "images.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, date in (("b.jpg", (2024, 1, 1, 0, 0, 0)), ("a/a.jpg", (2024, 6, 1, 0, 0, 0)),
+                           ("__MACOSX/._b.jpg", (2024, 1, 1, 0, 0, 0)), ("notes.txt", (2024, 1, 1, 0, 0, 0))):
+            archive.writestr(zipfile.ZipInfo(name, date), name.encode())
+    return str(path)
+
+
+def test_members_are_listed_with_their_dates(tmp_path):
+    archive = _zip(tmp_path)
+    refs = sorted(list_archive_images(archive), key=lambda m: m[1])
+
+    assert [split_ref(ref)[1] for ref, _ in refs] == ["b.jpg", "a/a.jpg"]
+    assert refs[0][0] == member_ref(archive, "b.jpg")
+    assert read_image(refs[1][0]) == b"a/a.jpg"
+
+
+def test_only_refs_into_a_zip_are_members(tmp_path):
+    archive = _zip(tmp_path)
+    folder = tmp_path / "shots::2024"
+    folder.mkdir()
+    photo = folder / "a.jpg"
+    photo.write_bytes(b"jpeg")
+
+    assert is_member(member_ref(archive, "b.jpg"))
+    assert not is_member(str(photo))
+    assert read_image(str(photo)) == b"jpeg"
+    assert not is_member(os.path.join(str(tmp_path), "missing.zip::b.jpg"))
@@ -0,0 +1,42 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from scripts.audio_analysis import SAMPLE_RATE, HOP, FRAME, estimate_tempo, track_beats  # noqa: E402
+
+FPS = SAMPLE_RATE / HOP  # Flux frames per second
+
+
+def _pulse(bpm, seconds=60.0, offset=0.3):
+    """Flux with an onset on every beat, and the beat times they map to."""
+    flux = np.zeros(int(seconds * FPS))
+    frames = []
+    for k in range(int((seconds - offset - 0.1) * bpm / 60) + 1):
+        frame = int(round((offset + k * 60 / bpm) * FPS))
+        flux[frame] = 1.0
+        frames.append(frame)
+    return flux, [(f * HOP + FRAME / 2) / SAMPLE_RATE for f in frames]
+
+
+@pytest.mark.parametrize("bpm", [90, 120, 150])
+def test_tempo_of_a_steady_pulse(bpm):
+    flux, _ = _pulse(bpm)
+
+    assert estimate_tempo(flux) == pytest.approx(bpm, abs=2)
+
+
+def test_beats_land_on_the_onsets():
+    flux, expected = _pulse(120)
+
+    beats = track_beats(flux, estimate_tempo(flux))
+
+    assert len(beats) == len(expected)
+    assert all(min(abs(b - e) for e in expected) <= 1 / FPS for b in beats)
+    assert np.diff(beats) == pytest.approx(0.5, abs=2 / FPS)
+
+
+def test_silence_has_no_tempo_or_beats():
+    flux = np.zeros(int(30 * FPS))
+
+    assert estimate_tempo(flux) is None
+    assert track_beats(flux, None) == []
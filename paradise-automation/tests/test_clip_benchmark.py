@@ -0,0 +1,13 @@
+from scripts.clip_benchmark import clip_command
+
+
+def test_loop_baseline_rereads_the_input():
+    for ken_burns in (True, False):
+        loop = clip_command("loop", "photo.jpg", "out.mp4", 2.0, ken_burns)
+        once = clip_command("once", "photo.jpg", "out.mp4", 2.0, ken_burns)
+        assert loop[loop.index('-i') - 2:loop.index('-i')] == ['-loop', '1']
+        assert '-loop' not in once
+        assert "loop=loop" not in loop[loop.index('-vf') + 1]
+        assert loop[-1] == once[-1] == "out.mp4"
+    loop = clip_command("loop", "photo.jpg", "out.mp4", 2.0, True)
+    assert "d=50:" in loop[loop.index('-vf') + 1]  # The zoom spans the whole clip
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from scripts.dedup import _bands, _popcount, compute_hashes, find_clusters  # noqa: E402
+
+
+def _hashes(*phashes):
+    return [{"phash": p, "dhash": p, "sharpness": 0.0} for p in phashes]
+
+
+def test_bands_cover_all_64_bits():
+    for threshold in (0, 3, 8, 63, 100):
+        bands = _bands(threshold)
+        assert sum(width for _, width in bands) == 64
+        assert bands[0][0] == 0
+
+
+def test_popcount():
+    values = np.array([0, 1, 0xFF, 2 ** 64 - 1], dtype=np.uint64)
+    assert _popcount(values).tolist() == [0, 1, 8, 64]
+
+
+def test_clusters_join_hashes_within_the_threshold():
+    near = 0b111  # 3 bits from 0
+    far = 2 ** 64 - 1
+    clusters = find_clusters(_hashes(0, far, near, 0b1111_1111_1111), phash_threshold=4, dhash_threshold=4)
+
+    assert clusters == [[0, 2]]
+
+
+def test_near_duplicate_photos_share_a_cluster(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    rng = np.random.default_rng(7)
+    photo = np.kron(rng.integers(0, 256, (6, 8)), np.ones((16, 16), dtype=int))
+    other = np.kron(rng.integers(0, 256, (6, 8)), np.ones((16, 16), dtype=int))
+    paths = []
+    for name, pixels in [("a", photo), ("b", np.clip(photo + 6, 0, 255)),
+                         ("c", other), ("d", photo[:, ::-1])]:
+        path = tmp_path / f"{name}.png"
+        Image.fromarray(pixels.astype(np.uint8)).convert("RGB").save(path)
+        paths.append(str(path))
+    cache = tmp_path / "hashes.json"
+
+    hashes = compute_hashes(paths, str(cache))
+
+    assert find_clusters(hashes) == [[0, 1]]
+    assert len(json.loads(cache.read_text())) == 4
+    assert compute_hashes(paths, str(cache)) == hashes
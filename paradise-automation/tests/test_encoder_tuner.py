@@ -0,0 +1,35 @@
+import pytest
+
+from scripts import encoder_tuner
+
+
+def test_no_samples_is_an_error(tmp_path):
+    with pytest.raises(ValueError, match="at least one sample"):
+        encoder_tuner.tune(str(tmp_path), samples=0, profile_path=str(tmp_path / "profile.json"))
+
+
+def test_empty_sample_set_is_an_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(encoder_tuner, "load_images_from_folder", lambda folder, sort_by: [])
+    with pytest.raises(ValueError, match="No sample images"):
+        encoder_tuner.tune(str(tmp_path), profile_path=str(tmp_path / "profile.json"))
+    assert not (tmp_path / "profile.json").exists()
+
+
+def _result(preset, crf, fps, bitrate, ssim):
+    return {"preset": preset, "crf": crf, "fps": fps, "bitrate_kbps": bitrate, "ssim": ssim}
+
+
+def test_choose_takes_the_fastest_setting_above_the_floor():
+    results = [
+        _result("ultrafast", 26, 300.0, 900.0, 0.95),  # Fastest, but below the floor
+        _result("superfast", 23, 200.0, 1200.0, 0.975),
+        _result("veryfast", 20, 200.0, 1000.0, 0.98),  # As fast, smaller
+        _result("slow", 18, 50.0, 800.0, 0.99)
+    ]
+    chosen = encoder_tuner.choose(results, 0.97)
+    assert (chosen["preset"], chosen["crf"]) == ("veryfast", 20)
+
+
+def test_choose_falls_back_to_the_best_quality():
+    results = [_result("ultrafast", 26, 300.0, 900.0, 0.90), _result("slow", 18, 50.0, 800.0, 0.96)]
+    assert encoder_tuner.choose(results, 0.97)["preset"] == "slow"
@@ -0,0 +1,55 @@
+import os
+import errno
+import builtins
+
+import pytest
+
+from scripts.image_pool import ImagePool
+
+
+def _pool(tmp_path):
+    return ImagePool(str(tmp_path / "shm"), spill_dir=str(tmp_path / "spill"))
+
+
+def _full(monkeypatch, directory, code=errno.ENOSPC):
+    real_open = builtins.open
+
+    def fake_open(path, *args, **kwargs):
+        if str(path).startswith(directory):
+            raise OSError(code, os.strerror(code))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", fake_open)
+
+
+def test_frame_spills_to_disk_when_the_pool_is_full(tmp_path, monkeypatch):
+    pool = _pool(tmp_path)
+    _full(monkeypatch, str(tmp_path / "shm"))
+    path = pool.path("abc", 4, 2, "fill")
+
+    written = pool._write(path, {".rgb": b"\0" * 24})
+
+    assert os.path.dirname(written) == str(tmp_path / "spill")
+    assert os.listdir(tmp_path / "shm") == []
+    assert pool._find(path) == written
+    assert [entry[0] for entry in pool.entries()] == [written]
+
+
+def test_other_write_errors_are_raised(tmp_path, monkeypatch):
+    pool = _pool(tmp_path)
+    _full(monkeypatch, str(tmp_path / "shm"), errno.EACCES)
+
+    with pytest.raises(PermissionError):
+        pool._write(pool.path("abc", 4, 2, "fill"), {".rgb": b"\0" * 24})
+    assert not os.path.exists(tmp_path / "spill")
+
+
+def test_frame_set_is_complete_in_one_directory(tmp_path):
+    pool = _pool(tmp_path)
+    path = pool.path("abc", 4, 2, "frames")
+
+    written = pool._write(path, {".rgb": b"\0" * 48, ".json": b"{}"})
+
+    assert written == path
+    stem = os.path.basename(path)[:-4]
+    assert sorted(os.listdir(tmp_path / "shm")) == [stem + ".json", stem + ".rgb"]
@@ -0,0 +1,66 @@
+import pytest
+
+from scripts import music_catalog
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    """Catalog in tmp_path with probe, loudness and analysis recorded instead of run."""
+    calls = []
+    connect = music_catalog.connect
+    monkeypatch.setattr(music_catalog, "connect", lambda: connect(str(tmp_path / "catalog.sqlite")))
+    monkeypatch.setattr(music_catalog, "classify", lambda path: ("user", None, "song"))
+
+    def probe(path):
+        calls.append(("probe", path))
+        return {"duration": 60.0, "codec": "mp3", "sample_rate": 44100, "channels": 2, "bit_rate": 128000}
+
+    def get_loudness(path):
+        calls.append(("loudness", path))
+        return {"input_i": -20.0, "input_tp": -3.0}
+
+    def analyse(path, detect_intro=True):
+        calls.append(("analyse", path))
+        return {"trim": {"start": 1.0, "end": 59.0, "intro": False}, "tempo": 120.0, "beats": [1.0, 1.5]}
+
+    monkeypatch.setattr(music_catalog, "probe", probe)
+    monkeypatch.setattr(music_catalog, "get_loudness", get_loudness)
+    monkeypatch.setattr(music_catalog, "analyse", analyse)
+    return calls
+
+
+def _song(tmp_path, name="song.mp3", data=b"mp3 data"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_lookup_only_probes(tmp_path, catalog):
+    row = music_catalog.lookup(_song(tmp_path))
+
+    assert row["duration"] == 60.0
+    assert row["measured_at"] is None and row["analysed_at"] is None
+    assert [call for call, _ in catalog] == ["probe"]
+
+
+def test_measurements_are_filled_once_when_asked_for(tmp_path, catalog):
+    path = _song(tmp_path)
+
+    row = music_catalog.lookup(path, loudness=True)
+    assert row["loudness"] == -20.0 and row["trim_start"] is None
+    row = music_catalog.lookup(path, loudness=True, analysis=True)
+    assert (row["trim_start"], row["trim_end"], row["tempo"]) == (1.0, 59.0, 120.0)
+    music_catalog.lookup(path, loudness=True, analysis=True)
+
+    assert [call for call, _ in catalog] == ["probe", "loudness", "analyse"]
+
+
+def test_copy_takes_measurements_over(tmp_path, catalog):
+    original = _song(tmp_path, "a.mp3")
+    copy = _song(tmp_path, "b.mp3")
+    music_catalog.lookup(original, loudness=True, analysis=True)
+
+    row = music_catalog.lookup(copy, loudness=True, analysis=True)
+
+    assert row["loudness"] == -20.0 and row["trim_end"] == 59.0
+    assert catalog == [("probe", original), ("loudness", original), ("analyse", original), ("probe", copy)]
@@ -0,0 +1,91 @@
+import os
+
+from scripts import render_plan
+from scripts.render_plan import build_plan, compile_plan, execute_steps, optimize_plan
+
+
+def _images(tmp_path, count=3):
+    try:
+        from PIL import Image
+    except ImportError:
+        Image = None  # Plans only read a size with Pillow; any bytes do without it
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"img{i}.jpg"
+        if Image:
+            Image.new("RGB", (8, 6), (40 * i, 0, 0)).save(path)
+        else:
+            path.write_bytes(b"\xff\xd8" + bytes([i]))
+        paths.append(str(path))
+    return paths
+
+
+def _steps(tmp_path, durations, crossfade=True, stills=False):
+    plan = build_plan(_images(tmp_path, len(durations)), durations, 640, 360, crossfade=crossfade, fps=25)
+    return compile_plan(optimize_plan(plan), str(tmp_path / "cache"), stills=stills)
+
+
+def test_step_keys_follow_the_plan(tmp_path):
+    first = _steps(tmp_path, [2.0, 2.0, 2.0])
+    again = _steps(tmp_path, [2.0, 2.0, 2.0])
+    changed = _steps(tmp_path, [2.0, 3.0, 2.0])
+    assert [s["key"] for s in first] == [s["key"] for s in again]
+    assert first[0]["key"] == changed[0]["key"]
+    assert first[1]["key"] != changed[1]["key"]
+    assert first[-1]["key"] != changed[-1]["key"]  # The crossfade depends on every clip
+
+
+def test_part_and_list_files_are_unique_per_compile(tmp_path):
+    for crossfade in (True, False):
+        first = _steps(tmp_path, [2.0, 2.0], crossfade)
+        second = _steps(tmp_path, [2.0, 2.0], crossfade)
+        for a, b in zip(first, second):
+            assert a["output"] == b["output"]
+            assert a["part"] != b["part"] and ".part." in a["part"]
+            assert a["part"] in a["cmd"] and b["part"] in b["cmd"]
+            assert not set(a.get("files", {})) & set(b.get("files", {}))
+
+
+def test_stills_come_from_cached_clips(tmp_path, monkeypatch):
+    plain = _steps(tmp_path, [2.0, 2.0])
+    with_stills = _steps(tmp_path, [2.0, 2.0], stills=True)
+    assert [s["key"] for s in plain] == [s["key"] for s in with_stills]
+
+    for step in plain:
+        os.makedirs(os.path.dirname(step["output"]), exist_ok=True)
+        open(step["output"], "w").close()
+    ran = []
+
+    def run(cmd, **kwargs):
+        ran.append(cmd)
+        open(cmd[-1], "w").close()
+
+    monkeypatch.setattr(render_plan, "run", run)
+    assert execute_steps(with_stills) == {"run": 0, "cached": 3}
+    assert [cmd[cmd.index("-i") + 1] for cmd in ran] == [s["output"] for s in with_stills[:2]]
+    assert all(os.path.exists(s["still"]) for s in with_stills[:2])
+
+
+def test_animations_are_decoded_when_their_step_runs(tmp_path, monkeypatch):
+    decoded = []
+
+    class Pool:
+        def animation(self, ref, width, height):
+            decoded.append(ref)
+            return {"path": str(tmp_path / "frames.rgb"), "width": width, "height": height, "durations": [0.1, 0.1]}
+
+    monkeypatch.setattr(render_plan.image_pool, "available", lambda: True)
+    monkeypatch.setattr(render_plan.image_pool, "default_pool", Pool)
+    monkeypatch.setattr(render_plan, "is_animated", lambda ref: True)
+    ran = []
+    monkeypatch.setattr(render_plan, "run", lambda cmd, **kwargs: ran.append(cmd) or open(cmd[-1], "w").close())
+
+    steps = _steps(tmp_path, [2.0], crossfade=False)
+    assert steps[0]["cmd"] is None and not decoded
+
+    assert execute_steps(steps) == {"run": 1, "cached": 0}
+    assert decoded == [steps[0]["animation"][0]]
+    assert str(tmp_path / "frames.rgb") in ran[0] and steps[0]["part"] in ran[0]
+
+    assert execute_steps(_steps(tmp_path, [2.0], crossfade=False)) == {"run": 0, "cached": 1}
+    assert len(decoded) == 1
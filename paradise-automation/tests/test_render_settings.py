@@ -0,0 +1,54 @@
+import json
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from scripts.render_settings import RenderSettings, DEFAULT_SETTINGS
+
+
+def test_round_trip_through_json():
+    settings = RenderSettings(width=1080, height=1920, fps=30, crf=20, framing="blur",
+                              timeline_policy="subsample", animation_timing="stretch")
+
+    restored = RenderSettings.from_dict(json.loads(json.dumps(settings.to_dict())))
+
+    assert restored == settings
+
+
+def test_from_dict_ignores_unknown_and_defaults_missing_keys():
+    restored = RenderSettings.from_dict({"width": 1280, "height": 720, "future_setting": 1})
+
+    assert restored == DEFAULT_SETTINGS.replace(width=1280, height=720)
+
+
+def test_settings_are_immutable():
+    with pytest.raises(FrozenInstanceError):
+        DEFAULT_SETTINGS.width = 640
+    short = DEFAULT_SETTINGS.replace(min_image_duration=1, max_image_duration=2)
+    assert (short.min_image_duration, short.max_image_duration) == (1, 2)
+    assert short.replace(min_image_duration=DEFAULT_SETTINGS.min_image_duration,
+                         max_image_duration=DEFAULT_SETTINGS.max_image_duration) == DEFAULT_SETTINGS
+
+
+@pytest.mark.parametrize("changes", [
+    {"width": 641},
+    {"height": 0},
+    {"fps": 0},
+    {"framing": "zoom"},
+    {"timeline_policy": "shuffle"},
+    {"animation_timing": "bounce"},
+    {"min_image_duration": 0},
+    {"min_image_duration": 5, "max_image_duration": 4},
+])
+def test_invalid_settings_are_rejected(changes):
+    with pytest.raises(ValueError):
+        DEFAULT_SETTINGS.replace(**changes)
+
+
+def test_encoder_args_and_fade_frames():
+    settings = RenderSettings(fps=25, preset="fast", crf=21, crossfade=True, crossfade_duration=0.5)
+
+    assert settings.encoder_args()[2:] == ["-preset", "fast", "-crf", "21"]
+    assert settings.fade_frames(2) == 13
+    assert settings.fade_frames(1) == 0
+    assert settings.replace(crossfade=False).fade_frames(5) == 0
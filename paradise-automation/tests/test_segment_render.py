@@ -0,0 +1,164 @@
+import os
+import json
+import time
+
+import pytest
+
+from scripts import segment_render
+from scripts.segment_render import (
+    claim_segment, create_job, plan_segments, release_segment, requeue_stale, segment_name, work_on
+)
+from config import SEGMENT_HEARTBEAT_TIMEOUT
+
+
+def _job(tmp_path, count=2):
+    segments = [{"index": i, "images": [], "frames": [], "fade": 0, "attempts": 0} for i in range(count)]
+    return create_job(str(tmp_path), "job", {"fps": 25}, segments)
+
+
+def _names(job_dir, state):
+    return sorted(os.listdir(os.path.join(job_dir, state)))
+
+
+def test_failed_render_goes_back_to_pending(tmp_path, monkeypatch):
+    job_dir = _job(tmp_path)
+
+    def fail(*args):
+        raise RuntimeError("ffmpeg exited 1")
+
+    monkeypatch.setattr(segment_render, "render_segment", fail)
+    claimed = claim_segment(job_dir, "w1")
+    assert not work_on(job_dir, claimed, "w1")
+
+    assert _names(job_dir, "pending") == ["seg_0000.json", "seg_0001.json"]
+    assert _names(job_dir, "running") == []
+    with open(os.path.join(job_dir, "pending", "seg_0000.json")) as f:
+        spec = json.load(f)
+    assert spec["attempts"] == 1
+    assert "ffmpeg exited 1" in spec["error"]
+
+
+def test_segment_fails_after_max_attempts(tmp_path):
+    job_dir = _job(tmp_path, 1)
+    states = []
+    for _ in range(3):
+        claimed = claim_segment(job_dir, "w1")
+        with open(claimed) as f:
+            spec = json.load(f)
+        states.append(release_segment(job_dir, claimed, spec, "boom", max_attempts=3))
+    assert states == ["pending", "pending", "failed"]
+    assert _names(job_dir, "failed") == [segment_name(0) + ".json"]
+    assert _names(job_dir, "pending") == _names(job_dir, "running") == []
+
+
+def test_successful_render_is_published_then_unclaimed(tmp_path, monkeypatch):
+    job_dir = _job(tmp_path, 1)
+
+    def render(spec, job, output_path, work_dir):
+        os.makedirs(work_dir, exist_ok=True)
+        open(output_path, "w").close()
+
+    monkeypatch.setattr(segment_render, "render_segment", render)
+    claimed = claim_segment(job_dir, "w1")
+    assert work_on(job_dir, claimed, "w1")
+    assert _names(job_dir, "done") == ["seg_0000.mp4"]
+    assert _names(job_dir, "running") == []
+
+
+class _ExitedWorker:
+    returncode = 0
+
+    def poll(self):
+        return 0
+
+    def wait(self):
+        return 0
+
+
+def _coordinate(tmp_path, monkeypatch, worker):
+    """render_segmented with one fake local worker (worker(job_dir) is its whole run)."""
+
+    def spawn(spool_dir, worker_id):
+        worker(os.path.join(spool_dir, os.path.basename(str(tmp_path))))
+        return _ExitedWorker()
+
+    monkeypatch.setattr(segment_render, "spawn_worker", spawn)
+    monkeypatch.setattr(segment_render, "POLL_INTERVAL", 0)
+    with pytest.raises(RuntimeError) as error:
+        segment_render.render_segmented(["a.jpg"], [3.0], str(tmp_path), crossfade=False, workers=1)
+    return str(error.value)
+
+
+def test_coordinator_stops_when_a_segment_fails(tmp_path, monkeypatch):
+    def worker(job_dir):
+        claimed = claim_segment(job_dir, "local0")
+        with open(claimed) as f:
+            release_segment(job_dir, claimed, json.load(f), "boom", max_attempts=1)
+
+    assert "failed" in _coordinate(tmp_path, monkeypatch, worker)
+
+
+def test_coordinator_stops_when_a_segment_is_lost(tmp_path, monkeypatch):
+    def worker(job_dir):
+        os.remove(claim_segment(job_dir, "local0"))
+
+    assert "neither pending, running nor done" in _coordinate(tmp_path, monkeypatch, worker)
+
+
+def test_stalled_claim_is_requeued_then_failed(tmp_path):
+    job_dir = _job(tmp_path, 1)
+    stale = time.time() - SEGMENT_HEARTBEAT_TIMEOUT - 1
+
+    def worker_dies():
+        claimed = claim_segment(job_dir, "w1")
+        os.utime(claimed, (stale, stale))
+        return claimed
+
+    worker_dies()
+    assert requeue_stale(job_dir, max_attempts=2) == 1
+    assert _names(job_dir, "pending") == ["seg_0000.json"]
+    assert _names(job_dir, "running") == []
+
+    worker_dies()
+    assert requeue_stale(job_dir, max_attempts=2) == 1
+    assert _names(job_dir, "failed") == ["seg_0000.json"]
+    with open(os.path.join(job_dir, "failed", "seg_0000.json")) as f:
+        spec = json.load(f)
+    assert spec["attempts"] == 2
+    assert "w1 stalled" in spec["error"]
+
+
+def test_live_claim_is_left_running(tmp_path):
+    job_dir = _job(tmp_path, 1)
+    claim_segment(job_dir, "w1")
+    assert requeue_stale(job_dir) == 0
+    assert _names(job_dir, "running") == ["seg_0000.json.w1"]
+
+
+def test_coordinator_stops_when_a_worker_keeps_dying(tmp_path, monkeypatch):
+    def worker(job_dir):
+        stale = time.time() - SEGMENT_HEARTBEAT_TIMEOUT - 1
+        claimed = claim_segment(job_dir, "local0")
+        os.utime(claimed, (stale, stale))
+
+    monkeypatch.setattr(segment_render, "requeue_stale", lambda job_dir: requeue_stale(job_dir, max_attempts=1))
+    assert "local0 stalled" in _coordinate(tmp_path, monkeypatch, worker)
+
+
+def test_segments_cover_the_timeline_with_overlap():
+    # 5 clips of 50 frames with a 10-frame fade: clip k starts at 40k, 210 frames total
+    segments = plan_segments(list("abcde"), [2.0] * 5, segment_size=2, crossfade_duration=0.4, fps=25)
+
+    assert [s["images"] for s in segments] == [list("abc"), list("cde"), list("e")]
+    assert [s["indices"] for s in segments] == [[0, 1], [2, 3], [4]]
+    assert all(s["fade"] == 10 for s in segments)
+    # Segment k covers [start of its first clip + fade, start of the next segment + fade)
+    spans = [(s["start_frame"], s["end_frame"]) for s in segments]
+    assert spans == [(0, 90), (10, 90), (10, 50)]
+    assert sum(end - start for start, end in spans) == 210
+
+
+def test_segments_without_crossfade_do_not_overlap():
+    segments = plan_segments(list("abc"), [1.0, 2.0, 1.0], segment_size=2, crossfade=False, fps=25)
+    assert [s["images"] for s in segments] == [list("ab"), list("c")]
+    assert [(s["start_frame"], s["end_frame"]) for s in segments] == [(0, 75), (0, 25)]
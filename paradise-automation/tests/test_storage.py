@@ -0,0 +1,95 @@
+import os
+import json
+import time
+import socket
+import subprocess
+import sys
+
+from scripts import storage
+from scripts.storage import OWNER_FILE, GB, claim_job_dir, enforce_budgets, find_orphans, job_dirs
+
+
+def _age(path, hours):
+    """Backdate a file or directory tree by hours."""
+    when = time.time() - hours * 3600
+    for root, _, files in os.walk(path):
+        for name in files:
+            os.utime(os.path.join(root, name), (when, when))
+        os.utime(root, (when, when))
+
+
+def _job(tmp_path, name, owner=None, hours=0):
+    path = tmp_path / name
+    path.mkdir()
+    (path / "clip.mp4").write_bytes(b"x")
+    if owner is not None:
+        (path / OWNER_FILE).write_text(json.dumps(owner))
+    _age(str(path), hours)
+    return str(path)
+
+
+def _file(directory, name, size, hours):
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    when = time.time() - hours * 3600
+    os.utime(path, (when, when))
+
+
+def test_orphans_are_dead_owners_and_old_unowned_or_foreign_jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_BUDGETS", {})
+    host = socket.gethostname()
+    finished = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                              capture_output=True, text=True).stdout
+    live = claim_job_dir(str(tmp_path / "live"))
+    dead = _job(tmp_path, "dead", {"pid": int(finished), "host": host})
+    foreign_new = _job(tmp_path, "foreign_new", {"pid": 1, "host": "elsewhere"}, hours=1)
+    foreign_old = _job(tmp_path, "foreign_old", {"pid": 1, "host": "elsewhere"}, hours=10)
+    unowned_new = _job(tmp_path, "unowned_new", hours=1)
+    unowned_old = _job(tmp_path, "unowned_old", hours=10)
+
+    orphans = find_orphans(str(tmp_path), max_hours=6)
+    assert sorted(orphans) == sorted([dead, foreign_old, unowned_old])
+    assert not {live, foreign_new, unowned_new} & set(orphans)
+
+
+def test_job_dirs_skip_caches_and_watch_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_BUDGETS", {
+        "render_cache": {"path": str(tmp_path / "render_cache"), "max_gb": 1, "max_age_days": 1},
+        "watch": {"path": str(tmp_path), "prefix": "watch_", "max_gb": 1, "max_age_days": 1}
+    })
+    for name in ("render_cache", "watch_photos", "job_a", "job_b"):
+        (tmp_path / name).mkdir()
+    (tmp_path / "notes.txt").write_text("not a directory")
+    assert job_dirs(str(tmp_path)) == [str(tmp_path / "job_a"), str(tmp_path / "job_b")]
+
+
+def test_budgets_expire_then_evict_least_recently_used(tmp_path):
+    cache = str(tmp_path / "cache")
+    plans = os.path.join(cache, "plans")
+    os.makedirs(plans)
+    _file(plans, "photos.json", 100, hours=24 * 30)
+    _file(cache, "expired.mp4", 100, hours=24 * 3)
+    _file(cache, "clip.mp4", 400, hours=3)
+    _file(cache, "clip.jpg", 100, hours=1)  # Grouped with its clip, so the clip was used an hour ago
+    _file(cache, "unused.mp4", 500, hours=2)
+    _file(cache, "newest.mp4", 500, hours=0)
+    budget = {"path": cache, "max_gb": 1000 / GB, "max_age_days": 2, "keep": [plans]}
+
+    assert enforce_budgets({"cache": budget}, dry_run=True) == 600
+    assert len(os.listdir(cache)) == 6
+
+    assert enforce_budgets({"cache": budget}) == 600
+    assert sorted(os.listdir(cache)) == ["clip.jpg", "clip.mp4", "newest.mp4", "plans"]
+    assert os.listdir(plans) == ["photos.json"]
+
+
+def test_pool_budget_spares_recently_used_frames(tmp_path):
+    pool = str(tmp_path / "pool")
+    os.makedirs(pool)
+    _file(pool, "old.rgb", 600, hours=2)
+    _file(pool, "recent.rgb", 600, hours=0)
+    budget = {"path": pool, "max_gb": 500 / GB, "max_age_days": 1, "pool": True}
+
+    assert enforce_budgets({"image_pool": budget}) == 600
+    assert os.listdir(pool) == ["recent.rgb"]  # Over budget, but maybe still being read
@@ -0,0 +1,22 @@
+import struct
+
+from scripts.streaming import scan_boxes
+
+
+def _box(kind, size):
+    return struct.pack(">I4s", size, kind.encode()) + b"\0" * (size - 8)
+
+
+def test_scan_stops_at_a_box_still_being_written(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(_box("ftyp", 32) + _box("moof", 100) + _box("mdat", 500)[:200])
+    assert scan_boxes(str(path)) == [("ftyp", 0, 32), ("moof", 32, 100)]
+    assert scan_boxes(str(path), 132) == []
+
+    # A 64-bit size whose header isn't all there yet
+    path.write_bytes(_box("ftyp", 32) + struct.pack(">I4s", 1, b"mdat") + b"\0\0")
+    assert scan_boxes(str(path)) == [("ftyp", 0, 32)]
+
+
+def test_scan_of_a_missing_file_is_empty(tmp_path):
+    assert scan_boxes(str(tmp_path / "missing.mp4")) == []
@@ -0,0 +1,99 @@
+import pytest
+
+from scripts.timeline import plan_timeline, snap_to_beats, to_frames
+
+FPS = 25
+FADE = to_frames(0.5, FPS)  # 13 frames
+
+
+def _images(count):
+    return [f"img_{i:03d}.jpg" for i in range(count)]
+
+
+def _plan(count, seconds, policy="drop", crossfade=True):
+    return plan_timeline(_images(count), seconds, policy, crossfade, 0.5, FPS, 3.0, 10.0)
+
+
+def _length(plan, fade=FADE):
+    return sum(plan["frames"]) - (len(plan["frames"]) - 1) * fade
+
+
+def test_images_that_fit_fill_the_music_exactly():
+    plan = _plan(10, 60.0)
+
+    assert plan["images"] == _images(10)
+    assert plan["dropped"] == 0
+    assert plan["total_frames"] == _length(plan) == 60 * FPS
+    assert max(plan["frames"]) - min(plan["frames"]) <= 1
+
+
+def test_drop_keeps_the_first_images_that_fit():
+    plan = _plan(100, 30.0, "drop")
+
+    # (750 - 13) // (75 - 13) clips of at least 3s fit in 30s
+    assert plan["images"] == _images(11)
+    assert plan["dropped"] == 89
+    assert plan["total_frames"] == _length(plan) == 30 * FPS
+    assert min(plan["frames"]) >= 3 * FPS
+
+
+def test_subsample_picks_evenly_across_the_set():
+    plan = _plan(100, 30.0, "subsample")
+
+    assert len(plan["images"]) == 11
+    assert plan["images"][0] == "img_000.jpg" and plan["images"][-1] == "img_099.jpg"
+    assert plan["images"] == sorted(plan["images"])
+    assert plan["total_frames"] == _length(plan) == 30 * FPS
+    assert min(plan["frames"]) >= 3 * FPS
+
+
+def test_spread_shows_every_image_above_its_floor():
+    plan = _plan(100, 150.0, "spread")
+
+    assert plan["dropped"] == 0
+    assert plan["total_frames"] == 150 * FPS
+    assert min(plan["frames"]) >= FADE + FPS
+
+
+def test_loop_clamps_every_image_and_runs_past_the_music():
+    plan = _plan(100, 30.0, "loop")
+
+    assert plan["frames"] == [3 * FPS] * 100
+    assert plan["total_frames"] > 30 * FPS
+
+
+def test_too_few_images_end_before_the_music():
+    plan = _plan(2, 60.0)
+
+    assert plan["frames"] == [10 * FPS, 10 * FPS]
+    assert plan["total_frames"] == 2 * 10 * FPS - FADE
+
+
+def test_single_image_and_cuts_have_no_fade():
+    assert _plan(1, 5.0)["total_frames"] == 5 * FPS
+    plan = _plan(4, 20.0, crossfade=False)
+    assert sum(plan["frames"]) == plan["total_frames"] == 20 * FPS
+
+
+def test_unknown_policy_and_no_images_are_errors():
+    with pytest.raises(ValueError):
+        _plan(3, 10.0, "shuffle")
+    with pytest.raises(ValueError):
+        plan_timeline([], 10.0)
+
+
+def test_snap_to_beats_keeps_length_and_limits():
+    plan = _plan(10, 60.0)
+    beats = [i * 0.48 for i in range(200)]
+
+    snapped = snap_to_beats(plan, beats, 0.0, FPS, 3.0, 10.0)
+
+    assert snapped["snapped"] == 9
+    assert _length(snapped) == plan["total_frames"]
+    assert all(3 * FPS <= f <= 10 * FPS for f in snapped["frames"])
+    # Every cut sits on a beat: the middle of each crossfade is a beat's frame
+    beat_frames = {to_frames(b, FPS) for b in beats}
+    start = 0
+    for frames in snapped["frames"][:-1]:
+        start += frames - FADE
+        assert start + FADE // 2 in beat_frames
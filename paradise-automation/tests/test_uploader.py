@@ -0,0 +1,103 @@
+import os
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("requests")
+
+from scripts import uploader
+from scripts.streaming import FragmentTracker
+from scripts.uploader import CHUNK_GRANULARITY, upload_stream
+
+
+def _box(kind, size):
+    return struct.pack(">I4s", size, kind.encode()) + b"\0" * (size - 8)
+
+
+class Session(BaseHTTPRequestHandler):
+    """A resumable upload session that fails one chunk with a 503."""
+
+    def do_PUT(self):
+        server = self.server
+        data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        content_range = self.headers["Content-Range"]
+        server.puts.append((content_range, len(data)))
+        span, total = content_range[len("bytes "):].split("/")
+        if data:
+            if len(server.puts) == 2:
+                return self._reply(503)
+            first = int(span.split("-")[0])
+            assert first == len(server.received)
+            server.received += data
+            server.got_data.set()
+        if total != "*" and len(server.received) == int(total):
+            return self._reply(200)
+        headers = {"Range": f"bytes=0-{len(server.received) - 1}"} if server.received else {}
+        self._reply(308, headers)
+
+    def _reply(self, status, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def session_url():
+    server = HTTPServer(("127.0.0.1", 0), Session)
+    server.puts, server.received, server.got_data = [], bytearray(), threading.Event()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_port}/upload"
+    server.shutdown()
+    server.server_close()
+
+
+def test_upload_follows_a_growing_file_and_resumes_after_a_5xx(tmp_path, monkeypatch, session_url):
+    server, url = session_url
+    # No real waiting: poll and back off immediately
+    monkeypatch.setattr(uploader, "time", SimpleNamespace(time=time.time, sleep=lambda s: time.sleep(0.01)))
+    output = str(tmp_path / "video.mp4")
+    tracker = FragmentTracker(output)
+    with open(output, "wb") as f:
+        f.write(_box("ftyp", 32) + _box("moov", 1000))
+    tracker.update()
+    tracker.save()
+
+    def render():
+        with open(output, "ab") as f:
+            for i in range(6):
+                f.write(_box("moof", 100) + _box("mdat", 150_000))
+                f.flush()
+                tracker.update()
+                tracker.save()
+                if i == 3:
+                    server.got_data.wait(10)  # Finish only once some of it is uploaded
+        tracker.manifest["complete"] = True
+        tracker.manifest["size"] = os.path.getsize(output)
+        tracker.save()
+
+    writer = threading.Thread(target=render)
+    writer.start()
+    result = upload_stream(output, url, chunk_bytes=CHUNK_GRANULARITY, max_retries=2, quiet=True)
+    writer.join()
+
+    with open(output, "rb") as f:
+        assert bytes(server.received) == f.read()
+    chunks = [(r, n) for r, n in server.puts if n]
+    for content_range, size in chunks[:-1]:
+        first = int(content_range.split()[1].split("-")[0])
+        assert first % CHUNK_GRANULARITY == 0 and size % CHUNK_GRANULARITY == 0
+    assert chunks[-1][0].endswith(f"/{len(server.received)}")
+    assert ("bytes */*", 0) in server.puts  # Asked where to resume after the 503
+    assert result["retries"] == 1
+    assert result["bytes"] == len(server.received)
+    assert result["sent_before_finish"] > 0
@@ -0,0 +1,32 @@
+from scripts.verify import boundaries, sample_points, difference
+
+
+def test_boundaries_are_crossfade_starts():
+    assert boundaries([100, 100, 100], 10) == [90, 180]
+    assert boundaries([50, 60], 0) == [50]
+    assert boundaries([75], 13) == []
+
+
+def test_sample_points_straddle_each_change():
+    assert sample_points([100, 100, 100], 10) == [(89, 100), (179, 190)]
+
+
+def test_repeated_source_is_not_a_change():
+    points = sample_points([100, 100, 100], 0, sources=["a.jpg", "a.jpg", "b.jpg"])
+
+    assert points == [(199, 200)]
+
+
+def test_sample_points_are_capped_and_keep_the_last_change():
+    frames = [50] * 21
+    points = sample_points(frames, 0, limit=4)
+
+    assert len(points) == 4
+    assert points[0] == (49, 50)
+    assert points[-1] == (999, 1000)
+    assert points == sorted(points)
+
+
+def test_difference_of_samples():
+    assert difference(bytes([10, 20]), bytes([10, 20])) == 0
+    assert difference(bytes([0, 0]), bytes([255, 1])) == 128
@@ -0,0 +1,16 @@
+from scripts.video_assembler import image_clip_command, working_frame
+
+
+def test_ken_burns_working_frame_follows_the_output_size():
+    assert working_frame(1920, 1080, True, "classic") == (2112, 1188, "fill")
+    assert working_frame(1080, 1920, True, "blur") == (1188, 2112, "blur")
+    width, height, _ = working_frame(641, 361, True, "classic")
+    assert width % 2 == 0 and height % 2 == 0
+    assert working_frame(1080, 1920, False, "classic") == (1080, 1920, "fit")
+
+
+def test_ken_burns_clip_scales_to_the_working_size():
+    cmd = image_clip_command("a.jpg", 2.0, "out.mp4", 1080, 1920, ken_burns=True, framing="classic")
+    vf = cmd[cmd.index("-vf") + 1]
+    assert vf.startswith("scale=1188:2112,")
+    assert ":s=1080x1920:" in vf
@@ -0,0 +1,126 @@
+import os
+
+import pytest
+
+from scripts import watch_folder as wf
+from scripts.render_settings import RenderSettings
+
+
+class _Stop(Exception):
+    pass
+
+
+def _folder(tmp_path):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    for name in ("a.jpg", "b.jpg"):
+        (folder / name).write_bytes(b"jpeg")
+    return str(folder)
+
+
+def _watch(tmp_path, monkeypatch, render, polls, edits=None, **kwargs):
+    """Watch a two-image folder for polls polls; edits[n](folder) runs after poll n."""
+    monkeypatch.setattr(wf, "TEMP_DIR", str(tmp_path / "temp"))
+    monkeypatch.setattr(wf, "get_audio_duration", lambda path: 10.0)
+    monkeypatch.setattr(wf, "render_incremental", render)
+    folder = _folder(tmp_path)
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        if len(slept) in (edits or {}):
+            edits[len(slept)](folder)
+        if len(slept) >= polls:
+            raise _Stop()
+
+    monkeypatch.setattr(wf.time, "sleep", sleep)
+    with pytest.raises(_Stop):
+        wf.watch_folder(folder, "music.wav", str(tmp_path / "out.mp4"), sort_by="filename", **kwargs)
+    return folder
+
+
+def _state(tmp_path):
+    return wf.load_state(str(tmp_path / "temp" / "watch_images"))
+
+
+def _add_image(folder):
+    with open(os.path.join(folder, "c.jpg"), "wb") as f:
+        f.write(b"jpeg")
+
+
+def test_failed_render_is_retried_when_the_folder_changes(tmp_path, monkeypatch):
+    calls = []
+
+    def render(images, *args, **kwargs):
+        calls.append(images)
+        if len(calls) == 1:
+            raise RuntimeError("ffmpeg exited 1")
+        return {"rendered": len(images), "reused": 0}
+
+    _watch(tmp_path, monkeypatch, render, polls=8, edits={4: _add_image})
+
+    # Poll 2 renders and fails, 3-4 wait for a change, 6 renders the edited folder
+    assert [len(images) for images in calls] == [2, 3]
+    assert sorted(_state(tmp_path)["folder"]) == ["a.jpg", "b.jpg", "c.jpg"]
+
+
+def test_persistent_failure_is_not_retried_every_poll(tmp_path, monkeypatch):
+    calls = []
+
+    def render(images, *args, **kwargs):
+        calls.append(images)
+        raise RuntimeError("ffmpeg exited 1")
+
+    _watch(tmp_path, monkeypatch, render, polls=10)
+
+    assert len(calls) == 1
+    assert _state(tmp_path) == {}
+
+
+def test_empty_folder_is_not_rendered(tmp_path, monkeypatch):
+    calls = []
+
+    def render(images, *args, **kwargs):
+        calls.append(images)
+        return {"rendered": len(images), "reused": 0}
+
+    def empty(folder):
+        for name in os.listdir(folder):
+            os.remove(os.path.join(folder, name))
+
+    _watch(tmp_path, monkeypatch, render, polls=6, edits={3: empty})
+
+    assert [len(images) for images in calls] == [2]
+    assert sorted(_state(tmp_path)["folder"]) == ["a.jpg", "b.jpg"]
+
+
+def test_changed_settings_render_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(wf, "TEMP_DIR", str(tmp_path / "temp"))
+    monkeypatch.setattr(wf, "get_audio_duration", lambda path: 10.0)
+    calls = []
+
+    def render(images, *args, **kwargs):
+        calls.append(kwargs)
+        return {"rendered": len(images), "reused": 0}
+
+    monkeypatch.setattr(wf, "render_incremental", render)
+    folder, output = _folder(tmp_path), str(tmp_path / "out.mp4")
+    small = RenderSettings(width=640, height=360)
+    for kwargs in ({}, {}, {"music_volume": 0.5}, {"music_volume": 0.5, "settings": small}):
+        wf.watch_folder(folder, "music.wav", output, once=True, **kwargs)
+
+    # The second run changes nothing and renders nothing
+    assert len(calls) == 3
+    assert calls[-1]["settings"] is small
+
+
+def test_render_once_raises(tmp_path, monkeypatch):
+    monkeypatch.setattr(wf, "TEMP_DIR", str(tmp_path / "temp"))
+    monkeypatch.setattr(wf, "get_audio_duration", lambda path: 10.0)
+
+    def render(*args, **kwargs):
+        raise RuntimeError("ffmpeg exited 1")
+
+    monkeypatch.setattr(wf, "render_incremental", render)
+    with pytest.raises(RuntimeError):
+        wf.watch_folder(_folder(tmp_path), "music.wav", str(tmp_path / "out.mp4"), once=True)